@@ -1,15 +1,295 @@
 # backend/app.py
 
 import os
-import joblib
-import pandas as pd
-from flask import Flask, request, jsonify
+import json
+import math
+import time
+from flask import Flask, Response, g, request, jsonify
+
+# pandas / sklearn / xgboost are only imported if we have to fall back to
+# the pickled model, so a normal cold start only pays for NumPy + Flask
+import model_artifact
+import model_registry
+from compiled_model import CompiledEnsemble
+from student_model import gate_failures
+from prediction_cache import PredictionCache, model_version
+from matchup_index import MatchupIndex
+from feature_registry import API_FIELDS
+import matchup_matrix
+from batcher import MicroBatcher
+import metrics
 
 app = Flask(__name__)
 
-# 1️⃣ Load the calibrated ensemble
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "model_global_ensemble_calibrated.pkl")
-model      = joblib.load(MODEL_PATH)
+# 0️⃣ Instrumentation, exposed in Prometheus text format on GET /metrics
+REQUESTS = metrics.Counter("api_requests_total", "HTTP requests by endpoint and status",
+                           ("endpoint", "status"))
+ERRORS   = metrics.Counter("api_errors_total", "Rejected requests and rows by kind", ("kind",))
+LATENCY  = metrics.Histogram("api_request_seconds", "End-to-end request latency", ("endpoint",))
+STAGE    = metrics.Histogram("predict_stage_seconds", "Time per predict stage", ("stage",))
+LEARNER  = metrics.Histogram("predict_learner_seconds",
+                             "Time per base learner (summed over calibration folds)", ("learner",))
+ROWS     = metrics.Histogram("predict_rows", "Rows per /predict request and per model call",
+                             ("source",), buckets=metrics.SIZE_BUCKETS)
+
+# 1️⃣ The calibrated ensemble. Preferred source is the versioned model
+#    directory (python backend/model_registry.py publish), which is watched
+#    and hot-swapped. Without one we serve the pickle next to this file,
+#    via its exported NumPy artifact when that matches the pickle.
+MODEL_PATH   = os.path.join(os.path.dirname(__file__), "model_global_ensemble_calibrated.pkl")
+ARTIFACT_DIR = os.getenv("MODEL_ARTIFACT_DIR", model_artifact.ARTIFACT_DIR)
+USE_COMPILED = os.getenv("USE_COMPILED_MODEL", "1") != "0"
+
+
+def load_legacy():
+    manifest = model_artifact.read_manifest(ARTIFACT_DIR)
+    have_pkl = os.path.exists(MODEL_PATH)
+    if not have_pkl and not (manifest and USE_COMPILED):
+        also = f", no artifact in {ARTIFACT_DIR}" if USE_COMPILED else " (USE_COMPILED_MODEL=0 needs it)"
+        raise FileNotFoundError(
+            f"No model to serve: nothing published in {model_registry.MODEL_DIR}, no pickle at "
+            f"{MODEL_PATH}{also}; run python backend/pipeline.py")
+    version  = model_version(MODEL_PATH) if have_pkl else manifest["source_version"]
+    serving  = model_registry.ServingModel(version, None, MODEL_PATH)
+    if not USE_COMPILED:
+        return serving
+    if manifest and manifest["source_version"] == version:
+        serving.scorer = model_artifact.load(ARTIFACT_DIR)[0]
+        return serving
+    # 1️⃣b compile from the pickle, and only trust it if it agrees with
+    #     predict_proba on a probe set
+    try:
+        serving.scorer = CompiledEnsemble.from_calibrated(serving.model)
+        dev = serving.scorer.verify(serving.model)
+        app.logger.info("Compiled scorer verified (max deviation %.2e)", dev)
+    except (AssertionError, ValueError, AttributeError) as exc:
+        app.logger.warning("Compiled scorer disabled, falling back to predict_proba: %s", exc)
+        serving.scorer = None
+    return serving
+
+
+_current = model_registry.read_manifest()["current"]
+if _current:
+    serving = model_registry.load_version(_current, use_compiled=USE_COMPILED)
+else:
+    serving = load_legacy()
+holder = model_registry.ModelHolder(serving)
+
+# 1️⃣c Prediction cache, keyed on the rounded features + model version
+#      (PREDICT_CACHE_SIZE=0 disables it, PREDICT_CACHE_TTL is in seconds)
+_ttl  = os.getenv("PREDICT_CACHE_TTL")
+cache = PredictionCache(
+    maxsize=int(os.getenv("PREDICT_CACHE_SIZE", 4096)),
+    ttl=float(_ttl) if _ttl else None,
+)
+cache.set_version(serving.version)
+for _name in ("hits", "misses", "evictions", "expirations"):
+    metrics.Gauge(f"predict_cache_{_name}_total", f"Prediction cache {_name}",
+                  lambda n=_name: getattr(cache, n), kind="counter")
+metrics.Gauge("predict_cache_entries", "Entries in the prediction cache", lambda: len(cache))
+metrics.add_source("cache", cache.stats)
+
+# 1️⃣d Latest rolling state per team, for (team, opponent, venue) lookups
+matchups = MatchupIndex.from_csv()
+
+
+# 1️⃣e Optional "fast" tier: the distilled student (python backend/distill_student.py),
+#     served on POST /predict?tier=fast. It is loaded with each full model and
+#     only if it was distilled from that model and passes the fidelity gate.
+STUDENT_DIR = os.getenv("STUDENT_MODEL_DIR", os.path.join(os.path.dirname(__file__), "student_model"))
+
+
+def load_fast(version):
+    """(ServingModel, None) for `version`'s student, or (None, why it isn't served)."""
+    manifest = model_artifact.read_manifest(STUDENT_DIR)
+    if not manifest:
+        return None, "no student (run distill_student.py)"
+    if manifest["source_version"] != version:
+        return None, f"student was distilled from {manifest['source_version']}, not {version}"
+    failures = gate_failures(manifest.get("fidelity"))
+    if failures:
+        return None, "student fails the fidelity gate: " + "; ".join(failures)
+    fast = model_registry.ServingModel(f"{version}-fast", model_artifact.load(STUDENT_DIR)[0], None,
+                                       extras={"manifest": manifest})
+    fast.warm()
+    return fast, None
+
+
+# 1️⃣f Per model version: every (team, opp, venue) probability (published
+#     versions carry theirs; the legacy model's lives in data/) and the student
+def prepare(new):
+    if new.scorer is not None:
+        ver_dir = os.path.join(model_registry.MODEL_DIR, new.version)
+        where   = matchup_matrix.paths(ver_dir) if os.path.isdir(ver_dir) else ()
+        new.extras["matrix"] = matchup_matrix.load_or_build(new.scorer, new.version, matchups, *where)
+    new.extras["fast"], new.extras["fast_error"] = load_fast(new.version)
+    if new.extras["fast_error"]:
+        app.logger.warning("Fast tier off for %s: %s", new.version, new.extras["fast_error"])
+
+
+prepare(serving)
+
+# 1️⃣g Hot reload: poll the registry every MODEL_POLL_SECONDS (0 = never)
+_poll   = float(os.getenv("MODEL_POLL_SECONDS", 10))
+watcher = model_registry.ModelWatcher(
+    holder,
+    interval=_poll,
+    use_compiled=USE_COMPILED,
+    prepare=prepare,
+    on_swap=lambda new, old: cache.set_version(new.version),
+    logger=app.logger,
+)
+
+
+@app.before_request
+def _before():
+    g.t0 = time.perf_counter()
+    metrics.start_flusher()
+    if _poll > 0:
+        watcher.ensure_started()
+
+
+@app.after_request
+def _after(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    if endpoint != "/metrics":
+        LATENCY.observe(time.perf_counter() - g.t0, endpoint=endpoint)
+    REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    return response
+
+
+# 2️⃣ Fields every row must carry (categorical ones must be strings, the rest
+#    finite numbers)
+REQUIRED = API_FIELDS
+CATEGORICAL = {"team", "opp"}
+FLAGS       = {"home", "back2back"}
+
+
+def parse_rows(req):
+    """
+    Turn the request body into (rows, is_batch).
+    Accepts a single JSON object, a JSON array of objects, or NDJSON
+    (one object per line).
+    """
+    raw = req.get_data(as_text=True)
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        # not one JSON document → try newline-delimited JSON
+        lines = [ln for ln in raw.splitlines() if ln.strip()]
+        if not lines:
+            raise ValueError("empty body")
+        return [json.loads(ln) for ln in lines], True
+
+    if isinstance(data, list):
+        return data, True
+    return [data], False
+
+
+def validate_row(row):
+    """Return (clean_row, None) or (None, error message)."""
+    if not isinstance(row, dict):
+        return None, "Row must be a JSON object"
+
+    missing = [k for k in REQUIRED if k not in row]
+    if missing:
+        return None, f"Missing required fields: {missing}"
+
+    clean = {}
+    for k in REQUIRED:
+        if k in CATEGORICAL:
+            if not isinstance(row[k], str):
+                return None, f"Field '{k}' must be a string, got {row[k]!r}"
+            clean[k] = row[k]
+            continue
+        v = row[k]
+        if isinstance(v, float) and not math.isfinite(v):
+            return None, f"Field '{k}' must be a finite number, got {v!r}"
+        if k in FLAGS:
+            # a bool or an integral 0 / 1; no strings, no truncating 1.7 → 1
+            if not isinstance(v, (bool, int, float)) or v not in (0, 1):
+                return None, f"Field '{k}' must be 0 or 1, got {v!r}"
+            clean[k] = int(v)
+            continue
+        try:
+            clean[k] = float(v)
+        except (TypeError, ValueError, OverflowError):
+            return None, f"Field '{k}' must be numeric, got {v!r}"
+        if not math.isfinite(clean[k]):
+            return None, f"Field '{k}' must be a finite number, got {v!r}"
+    return clean, None
+
+
+def predict_probs(rows, serving):
+    """Positive-class probabilities for validated rows, in one model call."""
+    ROWS.observe(len(rows), source="model_call")
+    if serving.scorer is not None:
+        with STAGE.time(stage="encode"):
+            num, cat = serving.scorer.encode(rows)
+        timings = {}
+        probs   = serving.scorer.predict_proba_arrays(num, cat, timings)[:, 1]
+        for key, dt in timings.items():
+            if key.startswith("learner:"):
+                LEARNER.observe(dt, learner=key[len("learner:"):])
+            else:
+                STAGE.observe(dt, stage=key)
+        return probs
+
+    import pandas as pd
+    with STAGE.time(stage="encode"):
+        X = pd.DataFrame(rows, columns=REQUIRED)
+    with STAGE.time(stage="sklearn_predict_proba"):
+        return serving.model.predict_proba(X)[:, 1]
+
+
+# 2️⃣b Opt-in micro-batching: coalesce concurrent requests into one model call
+#     (PREDICT_BATCHING=1, BATCH_MAX_LATENCY_MS, BATCH_MAX_SIZE)
+batcher = None
+if os.getenv("PREDICT_BATCHING", "0") == "1":
+    batcher = MicroBatcher(
+        predict_probs,
+        max_batch=int(os.getenv("BATCH_MAX_SIZE", 64)),
+        max_latency=float(os.getenv("BATCH_MAX_LATENCY_MS", 5)) / 1000,
+        on_batch=lambda n_rows, n_requests, wait: STAGE.observe(wait, stage="batch_queue"),
+    )
+    metrics.add_source("batcher", batcher.stats)
+
+
+def score_rows(rows, serving):
+    """
+    Validate all rows, answer what we can from the cache, score the rest with
+    a single predict_proba call on `serving` and return one result dict per
+    input row, in input order.
+    """
+    t0 = time.perf_counter()
+    results = [None] * len(rows)
+    valid, idx, keys = [], [], []
+    for i, row in enumerate(rows):
+        clean, err = validate_row(row)
+        if err:
+            results[i] = {"error": err}
+            ERRORS.inc(kind="invalid_row")
+            continue
+        key = None
+        if cache.enabled:
+            key = cache.key(clean, REQUIRED, serving.version)
+            hit = cache.get(key)
+            if hit is not None:
+                results[i] = {"win_probability": hit}
+                continue
+        valid.append(clean)
+        idx.append(i)
+        keys.append(key)
+    STAGE.observe(time.perf_counter() - t0, stage="validate")
+
+    if valid:
+        probs = batcher.submit(valid, serving) if batcher else predict_probs(valid, serving)
+        for i, key, p in zip(idx, keys, probs):
+            prob = round(float(p), 4)
+            results[i] = {"win_probability": prob}
+            if key is not None:
+                cache.put(key, prob)
+    return results
 
 
 @app.route("/", methods=["GET"])
@@ -22,28 +302,161 @@ def predict():
     if request.method == "GET":
         return jsonify({
             "usage": (
-                "POST JSON to /predict with keys: "
-                "team, pts_5, reb_5, ast_5, win_pct_5, "
-                "opp_win_pct_5, fg_pct_5, fg3_pct_5, ft_pct_5, pace_5, "
-                "opp_def_rtg, days_rest, back2back, home, opp"
+                f"POST JSON to /predict with keys: {', '.join(REQUIRED)}. "
+                "Send a JSON array (or NDJSON, one object per line) to score many rows at once. "
+                "Add ?tier=fast to score with the distilled student model."
             )
         }), 200
 
-    data = request.get_json(force=True)
-    required = [
-        "team",
-        "pts_5","reb_5","ast_5","win_pct_5",
-        "opp_win_pct_5","fg_pct_5","fg3_pct_5","ft_pct_5","pace_5",
-        "opp_def_rtg","days_rest","back2back","home","opp"
-    ]
-    missing = [k for k in required if k not in data]
-    if missing:
-        return jsonify(error=f"Missing required fields: {missing}"), 400
+    try:
+        with STAGE.time(stage="parse"):
+            rows, is_batch = parse_rows(request)
+    except ValueError:
+        ERRORS.inc(kind="bad_body")
+        return jsonify(error="Body must be a JSON object, a JSON array or NDJSON"), 400
+    ROWS.observe(len(rows), source="request")
+
+    tier = request.args.get("tier", "full")
+    if tier not in ("full", "fast"):
+        ERRORS.inc(kind="bad_tier")
+        return jsonify(error="'tier' must be 'full' or 'fast'"), 400
+    # 3️⃣ Score every row in one vectorized pass, all on the same model
+    serving = holder.current
+    if tier == "fast":
+        if serving.extras.get("fast") is None:
+            return jsonify(error=f"Fast tier unavailable: {serving.extras.get('fast_error')}"), 503
+        serving = serving.extras["fast"]
+    results = score_rows(rows, serving)
+
+    if not is_batch:
+        res = results[0]
+        if "error" in res:
+            return jsonify(error=res["error"], model_version=serving.version, tier=tier), 400
+        return jsonify(win_probability=res["win_probability"],
+                       model_version=serving.version, tier=tier), 200
+
+    n_err = sum("error" in r for r in results)
+    return jsonify(
+        predictions=results,
+        count=len(results),
+        errors=n_err,
+        model_version=serving.version,
+        tier=tier,
+    ), 200
+
+
+@app.route("/api/predict", methods=["POST"])
+def predict_matchup():
+    """
+    Score a matchup from {team, opponent, home_away} using each team's latest
+    rolling features. Optional keys (days_rest, back2back, …) override the
+    looked-up values.
+    """
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify(error="Body must be a JSON object"), 400
+
+    # check before normalizing: str(None) would become the team code "NONE"
+    team = data.get("team")
+    opp  = data.get("opponent", data.get("opp"))
+    if not all(isinstance(v, str) and v.strip() for v in (team, opp)):
+        return jsonify(error="Both 'team' and 'opponent' are required, as team codes"), 400
+    team, opp = team.strip().upper(), opp.strip().upper()
+    if team == opp:
+        return jsonify(error=f"'team' and 'opponent' must differ, got {team} twice"), 400
+
+    venue = data.get("home_away", data.get("home", "home"))
+    if isinstance(venue, str):
+        if venue.lower() not in ("home", "away"):
+            return jsonify(error="'home_away' must be 'home' or 'away'"), 400
+        home = venue.lower() == "home"
+    else:
+        home = bool(venue)
+
+    overrides = {k: data[k] for k in REQUIRED
+                 if k in data and k not in ("team", "opp", "home")}
+    try:
+        row = matchups.row(team, opp, home, **overrides)
+    except KeyError as exc:
+        return jsonify(error=f"Unknown team code: {exc.args[0]}",
+                       teams=matchups.teams), 404
+
+    # no what-if overrides → answer straight from the precomputed matrix
+    serving = holder.current
+    matrix  = serving.extras.get("matrix")
+    prob    = None
+    if matrix is not None and not overrides:
+        prob = matrix.lookup(row["team"], row["opp"], row["home"])
+    if prob is None:
+        res = score_rows([row], serving)[0]
+        if "error" in res:
+            return jsonify(error=res["error"], model_version=serving.version), 400
+        prob = res["win_probability"]
+    return jsonify(
+        win_probability=round(prob, 4),
+        team=row["team"],
+        opponent=row["opp"],
+        home=row["home"],
+        as_of=matchups.as_of[row["team"]],
+        model_version=serving.version,
+    ), 200
+
+
+@app.route("/matchups", methods=["GET"])
+def all_matchups():
+    """The whole precomputed grid, or one team's row with ?team=XXX."""
+    matrix = holder.current.extras.get("matrix")
+    if matrix is None:
+        return jsonify(error="Matchup matrix unavailable (compiled scorer disabled)"), 503
+    grid = matrix.to_json()
+    team = request.args.get("team")
+    if team:
+        team = team.strip().upper()
+        if team not in grid:
+            return jsonify(error=f"Unknown team code: {team}", teams=matrix.teams), 404
+        grid = {team: grid[team]}
+    return jsonify(matchups=grid, teams=matrix.teams,
+                   model_version=holder.current.version, **matrix.meta), 200
+
+
+@app.route("/model", methods=["GET"])
+def model_info():
+    current = holder.current
+    fast    = current.extras.get("fast")
+    return jsonify(
+        model_version=current.version,
+        compiled=current.scorer is not None,
+        swaps=holder.swaps,
+        reload_interval_s=_poll,
+        last_reload_error=watcher.last_error,
+        fast_tier=fast and {
+            "model_version":   fast.version,
+            "teacher_version": fast.extras["manifest"]["source_version"],
+            "fidelity":        fast.extras["manifest"]["fidelity"],
+        },
+        fast_tier_error=current.extras.get("fast_error"),
+    ), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+# the stats endpoints sum over every worker (metrics.sources); `workers` has
+# each one's own numbers, keyed by pid
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    per = metrics.sources("cache")
+    return jsonify(**PredictionCache.merge_stats(list(per.values())), workers=per), 200
+
 
-    # 2️⃣ Build a DataFrame with exactly those columns
-    X = pd.DataFrame([{k: data[k] for k in required}])
-    prob = model.predict_proba(X)[0, 1]
-    return jsonify(win_probability=round(float(prob), 4)), 200
+@app.route("/batcher/stats", methods=["GET"])
+def batcher_stats():
+    if batcher is None:
+        return jsonify(enabled=False), 200
+    per = metrics.sources("batcher")
+    return jsonify(enabled=True, **MicroBatcher.merge_stats(list(per.values())), workers=per), 200
 
 
 if __name__ == "__main__":
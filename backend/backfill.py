@@ -0,0 +1,174 @@
+# backend/backfill.py
+"""
+Multi-season backfill: fetch → merge → features for a list of seasons.
+
+Each season is an independent chunk:
+  1. fetch   every team's log for the season from stats.nba.com into the
+             columnar store (storage.py, one gamelog partition per season).
+             One season at a time, politely; seasons already complete in
+             the store (every team present, every game with both sides)
+             are skipped, incomplete ones are fetched again.
+  2. build   the season's feature rows (feature_engine.build_features) and
+             write them as that season's features partition. Seasons are
+             spread over worker processes, and a worker only ever loads its
+             own season (plus, with --policy carry, a short tail of the one
+             before). Peak memory per worker is one season, however long
+             the history; the parent never holds more than the season list.
+
+Rolling windows and season boundaries (--policy):
+  reset   every team's windows restart at the season's first game, exactly
+          like the single-season build; the first games of each season
+          have no full window and are dropped.
+  carry   windows run on across the boundary: the last CARRY_GAMES games
+          of each team's previous season are prepended, so game 1 already
+          has its 3/5/10/20-game windows. EWMAs start from those games
+          (the weight left out is < 2% at the longest half-life), and
+          days_rest on opening night is the off-season gap.
+
+Training reads the result straight from the store, e.g.
+`storage.load_features(seasons=[...])`.
+
+    python backend/backfill.py 2005-06:2024-25 --workers 2 --policy carry
+    python backend/backfill.py 2023-24 2024-25 --no-fetch
+"""
+
+import os
+import time
+import resource
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import storage
+from feature_engine import build_features
+from feature_registry import WINDOWS, HALFLIVES
+
+POLICIES    = ("reset", "carry")
+CARRY_GAMES = max(max(WINDOWS), 6 * max(HALFLIVES))
+
+
+def season_range(spec):
+    """"2005-06:2024-25" → ["2005-06", …, "2024-25"]; a single season passes through."""
+    first, _, last = spec.partition(":")
+    start, end = int(first[:4]), int((last or first)[:4])
+    return [f"{y}-{(y + 1) % 100:02d}" for y in range(start, end + 1)]
+
+
+def previous(season):
+    y = int(season[:4]) - 1
+    return f"{y}-{(y + 1) % 100:02d}"
+
+
+def stored_seasons(root=storage.GAMELOG_DIR):
+    if not os.path.isdir(root):
+        return set()
+    return {e.name.split("=", 1)[1] for e in os.scandir(root) if e.name.startswith("season=")}
+
+
+def gaps(season, teams, root=storage.GAMELOG_DIR):
+    """Why `season`'s stored log is incomplete; [] if every team in `teams`
+    has rows and every game has both teams' rows."""
+    have = storage.load_gamelog(columns=["team", "Game_ID"], seasons=[season], root=root)
+    if have.empty:
+        return ["not in the store"]
+    out     = []
+    missing = set(teams) - set(have["team"].astype(str))
+    if missing:
+        out.append(f"no rows for {', '.join(sorted(missing))}")
+    lone = int((have["Game_ID"].value_counts() != 2).sum())
+    if lone:
+        out.append(f"{lone} games without both teams")
+    return out
+
+
+def fetch(seasons, pause=2.0):
+    """Fetch the seasons missing from the store, or incomplete in it, one after another."""
+    from data.fetch_all_team_logs import fetch_all_team_logs, team_list   # needs nba_api
+
+    teams = [t["abbreviation"] for t in team_list()]
+    have  = stored_seasons()
+    for season in seasons:
+        if season in have:
+            why = gaps(season, teams)
+            if not why:
+                print(f"  {season}: already in the store")
+                continue
+            print(f"  {season}: incomplete in the store ({'; '.join(why)}), fetching again")
+        # a team that fails again keeps its stored rows; the next run retries it
+        fetch_all_team_logs(season, write_csv=False)
+        why = gaps(season, teams)
+        if why:
+            print(f"⚠️  {season} still incomplete ({'; '.join(why)}); rerun to retry")
+        time.sleep(pause)
+
+
+def build_season(season, policy="reset", log_root=storage.GAMELOG_DIR,
+                 features_root=storage.FEATURES_DIR):
+    """Feature rows for one season → its features partition. Runs in a worker."""
+    t0  = time.perf_counter()
+    raw = storage.load_gamelog(seasons=[season], root=log_root)
+    if raw.empty:
+        raise ValueError(f"{season} is not in {log_root}; fetch it first")
+    first = raw["GAME_DATE"].min()
+
+    carried = 0
+    if policy == "carry":
+        prev = storage.load_gamelog(seasons=[previous(season)], root=log_root)
+        if not prev.empty:
+            tail    = prev.sort_values(["team", "GAME_DATE"]).groupby("team", observed=True).tail(CARRY_GAMES)
+            carried = len(tail)
+            raw     = pd.concat([tail, raw], ignore_index=True)
+
+    # team codes from different seasons may not share categories
+    raw["team"] = raw["team"].astype(str)
+    feats = build_features(raw)
+    feats = feats[feats["GAME_DATE"] >= first]
+    storage.write_features(feats.assign(season=season), features_root)
+    return {
+        "season":   season,
+        "games":    int((raw["GAME_DATE"] >= first).sum()),
+        "carried":  carried,
+        "rows":     len(feats),
+        "seconds":  round(time.perf_counter() - t0, 2),
+        "peak_mb":  round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def backfill(seasons, policy="reset", workers=None, do_fetch=True,
+             log_root=storage.GAMELOG_DIR, features_root=storage.FEATURES_DIR):
+    if policy not in POLICIES:
+        raise ValueError(f"policy must be one of {POLICIES}")
+
+    # 1️⃣ fetch (network-bound and rate-limited: sequential)
+    if do_fetch:
+        fetch(seasons)
+
+    # 2️⃣ build, one season per task; results come back as small dicts
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_season, s, policy, log_root, features_root) for s in seasons]
+        for fut in futures:
+            r = fut.result()
+            print(f"  {r['season']}: {r['games']:5d} games → {r['rows']:5d} rows "
+                  f"(+{r['carried']} carried) in {r['seconds']:.1f}s, worker peak {r['peak_mb']:.0f} MB")
+            results.append(r)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Multi-season fetch → features backfill")
+    ap.add_argument("seasons", nargs="+", help='seasons ("2023-24") or ranges ("2005-06:2024-25")')
+    ap.add_argument("--policy", choices=POLICIES, default="reset",
+                    help="rolling windows at season boundaries (default: reset)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count(),
+                    help="parallel season builds (default: one per CPU)")
+    ap.add_argument("--no-fetch", action="store_true", help="only build from seasons already in the store")
+    args = ap.parse_args()
+
+    seasons = [s for spec in args.seasons for s in season_range(spec)]
+    t0 = time.perf_counter()
+    out = backfill(seasons, args.policy, args.workers, not args.no_fetch)
+    print(f"✅ {len(out)} seasons, {sum(r['rows'] for r in out)} feature rows in "
+          f"{time.perf_counter() - t0:.1f}s → {storage.FEATURES_DIR}")
@@ -0,0 +1,156 @@
+# backend/batcher.py
+"""
+Micro-batching request coalescer.
+
+Concurrent callers `submit()` their validated rows (plus the model object
+they should be scored with); a single worker thread
+waits for the first request, keeps collecting for up to `max_latency`
+seconds or until `max_batch` rows are queued, scores everything with one
+call to `score_fn`, and hands each caller back its own slice. The tree
+learners in the ensemble cost far less per row on a matrix than on
+single rows, so this trades a few ms of queueing for throughput at peak.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# upper bounds of the batch-size histogram buckets
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    def __init__(self, score_fn, max_batch=64, max_latency=0.005, on_batch=None):
+        self.score_fn    = score_fn
+        self.on_batch    = on_batch   # called with (rows, requests, mean queue wait s)
+        self.max_batch   = max_batch
+        self.max_latency = max_latency
+        self._queue  = queue.Queue()
+        self._lock   = threading.Lock()
+        self._thread = None
+        self._pid    = None
+
+        self.batches    = 0
+        self.rows       = 0
+        self.requests   = 0
+        self.size_hist  = [0] * (len(SIZE_BUCKETS) + 1)   # last bucket = +Inf
+        self.wait_total = 0.0
+
+    def _ensure_worker(self):
+        # started lazily (and again after a fork) so pre-fork servers work
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue  = queue.Queue()
+                self._pid    = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, rows, ctx=None):
+        """
+        Block until `rows` have been scored as part of some batch.
+        Rows are only ever batched with rows carrying the same `ctx`, which is
+        passed through as `score_fn(rows, ctx)`.
+        """
+        self._ensure_worker()
+        fut = Future()
+        self._queue.put((rows, ctx, fut, time.perf_counter()))
+        return fut.result()
+
+    def _collect(self):
+        items = [self._queue.get()]
+        n     = len(items[0][0])
+        deadline = time.perf_counter() + self.max_latency
+        while n < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            items.append(item)
+            n += len(item[0])
+        return items, n
+
+    def _run(self):
+        while True:
+            items, _ = self._collect()
+            groups = {}
+            for item in items:
+                groups.setdefault(id(item[1]), []).append(item)
+            for group in groups.values():
+                self._score(group)
+
+    def _score(self, items):
+        rows  = [r for batch, _, _, _ in items for r in batch]
+        start = time.perf_counter()
+        try:
+            out = self.score_fn(rows, items[0][1])
+        except Exception as exc:   # hand the failure to every waiting caller
+            for _, _, fut, _ in items:
+                fut.set_exception(exc)
+            return
+
+        self._record(items, len(rows), start)
+        pos = 0
+        for batch, _, fut, _ in items:
+            fut.set_result(out[pos:pos + len(batch)])
+            pos += len(batch)
+
+    def _record(self, items, n, start):
+        wait = sum(start - t for _, _, _, t in items)
+        if self.on_batch:
+            self.on_batch(n, len(items), wait / len(items))
+        with self._lock:
+            self.batches  += 1
+            self.rows     += n
+            self.requests += len(items)
+            self.wait_total += wait
+            for b, upper in enumerate(SIZE_BUCKETS):
+                if n <= upper:
+                    self.size_hist[b] += 1
+                    break
+            else:
+                self.size_hist[-1] += 1
+
+    def stats(self):
+        with self._lock:
+            labels = [f"<={u}" for u in SIZE_BUCKETS] + [f">{SIZE_BUCKETS[-1]}"]
+            return {
+                "max_batch":      self.max_batch,
+                "max_latency_ms": self.max_latency * 1000,
+                "batches":        self.batches,
+                "requests":       self.requests,
+                "rows":           self.rows,
+                "mean_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "mean_queue_wait_ms": (
+                    round(1000 * self.wait_total / self.requests, 3) if self.requests else 0.0
+                ),
+                "batch_size_histogram": [
+                    {"rows": label, "batches": c} for label, c in zip(labels, self.size_hist)
+                ],
+            }
+
+    @staticmethod
+    def merge_stats(stats):
+        """One `stats()` dict for several processes' batchers (counts summed)."""
+        batches  = sum(s["batches"] for s in stats)
+        requests = sum(s["requests"] for s in stats)
+        rows     = sum(s["rows"] for s in stats)
+        wait_ms  = sum(s["mean_queue_wait_ms"] * s["requests"] for s in stats)
+        hist     = [dict(b, batches=sum(s["batch_size_histogram"][i]["batches"] for s in stats))
+                    for i, b in enumerate(stats[0]["batch_size_histogram"])] if stats else []
+        return {
+            "max_batch":      stats[0]["max_batch"] if stats else None,
+            "max_latency_ms": stats[0]["max_latency_ms"] if stats else None,
+            "batches":        batches,
+            "requests":       requests,
+            "rows":           rows,
+            "mean_batch_rows": round(rows / batches, 2) if batches else 0.0,
+            "mean_queue_wait_ms": round(wait_ms / requests, 3) if requests else 0.0,
+            "batch_size_histogram": hist,
+        }
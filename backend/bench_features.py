@@ -0,0 +1,99 @@
+# backend/bench_features.py
+"""
+Rolling-feature benchmark: per-column groupby lambdas vs feature_engine.
+
+    python backend/bench_features.py [--seasons 20] [--runs 3]
+
+Cases:
+  1 season    the real merged 2024-25 game log
+  N seasons   synthetic: the real log repeated N times, one season per
+              year, with the box-score columns resampled so no two seasons
+              are the same
+
+Each case runs twice: the eight 5-game rolling means per team, then every
+registry window (feature_registry.WINDOWS and HALFLIVES) for the same eight
+columns. The lambdas take one pass per column and window; the engine takes
+one pass in total. Both sides must agree exactly (NaNs in the same places);
+the script fails otherwise.
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from feature_engine import window_stats
+from feature_registry import WINDOWS, HALFLIVES
+
+HERE   = os.path.dirname(os.path.abspath(__file__))
+LOG    = os.path.join(HERE, "data", "all_teams_202425_gamelog.csv")
+COLS   = ["PTS", "REB", "AST", "W", "FG_PCT", "FG3_PCT", "FT_PCT", "poss"]
+WINDOW = 5
+
+
+def load_season():
+    df = pd.read_csv(LOG, parse_dates=["GAME_DATE"])
+    df["W"]    = (df["WL"] == "W").astype(int)
+    df["poss"] = df["FGA"] + df["TOV"] + 0.4*df["FTA"] - df["OREB"]
+    return df[["team", "GAME_DATE"] + COLS]
+
+
+def synthetic(season, n_seasons, seed=0):
+    rng   = np.random.default_rng(seed)
+    parts = []
+    for k in range(n_seasons):
+        s = season.copy()
+        s["GAME_DATE"] = s["GAME_DATE"] - pd.DateOffset(years=n_seasons - 1 - k)
+        for c in COLS:
+            s[c] = season[c].to_numpy()[rng.integers(0, len(season), len(season))]
+        parts.append(s)
+    return pd.concat(parts, ignore_index=True)
+
+
+def with_lambdas(df, windows, halflives):
+    df   = df.sort_values(["team", "GAME_DATE"])
+    grp  = df.groupby("team", group_keys=False)
+    outs = [pd.DataFrame({c: grp[c].transform(lambda x: x.rolling(w).mean()) for c in COLS})
+            for w in windows]
+    outs += [pd.DataFrame({c: grp[c].transform(lambda x: x.ewm(halflife=h).mean()) for c in COLS})
+             for h in halflives]
+    return np.hstack([o.to_numpy() for o in outs])
+
+
+def with_engine(df, windows, halflives):
+    df = df.sort_values(["team", "GAME_DATE"])
+    return np.hstack([o.to_numpy() for o in window_stats(df, "team", COLS, windows, halflives).values()])
+
+
+def best_of(fn, df, runs, *args):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn(df, *args)
+        times.append(time.perf_counter() - t0)
+    return min(times), out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seasons", type=int, default=20)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    season = load_season()
+    cases  = [("1 season", season), (f"{args.seasons} seasons", synthetic(season, args.seasons))]
+    specs  = [("5 only", (WINDOW,), ()), ("registry", WINDOWS, HALFLIVES)]
+    for name, df in cases:
+        for label, windows, halflives in specs:
+            t_pd, ref = best_of(with_lambdas, df, args.runs, windows, halflives)
+            t_fe, got = best_of(with_engine, df, args.runs, windows, halflives)
+            same = np.array_equal(ref, got, equal_nan=True)
+            if not same:
+                raise AssertionError(f"{name}, {label}: feature_engine output differs from pandas")
+            print(f"{name:11s} {label:8s} {len(df):7d} rows   lambdas {t_pd * 1000:8.1f} ms   "
+                  f"engine {t_fe * 1000:7.1f} ms   ×{t_pd / t_fe:5.1f}   identical={same}")
+
+
+if __name__ == "__main__":
+    main()
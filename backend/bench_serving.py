@@ -0,0 +1,156 @@
+# backend/bench_serving.py
+"""
+Throughput + memory comparison of the ways to run the API.
+
+    python backend/bench_serving.py [--seconds 15] [--clients 32] [--workers 2]
+
+For each setup it starts the server, fires single-row /predict requests
+from `--clients` keep-alive client threads for `--seconds`, then reads
+RSS / PSS / USS of every server process from /proc/<pid>/smaps_rollup
+(Linux only). USS = memory unique to one process, i.e. what one more
+worker actually costs.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import subprocess
+import http.client
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+ROW = {
+    "team": "BOS", "opp": "NYK", "home": 1,
+    "pts_5": 115.2, "reb_5": 45.0, "ast_5": 26.4, "win_pct_5": 0.6,
+    "opp_win_pct_5": 0.4, "fg_pct_5": 0.47, "fg3_pct_5": 0.37, "ft_pct_5": 0.8,
+    "pace_5": 100.5, "opp_def_rtg": 112.0, "days_rest": 2, "back2back": 0,
+}
+BODY = json.dumps(ROW)
+
+
+def _children(pid):
+    out = []
+    for tid in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                out += [int(c) for c in f.read().split()]
+        except FileNotFoundError:
+            pass
+    return out
+
+
+def _mem(pid):
+    vals = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                vals[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    uss = vals.get("Private_Clean", 0) + vals.get("Private_Dirty", 0)
+    return {"rss": vals.get("Rss", 0), "pss": vals.get("Pss", 0), "uss": uss}
+
+
+def _post(conn, path, body):
+    conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+    r = conn.getresponse()
+    r.read()
+    if r.status != 200:
+        raise RuntimeError(f"{path} → HTTP {r.status}")
+
+
+def _wait_up(port, proc, timeout=120):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not come up")
+
+
+def _load(port, seconds, clients):
+    lat, stop = [], time.time() + seconds
+    lock = threading.Lock()
+
+    def client():
+        conn, mine = http.client.HTTPConnection("127.0.0.1", port), []
+        while time.time() < stop:
+            t0 = time.perf_counter()
+            _post(conn, "/predict", BODY)
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            lat.extend(mine)
+
+    ts = [threading.Thread(target=client) for _ in range(clients)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    lat.sort()
+    return {
+        "rps": len(lat) / seconds,
+        "p50_ms": 1000 * lat[len(lat) // 2],
+        "p99_ms": 1000 * lat[int(len(lat) * 0.99)],
+    }
+
+
+def run(name, cmd, env, port, seconds, clients):
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        _wait_up(port, proc)
+        _post(http.client.HTTPConnection("127.0.0.1", port), "/predict", BODY)   # warm up
+        res  = _load(port, seconds, clients)
+        pids = [proc.pid] + _children(proc.pid)
+        # flask run: the server is the launched process itself; gunicorn:
+        # report the workers (the master only supervises)
+        workers = pids[1:] or pids
+        mems = [_mem(p) for p in workers]
+        res["procs"] = len(workers)
+        for k in ("rss", "pss", "uss"):
+            res[k] = [round(m[k]) for m in mems]
+        print(f"{name:34s} {res['rps']:7.0f} req/s  p50 {res['p50_ms']:6.1f} ms  "
+              f"p99 {res['p99_ms']:6.1f} ms  RSS {res['rss']} MB  USS {res['uss']} MB  PSS {res['pss']} MB")
+        return res
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=int, default=15)
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--port", type=int, default=5077)
+    args = ap.parse_args()
+
+    env = dict(os.environ, PREDICT_CACHE_SIZE="0", MODEL_POLL_SECONDS="0", PYTHONWARNINGS="ignore")
+    gconf = os.path.join(HERE, "gunicorn.conf.py")
+    gcmd  = [sys.executable, "-m", "gunicorn", "--config", gconf, "--chdir", HERE,
+             "--bind", f"127.0.0.1:{args.port}", "--access-logfile", "/dev/null", "app:app"]
+    setups = [
+        ("flask run (original Procfile)",
+         [sys.executable, "-m", "flask", "run", "--port", str(args.port)],
+         dict(env, FLASK_APP="backend/app.py")),
+        ("gunicorn 1 worker",
+         gcmd, dict(env, WEB_CONCURRENCY="1")),
+        (f"gunicorn {args.workers} workers, preload",
+         gcmd, dict(env, WEB_CONCURRENCY=str(args.workers))),
+    ]
+    for name, cmd, e in setups:
+        run(name, cmd, e, args.port, args.seconds, args.clients)
+
+
+if __name__ == "__main__":
+    main()
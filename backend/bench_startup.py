@@ -0,0 +1,94 @@
+# backend/bench_startup.py
+"""
+Cold-start benchmark: wall time from launching a fresh interpreter to the
+first /predict answer, for each way the API can load its model.
+
+    python backend/bench_startup.py [--runs 3]
+
+Modes:
+  pickle      import pandas + joblib, unpickle the ensemble, predict_proba
+              on a one-row DataFrame (what app.py did originally)
+  compile     import app.py with no artifact: unpickle, compile, verify
+  artifact    import app.py with the exported NumPy artifact
+  registry    import app.py with the versioned model directory (models/),
+              when a version is published there
+
+Every mode but registry points MODEL_DIR at an empty directory, since
+app.py prefers a published version over the pickle and its artifact.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ROW = {
+    "team": "BOS", "opp": "NYK", "home": 1,
+    "pts_5": 115.2, "reb_5": 45.0, "ast_5": 26.4, "win_pct_5": 0.6,
+    "opp_win_pct_5": 0.4, "fg_pct_5": 0.47, "fg3_pct_5": 0.37, "ft_pct_5": 0.8,
+    "pace_5": 100.5, "opp_def_rtg": 112.0, "days_rest": 2, "back2back": 0,
+}
+
+PICKLE = f"""
+import joblib, pandas as pd
+m = joblib.load({os.path.join(HERE, "model_global_ensemble_calibrated.pkl")!r})
+print(m.predict_proba(pd.DataFrame([{ROW!r}]))[0, 1])
+"""
+
+APP = f"""
+import sys
+sys.path.insert(0, {HERE!r})
+from app import app
+print(app.test_client().post("/predict", json={ROW!r}).get_json()["win_probability"])
+"""
+
+
+def run(code, env):
+    t0  = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    dt  = time.perf_counter() - t0
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr)
+    return dt, out.stdout.strip().splitlines()[-1]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    base  = dict(os.environ, PYTHONWARNINGS="ignore", PREDICT_CACHE_SIZE="0")
+    empty = tempfile.TemporaryDirectory(prefix="no_models_")
+    legacy = dict(base, MODEL_DIR=empty.name)
+    modes = {
+        "pickle":   (PICKLE, legacy),
+        "compile":  (APP, dict(legacy, MODEL_ARTIFACT_DIR=os.path.join(empty.name, "no_artifact"))),
+        "artifact": (APP, legacy),
+    }
+    registry = os.path.join(os.getenv("MODEL_DIR", os.path.join(HERE, "models")), "manifest.json")
+    if os.path.exists(registry):
+        with open(registry) as f:
+            if json.load(f).get("current"):
+                modes["registry"] = (APP, base)
+
+    results = {}
+    with empty:
+        for name, (code, env) in modes.items():
+            times = []
+            for _ in range(args.runs):
+                dt, answer = run(code, env)
+                times.append(dt)
+            results[name] = {"best_s": round(min(times), 3), "mean_s": round(sum(times) / len(times), 3),
+                             "answer": answer}
+            print(f"{name:9s}  best {min(times):6.2f}s  mean {sum(times) / len(times):6.2f}s  → {answer}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,17 @@
-import pandas as pd
 import joblib
 from sklearn.calibration import CalibratedClassifierCV
 
-# 1. Load your richer features
-df = pd.read_csv(
-    "backend/data/all_teams_features_richer_2025.csv",
-    parse_dates=["GAME_DATE"]
-).sort_values("GAME_DATE")
+import storage
+from feature_registry import FEATURES
+
+# 1. Load your richer features (typed, only the model's columns)
+df = storage.load_features(columns=["GAME_DATE", "W"] + FEATURES).sort_values("GAME_DATE")
 
 # 2. Split off the last 20% of the data as a calibration set
 split = int(len(df) * 0.8)
 train, cal = df.iloc[:split], df.iloc[split:]
 
-# 3. Define the features and target
-FEATURES = [
-  "pts_5","reb_5","ast_5","win_pct_5","opp_win_pct_5",
-  "fg_pct_5","fg3_pct_5","ft_pct_5","pace_5",
-  "days_rest","back2back","home","team","opp"
-]
+# 3. Features (see feature_registry.py) and target
 X_train, y_train = train[FEATURES], train["W"]
 X_cal,   y_cal   = cal[FEATURES],   cal["W"]
 
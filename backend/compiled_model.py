@@ -0,0 +1,384 @@
+# backend/compiled_model.py
+"""
+Pandas-free scorer for the calibrated LR/XGB/RF ensemble.
+
+`CompiledEnsemble.from_calibrated()` unpacks a fitted
+`CalibratedClassifierCV(Pipeline(prep, VotingClassifier))` into plain NumPy
+arrays once (scaler means/scales, one-hot index maps, LR weights, the RF
+and XGB trees flattened into one node table per learner, and the Platt
+sigmoid parameters), so scoring a row is a handful of array ops instead of
+DataFrame construction + ColumnTransformer + sklearn validation.
+
+Only NumPy is needed to score; sklearn/xgboost are imported lazily, when
+compiling from the pickle. `state()` / `from_state()` expose everything as
+arrays + JSON-able metadata for `model_artifact`.
+"""
+
+import time
+import numpy as np
+
+
+def _expit(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class _FlatTrees:
+    """
+    A list of binary trees in one flat node table. Leaves point at
+    themselves, so walking every tree `depth` steps is always safe and all
+    trees × rows are advanced together with fancy indexing.
+    """
+
+    ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth, strict):
+        self.feature   = feature
+        self.threshold = threshold
+        self.left      = left
+        self.right     = right
+        self.value     = value
+        self.roots     = roots
+        self.depth     = depth
+        self.strict    = strict   # XGBoost splits on x < t, sklearn on x <= t
+
+    @classmethod
+    def build(cls, trees, strict, thr_dtype):
+        """trees: iterable of (left, right, feature, threshold, value) with -1 for leaves."""
+        feats, thrs, lefts, rights, vals, roots = [], [], [], [], [], []
+        offset, depth = 0, 0
+        for left, right, feat, thr, val in trees:
+            left, right = np.asarray(left), np.asarray(right)
+            n    = len(left)
+            idx  = np.arange(n)
+            leaf = left == -1
+            lefts.append(np.where(leaf, idx, left) + offset)
+            rights.append(np.where(leaf, idx, right) + offset)
+            feats.append(np.where(leaf, 0, feat))
+            thrs.append(np.asarray(thr, dtype=thr_dtype))
+            vals.append(np.asarray(val))
+            roots.append(offset)
+            offset += n
+            depth   = max(depth, _tree_depth(left, right))
+        return cls(
+            np.concatenate(feats).astype(np.intp),
+            np.concatenate(thrs),
+            np.concatenate(lefts).astype(np.intp),
+            np.concatenate(rights).astype(np.intp),
+            np.concatenate(vals),
+            np.asarray(roots, dtype=np.intp),
+            depth, strict,
+        )
+
+    def leaves(self, X):
+        """(n_trees, n_rows) leaf values for X (already in the tree's dtype)."""
+        rows = np.arange(X.shape[0])[None, :]
+        node = np.repeat(self.roots[:, None], X.shape[0], axis=1)
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            t = self.threshold[node]
+            go_left = x < t if self.strict else x <= t
+            node    = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+    def state(self):
+        return {k: getattr(self, k) for k in self.ARRAYS}, {"depth": self.depth, "strict": self.strict}
+
+    @classmethod
+    def from_state(cls, arrays, meta):
+        return cls(*(arrays[k] for k in cls.ARRAYS), meta["depth"], meta["strict"])
+
+
+def _tree_depth(left, right):
+    depth, level = 0, [0]
+    while True:
+        level = [c for n in level for c in (left[n], right[n]) if c != -1]
+        if not level:
+            return depth
+        depth += 1
+
+
+def _forest_trees(forest):
+    for est in forest.estimators_:
+        t   = est.tree_
+        val = t.value[:, 0, :]
+        yield t.children_left, t.children_right, t.feature, t.threshold, val[:, 1] / val.sum(axis=1)
+
+
+def _booster_trees(booster):
+    import json
+
+    model = json.loads(booster.save_raw("json"))["learner"]
+    if model["objective"]["name"] != "binary:logistic":
+        raise ValueError(f"Can't compile XGBoost objective {model['objective']['name']}")
+    base = float(model["learner_model_param"]["base_score"].strip("[]"))
+    base_margin = float(np.float32(-np.log(1.0 / base - 1.0)))
+
+    def trees():
+        for t in model["gradient_booster"]["model"]["trees"]:
+            left  = np.array(t["left_children"])
+            # leaf values live in split_conditions for leaf nodes
+            cond  = np.array(t["split_conditions"], dtype=np.float32)
+            yield left, t["right_children"], t["split_indices"], cond, cond
+    return trees(), base_margin
+
+
+class _Learner:
+    """One base learner of the soft vote, reduced to NumPy."""
+
+    def __init__(self, name, kind, arrays, meta):
+        self.name, self.kind, self.arrays, self.meta = name, kind, arrays, meta
+        if kind in ("rf", "xgb"):
+            self.trees = _FlatTrees.from_state(arrays, meta)
+
+    @classmethod
+    def from_estimator(cls, name, est):
+        kind = type(est).__name__
+        if kind == "LogisticRegression":
+            return cls(name, "lr", {"coef": est.coef_.ravel().copy(),
+                                    "intercept": est.intercept_.copy()}, {})
+        if kind == "RandomForestClassifier":
+            trees = _FlatTrees.build(_forest_trees(est), strict=False, thr_dtype=np.float64)
+            arrays, meta = trees.state()
+            return cls(name, "rf", arrays, meta)
+        if kind == "XGBClassifier":
+            it, base_margin = _booster_trees(est.get_booster())
+            trees = _FlatTrees.build(it, strict=True, thr_dtype=np.float32)
+            arrays, meta = trees.state()
+            return cls(name, "xgb", arrays, dict(meta, base_margin=base_margin))
+        raise ValueError(f"Can't compile base learner {kind}")
+
+    def predict(self, X):
+        if self.kind == "lr":
+            return _expit(X @ self.arrays["coef"] + self.arrays["intercept"][0])
+        if self.kind == "rf":
+            # sklearn evaluates trees on float32 inputs
+            X32 = X.astype(np.float32).astype(np.float64)
+            return self.trees.leaves(X32).mean(axis=0)
+        # XGBoost: float32 inputs, leaf values summed tree by tree in float32
+        leaves = self.trees.leaves(X.astype(np.float32))
+        leaves[0] += np.float32(self.meta["base_margin"])
+        margin = np.cumsum(leaves, axis=0, dtype=np.float32)[-1]
+        return _expit(margin).astype(np.float64)
+
+
+def _add(timings, key, dt):
+    timings[key] = timings.get(key, 0.0) + dt
+
+
+class _CompiledFold:
+    """One calibrated fold: preprocessing + soft vote + Platt sigmoid."""
+
+    def __init__(self, num_idx, mean, scale, num_pos, cat_maps, n_out, learners, a, b):
+        self.num_idx  = num_idx
+        self.mean     = mean
+        self.scale    = scale
+        self.num_pos  = num_pos
+        self.cat_maps = cat_maps   # [(categorical column index, {value: output column})]
+        self.n_out    = n_out
+        self.learners = learners
+        self.a, self.b = a, b
+
+    @classmethod
+    def from_sklearn(cls, calibrated_clf, numeric, categorical):
+        from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+        pipe = calibrated_clf.estimator
+        prep = pipe.named_steps["prep"]
+        vote = pipe.named_steps["clf"]
+
+        if prep.remainder != "drop":
+            raise ValueError("Only remainder='drop' ColumnTransformers can be compiled")
+
+        # 1️⃣ preprocessing → column positions in the transformed matrix
+        n_out, num_pos, cat_maps = 0, None, []
+        num_idx = mean = scale = np.zeros(0)
+        for name, trans, cols in prep.transformers_:
+            if name == "remainder" or trans == "drop":
+                continue
+            if isinstance(trans, StandardScaler):
+                num_idx = np.array([numeric.index(c) for c in cols])
+                mean    = trans.mean_ if trans.with_mean else np.zeros(len(cols))
+                scale   = trans.scale_ if trans.with_std else np.ones(len(cols))
+                num_pos = n_out
+                n_out  += len(cols)
+            elif isinstance(trans, OneHotEncoder):
+                for col, cats in zip(cols, trans.categories_):
+                    index = {c.item() if hasattr(c, "item") else c: n_out + j
+                             for j, c in enumerate(cats)}
+                    cat_maps.append((categorical.index(col), index))
+                    n_out += len(cats)
+            else:
+                raise ValueError(f"Can't compile transformer {type(trans).__name__}")
+
+        # 2️⃣ base learners
+        if vote.voting != "soft" or vote.weights is not None:
+            raise ValueError("Only unweighted soft voting can be compiled")
+        learners = [_Learner.from_estimator(name, est)
+                    for (name, _), est in zip(vote.estimators, vote.estimators_)]
+
+        # 3️⃣ Platt scaling
+        cal = calibrated_clf.calibrators[0]
+        return cls(num_idx, mean, scale, num_pos, cat_maps, n_out, learners,
+                   float(cal.a_), float(cal.b_))
+
+    def transform(self, num, cat):
+        X = np.zeros((num.shape[0], self.n_out))
+        if self.num_pos is not None:
+            X[:, self.num_pos:self.num_pos + len(self.num_idx)] = (
+                (num[:, self.num_idx] - self.mean) / self.scale
+            )
+        for j, index in self.cat_maps:
+            for i, v in enumerate(cat[:, j]):
+                pos = index.get(v)
+                if pos is not None:   # unknown categories encode as all zeros
+                    X[i, pos] = 1.0
+        return X
+
+    def predict(self, num, cat, timings=None):
+        if timings is None:
+            X   = self.transform(num, cat)
+            raw = np.mean([lrn.predict(X) for lrn in self.learners], axis=0)
+            return _expit(-(self.a * raw + self.b))
+
+        # same computation, with wall time per stage accumulated into `timings`
+        t0 = time.perf_counter()
+        X  = self.transform(num, cat)
+        t1 = time.perf_counter()
+        _add(timings, "transform", t1 - t0)
+        votes = []
+        for lrn in self.learners:
+            votes.append(lrn.predict(X))
+            t2 = time.perf_counter()
+            _add(timings, f"learner:{lrn.kind}", t2 - t1)
+            t1 = t2
+        raw = np.mean(votes, axis=0)
+        out = _expit(-(self.a * raw + self.b))
+        _add(timings, "calibrate", time.perf_counter() - t1)
+        return out
+
+    def state(self):
+        arrays = {"num_idx": self.num_idx, "mean": self.mean, "scale": self.scale}
+        meta = {
+            "num_pos":  self.num_pos,
+            "n_out":    self.n_out,
+            "cat_maps": [[j, [[v, p] for v, p in index.items()]] for j, index in self.cat_maps],
+            "a": self.a, "b": self.b,
+            "learners": [],
+        }
+        for lrn in self.learners:
+            meta["learners"].append({"name": lrn.name, "kind": lrn.kind, "meta": lrn.meta})
+            arrays.update({f"{lrn.name}.{k}": v for k, v in lrn.arrays.items()})
+        return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays, meta):
+        learners = []
+        for spec in meta["learners"]:
+            prefix = spec["name"] + "."
+            sub = {k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)}
+            learners.append(_Learner(spec["name"], spec["kind"], sub, spec["meta"]))
+        cat_maps = [(j, {v: p for v, p in pairs}) for j, pairs in meta["cat_maps"]]
+        return cls(arrays["num_idx"], arrays["mean"], arrays["scale"], meta["num_pos"],
+                   cat_maps, meta["n_out"], learners, meta["a"], meta["b"])
+
+
+class CompiledEnsemble:
+    """Scores plain dicts or NumPy arrays with a fitted calibrated ensemble."""
+
+    def __init__(self, folds, numeric, categorical):
+        self.folds       = folds
+        self.numeric     = list(numeric)
+        self.categorical = list(categorical)
+
+    @classmethod
+    def from_calibrated(cls, calibrated):
+        from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+        # take the column lists from the first fold's ColumnTransformer
+        prep = calibrated.calibrated_classifiers_[0].estimator.named_steps["prep"]
+        numeric, categorical = [], []
+        for name, trans, cols in prep.transformers_:
+            if isinstance(trans, StandardScaler):
+                numeric += list(cols)
+            elif isinstance(trans, OneHotEncoder):
+                categorical += list(cols)
+        folds = [_CompiledFold.from_sklearn(c, numeric, categorical)
+                 for c in calibrated.calibrated_classifiers_]
+        return cls(folds, numeric, categorical)
+
+    @property
+    def features(self):
+        return self.numeric + self.categorical
+
+    def encode(self, rows):
+        """list of dicts → (numeric float array, categorical object array)."""
+        num = np.array([[r[c] for c in self.numeric] for r in rows], dtype=np.float64)
+        cat = np.array([[r[c] for c in self.categorical] for r in rows], dtype=object)
+        return num.reshape(len(rows), len(self.numeric)), cat.reshape(len(rows), len(self.categorical))
+
+    def predict_proba_arrays(self, num, cat, timings=None):
+        """
+        num: (n, len(numeric)) floats, cat: (n, len(categorical)) values,
+        both in the column order of `self.numeric` / `self.categorical`.
+        Returns an (n, 2) array like sklearn's predict_proba. Pass a dict as
+        `timings` to get seconds spent per stage / base learner, summed
+        over folds.
+        """
+        num = np.asarray(num, dtype=np.float64)
+        cat = np.asarray(cat, dtype=object)
+        p   = np.mean([f.predict(num, cat, timings) for f in self.folds], axis=0)
+        return np.column_stack([1.0 - p, p])
+
+    def predict_proba(self, rows):
+        """rows: list of dicts (or a DataFrame) with at least `self.features`."""
+        if hasattr(rows, "to_dict"):
+            rows = rows.to_dict("records")
+        return self.predict_proba_arrays(*self.encode(rows))
+
+    def state(self):
+        """({name: ndarray}, JSON-able metadata) describing the whole ensemble."""
+        arrays, folds = {}, []
+        for k, fold in enumerate(self.folds):
+            fa, fm = fold.state()
+            arrays.update({f"fold{k}.{name}": v for name, v in fa.items()})
+            folds.append(fm)
+        return arrays, {"numeric": self.numeric, "categorical": self.categorical, "folds": folds}
+
+    @classmethod
+    def from_state(cls, arrays, meta):
+        folds = []
+        for k, fm in enumerate(meta["folds"]):
+            prefix = f"fold{k}."
+            sub = {name[len(prefix):]: v for name, v in arrays.items() if name.startswith(prefix)}
+            folds.append(_CompiledFold.from_state(sub, fm))
+        return cls(folds, meta["numeric"], meta["categorical"])
+
+    def make_probe(self, n=256, seed=0):
+        """Deterministic synthetic rows spanning every category the folds know."""
+        rng  = np.random.default_rng(seed)
+        last = self.folds[-1]
+        num  = np.zeros((n, len(self.numeric)))
+        num[:, last.num_idx] = last.mean + last.scale * rng.standard_normal((n, len(last.num_idx)))
+        cat  = np.empty((n, len(self.categorical)), dtype=object)
+        for j, _ in enumerate(self.categorical):
+            seen = sorted({v for f in self.folds for jj, idx in f.cat_maps if jj == j for v in idx}, key=str)
+            cat[:, j] = [seen[k] for k in rng.integers(0, len(seen), n)]
+        return num, cat
+
+    def verify(self, model, n=256, atol=1e-6):
+        """
+        Compare against `model.predict_proba` on a synthetic probe.
+        Returns the max absolute deviation; raises if it exceeds `atol`.
+        """
+        import pandas as pd
+
+        num, cat = self.make_probe(n)
+        X = pd.DataFrame(num, columns=self.numeric)
+        for j, c in enumerate(self.categorical):
+            X[c] = cat[:, j]
+        expected = model.predict_proba(X)[:, 1]
+        got      = self.predict_proba_arrays(num, cat)[:, 1]
+        dev      = float(np.max(np.abs(expected - got)))
+        if dev > atol:
+            raise AssertionError(f"compiled model deviates from predict_proba by {dev:.2e} (> {atol:.0e})")
+        return dev
@@ -0,0 +1,136 @@
+# backend/cv_harness.py
+"""
+Single-pass time-series CV for the calibrated ensembles: each fold is fit
+once, and every metric and the final model come from those fits.
+
+    cv     = CVHarness(preprocessor, ensemble, TimeSeriesSplit(n_splits=5))
+    scores = cv.run(X, y)          # fit folds, calibrate, score → {"raw": …, "calibrated": …}
+    cv.report(scores)
+    model  = cv.model              # CalibratedClassifierCV, ready to save
+
+1️⃣ Fit: per fold, the ColumnTransformer is fit on the training part and
+   kept with the fold; its transformed matrices feed the ensemble fit and
+   the out-of-fold predictions, and the stored out-of-fold probabilities
+   are what every metric is computed from.
+2️⃣ Calibrate: CalibratedClassifierCV(pipeline, method="sigmoid", cv=cv)
+   fits the pipeline on each training part and a Platt sigmoid on that
+   fold's test predictions. Those pipelines are the fold fits above, so
+   only the sigmoids are fit here (through FrozenEstimator) and `model` is
+   the same model .fit(X, y) would give, with no extra ensemble fits.
+3️⃣ Score: fold k's calibrated probabilities are the average of the
+   calibrated folds 1..k-1 (all earlier in time), i.e. the calibrated model
+   as it stood before fold k, instead of a nested CV inside every fold.
+   Fold 1 has nothing before it, so calibrated scores cover folds 2..n.
+
+Wall time per phase is kept in `timings` and printed by `report`.
+"""
+
+import time
+import numpy as np
+from joblib import Parallel, delayed
+
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+from sklearn.frozen import FrozenEstimator
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.metrics import roc_auc_score, brier_score_loss
+
+METRICS = {
+    "ROC AUC": roc_auc_score,
+    "Brier  ": brier_score_loss,
+}
+
+
+class Fold:
+    """One fold's indices, fitted pipeline and out-of-fold probabilities."""
+
+    def __init__(self, train, test, prep, clf, proba):
+        self.train, self.test = train, test
+        self.prep  = prep        # the fold's fitted ColumnTransformer
+        self.pipe  = Pipeline([("prep", prep), ("clf", clf)])
+        self.proba = proba       # P(y=1) on the test part, uncalibrated
+        self.calibrated = None   # its calibrated classifier, once calibrated
+
+
+def _fit_fold(prep, clf, X, y, train, test):
+    prep = clone(prep).fit(X.iloc[train])
+    clf  = clone(clf).fit(prep.transform(X.iloc[train]), y.iloc[train])
+    return Fold(train, test, prep, clf, clf.predict_proba(prep.transform(X.iloc[test]))[:, 1])
+
+
+class CVHarness:
+    def __init__(self, preprocessor, classifier, cv, method="sigmoid", metrics=METRICS, n_jobs=None):
+        self.preprocessor = preprocessor
+        self.classifier   = classifier
+        self.cv           = cv
+        self.method       = method
+        self.metrics      = metrics
+        self.n_jobs       = n_jobs
+        self.folds        = []
+        self.model        = None
+        self.timings      = {}
+
+    def _timed(self, phase, fn, *args):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        self.timings[phase] = time.perf_counter() - t0
+        return out
+
+    def fit_folds(self, X, y):
+        """Fit preprocessing + classifier once per fold (folds in parallel with n_jobs)."""
+        self.folds = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_fold)(self.preprocessor, self.classifier, X, y, train, test)
+            for train, test in self.cv.split(X, y)
+        )
+        return self.folds
+
+    def calibrate(self, X, y):
+        """A sigmoid per fold on its test part, and the final CalibratedClassifierCV from them."""
+        for f in self.folds:
+            cal = CalibratedClassifierCV(FrozenEstimator(f.pipe), method=self.method)
+            cal.fit(X.iloc[f.test], y.iloc[f.test])
+            f.calibrated = cal.calibrated_classifiers_[0]
+            f.calibrated.estimator = f.pipe     # unwrapped, as cv=… fitting leaves it
+
+        model = CalibratedClassifierCV(
+            Pipeline([("prep", self.preprocessor), ("clf", self.classifier)]),
+            method=self.method, cv=self.cv,
+        )
+        model.calibrated_classifiers_ = [f.calibrated for f in self.folds]
+        model.classes_         = cal.classes_
+        model.n_features_in_   = X.shape[1]
+        model.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.model = model
+        return model
+
+    def calibrated_proba(self, X):
+        """Per fold 2..n: the earlier folds' calibrated classifiers, averaged, on its test part."""
+        out = []
+        for k, f in enumerate(self.folds[1:], start=1):
+            Xk = X.iloc[f.test]
+            out.append(np.mean([g.calibrated.predict_proba(Xk)[:, 1] for g in self.folds[:k]], axis=0))
+        return out
+
+    def score(self, y, probas, folds):
+        """{metric: per-fold scores} from stored probabilities."""
+        return {name: np.array([fn(y.iloc[f.test], p) for f, p in zip(folds, probas)])
+                for name, fn in self.metrics.items()}
+
+    def run(self, X, y):
+        self._timed("fit folds", self.fit_folds, X, y)
+        self._timed("calibrate", self.calibrate, X, y)
+        cal_proba = self._timed("calibrated oof", self.calibrated_proba, X)
+        scores = self._timed("score", lambda: {
+            "raw":        self.score(y, [f.proba for f in self.folds], self.folds),
+            "calibrated": self.score(y, cal_proba, self.folds[1:]),
+        })
+        return scores
+
+    def report(self, scores, label="Ensemble"):
+        n = len(self.folds)
+        for kind, folds in (("Raw", f"{n}-fold"), ("Calibrated", f"folds 2–{n}")):
+            print(f"\n📊 {kind} {label} CV Metrics ({folds}):")
+            for name, s in scores[kind.lower()].items():
+                print(f"  • {name}: {s.mean():.4f} ± {s.std():.4f}")
+        print("\n⏱️  " + ", ".join(f"{k} {v:.1f}s" for k, v in self.timings.items())
+              + f" (total {sum(self.timings.values()):.1f}s)")
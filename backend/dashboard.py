@@ -5,45 +5,73 @@ import streamlit as st
 import pandas as pd
 import joblib
 
+import model_artifact
+import storage
+from prediction_cache import model_version
+from matchup_matrix import MatchupMatrix, MATRIX_NPY, MATRIX_META
+from feature_registry import STATS, OPP_STAT, MODEL_STATS, MODEL_WINDOW, column
+
 # 1️⃣ Page config must be first
 st.set_page_config(page_title="NBA Win Predictor", layout="wide")
 
-# 2️⃣ Load calibrated ensemble locally
+# 2️⃣ Load calibrated ensemble locally — once per server process, and from the
+#    NumPy artifact when it was exported from this exact pickle
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "model_global_ensemble_calibrated.pkl")
-model      = joblib.load(MODEL_PATH)
+
+
+@st.cache_resource
+def load_model():
+    manifest = model_artifact.read_manifest(model_artifact.ARTIFACT_DIR)
+    if manifest and manifest["source_version"] == model_version(MODEL_PATH):
+        return model_artifact.load(model_artifact.ARTIFACT_DIR)[0]
+    return joblib.load(MODEL_PATH)
+
+
+model = load_model()
 
 # 3️⃣ Title
 st.title("🏀 NBA Next-Game Win Predictor")
 
-# 4️⃣ Load richer rolling‐window features
-FEATURES_CSV = os.path.join(os.path.dirname(__file__), "data", "all_teams_features_richer_2025.csv")
-df = pd.read_csv(FEATURES_CSV, parse_dates=["GAME_DATE"])
+# 4️⃣ Load richer rolling‐window features: a few columns for every team, the
+#    rest only for the team being looked at (see storage.py)
+DEF_RTG = column("def_rtg")
 
-# 5️⃣ Load opponent defensive ratings
-DEF_CSV = os.path.join(os.path.dirname(__file__), "data", "team_def_ratings_2025.csv")
-def_df = (
-    pd.read_csv(DEF_CSV)
-      .dropna(subset=["team"])
-      .assign(team=lambda d: d["team"].str.strip())
-)
+
+@st.cache_data
+def load_tables():
+    df = storage.load_features(columns=["team", "GAME_DATE", "days_rest", DEF_RTG])
+    # 5️⃣ Opponent defensive ratings: every team's latest rolling rating
+    def_df = (
+        df.sort_values("GAME_DATE").groupby("team", observed=True).tail(1)
+          .rename(columns={DEF_RTG: "opp_def_rtg"})
+          .assign(team=lambda d: d["team"].astype(str))[["team", "opp_def_rtg"]]
+    )
+    return df, def_df
+
+
+@st.cache_data
+def load_team(team):
+    return storage.load_features(teams=[team], compact=True).sort_values("GAME_DATE")
+
+
+df, def_df = load_tables()
 
 # 6️⃣ Sidebar: team picker
 teams = sorted(df["team"].unique())
 team  = st.sidebar.selectbox("Select Team", teams)
 
-df_t  = df[df["team"] == team].sort_values("GAME_DATE")
+df_t  = load_team(team)
 latest = df_t.iloc[-1]
 
 st.sidebar.header("Latest Rolling Stats")
-pts_5         = st.sidebar.slider("5-game avg PTS",      50.0, 150.0, float(latest["pts_5"]))
-reb_5         = st.sidebar.slider("5-game avg REB",      20.0,  70.0, float(latest["reb_5"]))
-ast_5         = st.sidebar.slider("5-game avg AST",      10.0,  50.0, float(latest["ast_5"]))
-win_pct_5     = st.sidebar.slider("5-game win %",        0.0,   1.0, float(latest["win_pct_5"]), step=0.01)
-opp_win_pct_5 = st.sidebar.slider("Opp 5-game win %",    0.0,   1.0, float(latest["opp_win_pct_5"]), step=0.01)
-fg_pct_5      = st.sidebar.slider("5-game FG% avg",      0.0,   1.0, float(latest["fg_pct_5"]),  step=0.01)
-fg3_pct_5     = st.sidebar.slider("5-game 3P% avg",      0.0,   1.0, float(latest["fg3_pct_5"]), step=0.01)
-ft_pct_5      = st.sidebar.slider("5-game FT% avg",      0.0,   1.0, float(latest["ft_pct_5"]),  step=0.01)
-pace_5        = st.sidebar.slider("5-game Pace",        80.0, 130.0, float(latest["pace_5"]))
+rolling = {}   # model column → slider value, one slider per registry stat
+for stat in MODEL_STATS:
+    name = column(stat)
+    if stat == OPP_STAT:
+        label, spec = f"Opp {MODEL_WINDOW}-game win %", STATS["win_pct"]
+    else:
+        label, spec = f"{MODEL_WINDOW}-game {STATS[stat].label}", STATS[stat]
+    rolling[name] = st.sidebar.slider(label, spec.lo, spec.hi, float(latest[name]), step=spec.step)
 
 # 7️⃣ Rest / back-to-back / home
 max_rest     = int(df["days_rest"].max())
@@ -59,6 +87,15 @@ if opps:
 else:
     opp = st.sidebar.text_input("Next Opponent")
 
+# 8️⃣b Precomputed latest-state probabilities (python backend/matchup_matrix.py)
+if os.path.exists(MATRIX_NPY) and os.path.exists(MATRIX_META):
+    grid = MatchupMatrix.load()
+    p_home, p_away = grid.lookup(team, opp, 1), grid.lookup(team, opp, 0)
+    if p_home is not None:
+        st.sidebar.caption(
+            f"Latest-state odds vs {opp}: {p_home:.1%} at home · {p_away:.1%} away"
+        )
+
 # 9️⃣ Opponent defensive rating slider
 if opp in def_df["team"].values:
     default_def = float(def_df.loc[def_df["team"] == opp, "opp_def_rtg"].iloc[-1])
@@ -77,15 +114,7 @@ opp_def_rtg = st.sidebar.slider(
 if st.sidebar.button("Predict Next Game"):
     X = pd.DataFrame([{
         "team":           team,
-        "pts_5":          pts_5,
-        "reb_5":          reb_5,
-        "ast_5":          ast_5,
-        "win_pct_5":      win_pct_5,
-        "opp_win_pct_5":  opp_win_pct_5,
-        "fg_pct_5":       fg_pct_5,
-        "fg3_pct_5":      fg3_pct_5,
-        "ft_pct_5":       ft_pct_5,
-        "pace_5":         pace_5,
+        **rolling,
         "days_rest":      days_rest,
         "back2back":      int(back2back),
         "home":           int(home),
@@ -98,7 +127,7 @@ if st.sidebar.button("Predict Next Game"):
 
 # 1️⃣2️⃣ Recent Rolling Performance
 st.header(f"{team} — Recent Rolling Performance (Last 20 Games)")
-chart_df = df_t.set_index("GAME_DATE")[["pts_5","win_pct_5"]].tail(20)
+chart_df = df_t.set_index("GAME_DATE")[[column("pts"), column("win_pct")]].tail(20)
 st.line_chart(chart_df)
 
 st.markdown(
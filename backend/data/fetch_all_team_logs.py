@@ -1,61 +1,194 @@
 # backend/data/fetch_all_team_logs.py
 
 import os
+import sys
 import time
 import pandas as pd
-from nba_api.stats.static import teams
-from nba_api.stats.endpoints import TeamGameLog
 
-def fetch_all_team_logs(season="2024-25"):
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+from stats_client import StatsClient
+
+SEASON_TYPES = ("Regular Season", "Playoffs")
+
+
+def team_list():
+    """Every NBA team as {"id", "abbreviation", "full_name", …} (nba_api's static list)."""
+    from nba_api.stats.static import teams
+    return teams.get_teams()
+
+
+def fetch_team_log(client, team, season, date_from=None):
+    """One team's regular-season + playoff log for `season` (from `date_from` on, inclusive)."""
+    parts = []
+    since = date_from.strftime("%m/%d/%Y") if date_from is not None else ""
+    for season_type in SEASON_TYPES:
+        df = client.frame("teamgamelog", {"TeamID": team["id"], "Season": season,
+                                          "SeasonType": season_type, "LeagueID": "00",
+                                          "DateFrom": since, "DateTo": ""})
+        # drop any columns that are 100% NA in each, to avoid pandas warning
+        # (not on an empty result: every column of it counts as all-NA)
+        if len(df):
+            parts.append(df.dropna(axis=1, how="all"))
+    # concat (sort=False preserves column order); no games in the window
+    # (e.g. before opening night) → no rows, but the usual columns
+    df = pd.concat(parts, ignore_index=True, sort=False) if parts else df
+    df["team"] = team["abbreviation"]
+    return df
+
+
+def fetch_all_team_logs(season="2024-25", write_csv=True, client=None, teams=None):
+    """All 30 teams' regular-season + playoff logs for `season` ("YYYY-YY"),
+    saved to the columnar store (and all_teams_<YYYYYY>_gamelog.csv).
+
+    Teams are fetched concurrently through `client` (rate-limited, retried;
+    see stats_client.py). Teams that still fail keep the rows already stored
+    for them, and are listed at the end."""
     # 1️⃣ target dir is backend/data, since this script lives in backend/data/
-    data_dir = os.path.dirname(__file__)  # THIS is already .../backend/data
+    data_dir = os.path.dirname(os.path.abspath(__file__))
     os.makedirs(data_dir, exist_ok=True)
 
     # 2️⃣ grab every team
-    all_teams = teams.get_teams()
-    print(f"Found {len(all_teams)} teams. Downloading logs for season {season}…")
-
-    combined = []
-    for t in all_teams:
-        tid    = t["id"]
-        abbr   = t["abbreviation"]
-        name   = t["full_name"]
-        print(f"➡️  Fetching {name} ({abbr})…")
-
-        # 3️⃣ regular
-        reg_df = TeamGameLog(
-            team_id=tid,
-            season=season,
-            season_type_all_star="Regular Season"
-        ).get_data_frames()[0]
-
-        # 4️⃣ playoffs
-        po_df  = TeamGameLog(
-            team_id=tid,
-            season=season,
-            season_type_all_star="Playoffs"
-        ).get_data_frames()[0]
-
-        # 5️⃣ drop any columns that are 100% NA in each, to avoid pandas warning
-        reg_df = reg_df.dropna(axis=1, how="all")
-        po_df  = po_df.dropna(axis=1, how="all")
-
-        # 6️⃣ concat (sort=False preserves column order)
-        df = pd.concat([reg_df, po_df], ignore_index=True, sort=False)
-
-        # 7️⃣ add a team-abbrev column
-        df["team"] = abbr
-        combined.append(df)
-
-        time.sleep(0.6)  # gentle
-
-    # 8️⃣ merge all teams
-    all_games = pd.concat(combined, ignore_index=True, sort=False)
-
-    # 9️⃣ save one big CSV
-    out_path = os.path.join(data_dir, "all_teams_202425_gamelog.csv")
-    all_games.to_csv(out_path, index=False)
-    print(f"✅ Saved combined logs to {out_path}")
+    client  = client or StatsClient()
+    by_abbr = {t["abbreviation"]: t for t in (teams or team_list())}
+    print(f"Found {len(by_abbr)} teams. Downloading logs for season {season}…")
+
+    # 3️⃣ fetch them in the client's worker pool
+    t0 = time.perf_counter()
+    done, failed = client.map(lambda abbr: fetch_team_log(client, by_abbr[abbr], season), by_abbr)
+    print(f"➡️  {len(done)}/{len(by_abbr)} teams in {time.perf_counter() - t0:.1f}s "
+          f"({client.stats['requests']} requests, {client.stats['retries']} retries)")
+    if not done:
+        raise RuntimeError(f"No team logs fetched for {season}: {next(iter(failed.values()))}")
+
+    # 4️⃣ merge all teams (in the usual team order); failed teams keep what's stored
+    all_games = pd.concat([done[a] for a in by_abbr if a in done], ignore_index=True, sort=False)
+    kept = set()
+    if failed:
+        old = storage.load_gamelog(teams=list(failed), seasons=[season])
+        if not old.empty:
+            old = old.assign(team=old["team"].astype(str), WL=old["WL"].astype(str),
+                             GAME_DATE=old["GAME_DATE"].dt.strftime("%b %d, %Y").str.upper())
+            all_games = pd.concat([all_games, old.drop(columns="season", errors="ignore")],
+                                  ignore_index=True, sort=False)
+            kept = set(old["team"])
+
+    # 5️⃣ save one big CSV
+    out_path = log_csv(season)
+    if write_csv:
+        all_games.to_csv(out_path, index=False)
+
+    # 6️⃣ and into the columnar store (typed, one partition per season)
+    storage.write_gamelog(all_games.assign(GAME_DATE=storage.parse_game_date(all_games["GAME_DATE"]),
+                                           season=season))
+    where = f"{out_path} + " if write_csv else ""
+    print(f"✅ Saved {season} logs to {where}{storage.GAMELOG_DIR}")
+    for abbr, err in sorted(failed.items()):
+        print(f"⚠️  {abbr} failed ({err}); {'kept its stored rows' if abbr in kept else 'no stored rows'}")
+    return len(all_games)
+
+
+def log_csv(season):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        f"all_teams_{season.replace('-', '')}_gamelog.csv")
+
+
+def stored_games(season):
+    """team → (date of its last stored game, its stored Game_IDs) for `season`."""
+    have = storage.load_gamelog(columns=["team", "Game_ID", "GAME_DATE"], seasons=[season],
+                                csv_path=log_csv(season))
+    return {team: (g["GAME_DATE"].max(), set(g["Game_ID"]))
+            for team, g in have.groupby(have["team"].astype(str))}
+
+
+def complete_games(new):
+    """
+    Mask of the rows of `new` that can be stored now: both rows of each
+    game (the ratings pair them by Game_ID, see incremental_features
+    FeatureStore.add_games), and for each team nothing from its first game
+    still missing the opponent's row on, so its games stay in date order.
+    """
+    gid   = new["Game_ID"].astype(str)
+    dates = storage.parse_game_date(new["GAME_DATE"])
+    keep  = pd.Series(True, index=new.index)
+    while True:
+        lone = keep & gid.map(gid[keep].value_counts()).ne(2)
+        if not lone.any():
+            return keep
+        # holding a team's later games back can leave their opponents alone too
+        cut  = dates[lone].groupby(new["team"][lone]).min()
+        keep &= ~(dates >= new["team"].map(cut))
+
+
+def fetch_new_games(season="2024-25", client=None, teams=None):
+    """
+    Only the games newer than what's on disk: each team's log is requested
+    from the date of its last stored game (that day included, so nothing
+    falls in between) and rows whose Game_ID is already stored are dropped.
+    The new rows are appended to the merged CSV and the store in place, so
+    running it twice adds nothing the second time. Returns the new rows.
+
+    Only complete games are kept (`complete_games`). When a team fails, its
+    opponents' rows for those games are held back too; they're newer than
+    anything stored, so the next run asks for them again.
+    """
+    client  = client or StatsClient()
+    by_abbr = {t["abbreviation"]: t for t in (teams or team_list())}
+    have    = stored_games(season)
+    print(f"Checking {len(by_abbr)} teams for games after their last stored one ({season})…")
+
+    def fetch(abbr):
+        last, ids = have.get(abbr, (None, set()))
+        df = fetch_team_log(client, by_abbr[abbr], season, last)
+        return df[~df["Game_ID"].astype(str).isin(ids)]
+
+    done, failed = client.map(fetch, by_abbr)
+    for abbr, err in sorted(failed.items()):
+        print(f"⚠️  {abbr} failed ({err}); it'll be picked up next run")
+    new = [done[a] for a in by_abbr if a in done and len(done[a])]
+    if not new:
+        print(f"✅ Nothing new ({client.stats['requests']} requests)")
+        return pd.DataFrame()
+    new  = pd.concat(new, ignore_index=True, sort=False)
+    keep = complete_games(new)
+    if not keep.all():
+        held = new.loc[~keep, "team"].value_counts()
+        print(f"⏳ Holding back {int((~keep).sum())} team-games until both sides are in: "
+              + ", ".join(f"{t} {n}" for t, n in held.items()))
+    new = new[keep].reset_index(drop=True)
+    if new.empty:
+        print(f"✅ Nothing complete yet ({client.stats['requests']} requests)")
+        return new
+
+    # append in place: CSV in its own column order, store as an extra part file
+    out_path = log_csv(season)
+    if os.path.exists(out_path):
+        cols = pd.read_csv(out_path, nrows=0).columns
+        new.reindex(columns=cols).to_csv(out_path, mode="a", header=False, index=False)
+    if os.path.isdir(storage.GAMELOG_DIR) and os.listdir(storage.GAMELOG_DIR):
+        storage.write_gamelog(new.assign(GAME_DATE=storage.parse_game_date(new["GAME_DATE"]),
+                                         season=season), append=True)
+    print(f"✅ {len(new)} new team-games for {new['team'].nunique()} teams "
+          f"({client.stats['requests']} requests) → {out_path} + {storage.GAMELOG_DIR}")
+    return new
+
 
 if __name__ == "__main__":
-    fetch_all_team_logs()
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Fetch every team's game log for a season")
+    ap.add_argument("season", nargs="?", default="2024-25")
+    ap.add_argument("--incremental", action="store_true",
+                    help="only fetch games newer than the stored ones and append them")
+    args = ap.parse_args()
+    if args.incremental:
+        new = fetch_new_games(args.season)
+        # and the feature table, if it's kept incrementally (incremental_features.py init)
+        from incremental_features import FeatureStore, STATE_PATH
+        if len(new) and os.path.exists(STATE_PATH):
+            store = FeatureStore.load()
+            added = store.add_games(new.assign(GAME_DATE=storage.parse_game_date(new["GAME_DATE"])))
+            store.save()
+            print(f"✅ {added} feature rows added")
+    else:
+        fetch_all_team_logs(args.season)
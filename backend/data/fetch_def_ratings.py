@@ -1,10 +1,13 @@
 # backend/data/fetch_def_ratings.py
 
 import os
-import requests
+import sys
 import pandas as pd
 from io import StringIO
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_cache import HttpCache, season_ttl
+
 # Full team name → 3-letter code
 LONG_TO_ABBR = {
     "Atlanta Hawks":"ATL","Boston Celtics":"BOS","Brooklyn Nets":"BRK","Charlotte Hornets":"CHO",
@@ -17,20 +20,27 @@ LONG_TO_ABBR = {
     "Toronto Raptors":"TOR","Utah Jazz":"UTA","Washington Wizards":"WAS"
 }
 
-def fetch_def_ratings(season_year: int = 2025):
+def _has_table(body):
+    """Cache guard: a cut-off page has no complete table to read."""
+    if b"</table>" not in body:
+        raise ValueError("ratings page has no complete <table> (truncated response?)")
+
+def fetch_def_ratings(season_year: int = 2025, cache=None):
     """
-    1) Download NBA_<year>_ratings.html
+    1) Download NBA_<year>_ratings.html (through the HTTP cache: a finished
+       season is never re-downloaded)
     2) Read the first <table> (multi-index columns)
     3) Flatten to single level, extract 'Team' & 'DRtg'
     4) Map to 3-letter codes, write CSV
     """
     url = f"https://www.basketball-reference.com/leagues/NBA_{season_year}_ratings.html"
+    season = f"{season_year - 1}-{season_year % 100:02d}"
     print(f"➡️  Downloading {url} …")
-    resp = requests.get(url, headers={"User-Agent":"Mozilla/5.0"}, timeout=10)
-    resp.raise_for_status()
+    html = (cache or HttpCache()).get(url, headers={"User-Agent":"Mozilla/5.0"},
+                                      ttl=season_ttl(season), timeout=10, validate=_has_table)
 
     # read_html will pick up the first table
-    dfs = pd.read_html(StringIO(resp.text))
+    dfs = pd.read_html(StringIO(html.decode("utf-8")))
     if not dfs:
         raise RuntimeError("No tables found on ratings page.")
     df = dfs[0]
@@ -1,8 +1,15 @@
 # backend/data/fetch_player_stats_nba_api.py
 
+import os
+import sys
+import time
 import pandas as pd
-from nba_api.stats.endpoints import playergamelog
-from nba_api.stats.library.parameters import SeasonAll
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+from stats_client import StatsClient
+
+SEASON_TYPES = ("Regular Season", "Playoffs")
 
 def fetch_player_season_stats(player_id, season):
     """
@@ -11,13 +18,11 @@ def fetch_player_season_stats(player_id, season):
     season:   string in format '2023-24'
     """
     print(f"➡️  Fetching game logs for player {player_id} in season {season}...")
-    # Pull the player’s game log
-    gamelog = playergamelog.PlayerGameLog(
-        player_id=player_id,
-        season=season,
-        season_type_all_star='Regular Season'
-    )
-    df = gamelog.get_data_frames()[0]
+    # Pull the player’s game log (nba_api's PlayerGameLog endpoint, through the cached client)
+    df = StatsClient().frame("playergamelog", {
+        "PlayerID": player_id, "Season": season, "SeasonType": "Regular Season",
+        "LeagueID": "00", "DateFrom": "", "DateTo": "",
+    })
 
     if df.empty:
         print("⚠️  No data returned—check your player_id or season format.")
@@ -27,6 +32,76 @@ def fetch_player_season_stats(player_id, season):
     df.to_csv(out_path, index=False)
     print(f"✅ Saved to {out_path}")
 
+def season_players(client, season):
+    """
+    Player_ID → name for everyone whose career spans `season`
+    (commonallplayers). That includes players who sat the whole season
+    out; their logs just come back empty.
+    """
+    df = client.frame("commonallplayers", {"LeagueID": "00", "Season": season, "IsOnlyCurrentSeason": 0})
+    year = int(season[:4])
+    # FROM_YEAR / TO_YEAR are the first and last season's start year
+    on = ((df["FROM_YEAR"].astype(int) <= year) & (df["TO_YEAR"].astype(int) >= year)
+          & (df["GAMES_PLAYED_FLAG"] == "Y"))
+    return dict(zip(df.loc[on, "PERSON_ID"].astype(int), df.loc[on, "DISPLAY_FIRST_LAST"]))
+
+
+def fetch_player_log(client, player_id, season):
+    """
+    One player's regular-season + playoff games, with the player's team
+    taken from MATCHUP. A player with no games that season (the roster list
+    includes some) gets an empty frame with the usual columns.
+    """
+    parts = [client.frame("playergamelog", {"PlayerID": player_id, "Season": season,
+                                            "SeasonType": season_type, "LeagueID": "00",
+                                            "DateFrom": "", "DateTo": ""})
+             for season_type in SEASON_TYPES]
+    # all-NA columns are dropped per part, but not from an empty one (all of them are)
+    games = [p.dropna(axis=1, how="all") for p in parts if len(p)]
+    df = pd.concat(games, ignore_index=True, sort=False) if games else parts[0]
+    df["team"] = df["MATCHUP"].str.split().str[0]
+    return df
+
+
+def fetch_all_player_logs(season="2024-25", client=None, players=None):
+    """
+    Every player's game log for `season`, fetched concurrently through the
+    client's rate-limited pool, into the store's players table (one
+    partition per season). Players that still fail keep their stored rows.
+    """
+    client  = client or StatsClient()
+    players = players or season_players(client, season)
+    print(f"Found {len(players)} players. Downloading logs for season {season}…")
+
+    t0 = time.perf_counter()
+    done, failed = client.map(lambda pid: fetch_player_log(client, pid, season), players)
+    idle = sum(1 for df in done.values() if df.empty)
+    print(f"➡️  {len(done)}/{len(players)} players in {time.perf_counter() - t0:.1f}s "
+          f"({idle} without games that season; "
+          f"{client.stats['requests']} requests, {client.stats['retries']} retries)")
+
+    logs = [done[p].assign(Player_ID=p, PLAYER_NAME=players[p])
+            for p in players if p in done and len(done[p])]
+    if not logs:
+        why = (next(iter(failed.values())) if failed else
+               "no player has games in it" if done else "no players listed")
+        raise RuntimeError(f"No player logs fetched for {season}: {why}")
+    logs = pd.concat(logs, ignore_index=True, sort=False)
+    logs["GAME_DATE"] = storage.parse_game_date(logs["GAME_DATE"])
+    if failed and os.path.isdir(os.path.join(storage.PLAYERS_DIR, f"season={season}")):
+        old  = storage.load_playerlog(seasons=[season])
+        logs = pd.concat([logs, old[old["Player_ID"].isin(list(failed))]], ignore_index=True, sort=False)
+    storage.write_playerlog(logs.assign(season=season))
+    print(f"✅ Saved {len(logs)} player-games to {storage.PLAYERS_DIR}")
+    for pid, err in sorted(failed.items()):
+        print(f"⚠️  {players[pid]} ({pid}) failed ({err})")
+    return len(logs)
+
+
 if __name__ == "__main__":
-    # NBA’s internal LeBron James ID is 2544, season format 'YYYY-YY'
-    fetch_player_season_stats(player_id=2544, season='2023-24')
+    if sys.argv[1:2] == ["--all"]:
+        # the whole league: python backend/data/fetch_player_stats_nba_api.py --all 2024-25
+        fetch_all_player_logs(*sys.argv[2:3])
+    else:
+        # NBA’s internal LeBron James ID is 2544, season format 'YYYY-YY'
+        fetch_player_season_stats(player_id=2544, season='2023-24')
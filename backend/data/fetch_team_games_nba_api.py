@@ -1,7 +1,10 @@
 # backend/data/fetch_team_games_nba_api.py
 
-import pandas as pd
-from nba_api.stats.endpoints import teamgamelog
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stats_client import StatsClient
 
 def fetch_team_season_logs(team_id, season):
     """
@@ -10,12 +13,11 @@ def fetch_team_season_logs(team_id, season):
     season:  string in format 'YYYY-YY'
     """
     print(f"➡️  Fetching game logs for team {team_id} in season {season}...")
-    gamelog = teamgamelog.TeamGameLog(
-        team_id=team_id,
-        season=season,
-        season_type_all_star='Regular Season'
-    )
-    df = gamelog.get_data_frames()[0]
+    # same endpoint nba_api's TeamGameLog calls, through the cached client
+    df = StatsClient().frame("teamgamelog", {
+        "TeamID": team_id, "Season": season, "SeasonType": "Regular Season",
+        "LeagueID": "00", "DateFrom": "", "DateTo": "",
+    })
 
     if df.empty:
         print("⚠️  No data returned—check your team_id or season format.")
@@ -1,14 +1,22 @@
 # backend/data/merge_all_teams.py
 
+import os
+import sys
 import glob
 import pandas as pd
 
-# 1) Find all the per-team CSVs
-files = glob.glob("data/*_202425_gamelog.csv")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+
+# 1) Find all the per-team CSVs of one season (default 2024-25)
+SEASON = sys.argv[1] if len(sys.argv) > 1 else "2024-25"
+TAG    = SEASON.replace("-", "")
+OUT    = f"data/all_teams_{TAG}_gamelog.csv"
+files  = [f for f in glob.glob(f"data/*_{TAG}_gamelog.csv") if f != OUT]
 
 all_dfs = []
 for f in files:
-    df = pd.read_csv(f, parse_dates=["GAME_DATE"])
+    df = pd.read_csv(f, dtype={"Game_ID": str})
     # extract team abbrev from filename (e.g. "LAL_1610…_202425_…")
     team = f.split("/")[-1].split("_")[0]
     df["team"] = team
@@ -16,5 +24,10 @@ for f in files:
 
 # 2) Concat and save
 big = pd.concat(all_dfs, ignore_index=True)
-big.to_csv("data/all_teams_202425_gamelog.csv", index=False)
-print("✅ Merged into data/all_teams_202425_gamelog.csv")
+big.to_csv(OUT, index=False)
+
+# 3) Same rows into the columnar store, typed and partitioned by season
+big["GAME_DATE"] = storage.parse_game_date(big["GAME_DATE"])
+big["season"]    = SEASON
+storage.write_gamelog(big)
+print(f"✅ Merged into {OUT} + {storage.GAMELOG_DIR}")
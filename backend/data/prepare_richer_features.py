@@ -13,8 +13,9 @@ FEAT_OUT   = os.path.join(HERE, "all_teams_features_richer_2025.csv")
 df_feat = pd.read_csv(FEAT_IN, parse_dates=["GAME_DATE"])
 df_def  = pd.read_csv(DEF_IN)  # has columns ['team','opp_def_rtg']
 
-# 3️⃣ merge on the 3-letter code
-df = df_feat.merge(df_def, on="team", how="left")
+# 3️⃣ merge on the opponent's 3-letter code: it's the opponent's defence
+#    (the feature table now has local, rolling def_rtg_* columns instead)
+df = df_feat.merge(df_def.rename(columns={"team": "opp"}), on="opp", how="left")
 
 # 4️⃣ fill any missing defensive-rating values
 df["opp_def_rtg"].fillna(df["opp_def_rtg"].mean(), inplace=True)
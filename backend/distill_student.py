@@ -0,0 +1,197 @@
+# backend/distill_student.py
+"""
+Distill the calibrated ensemble into a compact student, the API's "fast"
+tier (POST /predict?tier=fast). Two candidates, cheapest first: a logistic
+model with interaction terms (`StudentModel`) and shallow boosted trees
+(`TreeStudent`); the first one that passes `student_model.FIDELITY_GATE`
+is shipped.
+
+A student is trained on the teacher's calibrated probabilities (not the
+0/1 labels) for every game plus teacher-labelled perturbed copies
+(swapped opponent / venue, jittered form stats), so it also tracks the
+teacher on the what-if rows the API gets.
+
+Fidelity is measured on a time-ordered holdout (last 20% of game dates)
+against a teacher refit on the games before it, so both the deviations
+and the teacher's own AUC / Brier there are out of sample. The chosen
+candidate is then refit on every game against the real teacher and
+exported next to the full model. If no candidate passes, nothing is
+exported and the script exits non-zero (the API then serves no fast tier
+for this model).
+
+Run after train_global_ensemble_calibrated.py:
+    python backend/distill_student.py
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import joblib
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score, brier_score_loss
+
+import model_artifact
+import storage
+from compiled_model import CompiledEnsemble
+from student_model import StudentModel, TreeStudent, gate_failures
+from prediction_cache import model_version
+
+# 1️⃣ Paths
+BASE        = os.path.dirname(__file__)
+CSV_PATH    = os.path.join(BASE, "data", "all_teams_features_richer_2025.csv")
+TEACHER     = os.path.join(BASE, "model_global_ensemble_calibrated.pkl")
+STUDENT_DIR = os.getenv("STUDENT_MODEL_DIR", os.path.join(BASE, "student_model"))
+
+HOLDOUT = 0.2           # last 20% of game dates
+AUGMENT = 4             # perturbed copies per training row
+ALPHAS  = (0.1, 1.0, 10.0, 100.0)
+GBM     = {"max_depth": 3, "n_estimators": 300, "learning_rate": 0.1}
+
+
+def augment(num, cat, numeric, categorical, copies, rng):
+    """Perturbed copies of (num, cat): random opponent / venue, jittered form stats."""
+    n     = len(num)
+    std   = num.std(axis=0)
+    flags = [numeric.index(c) for c in ("days_rest", "back2back")]
+    nums, cats = [num], [cat]
+    for _ in range(copies):
+        nn = num + 0.5 * std * rng.standard_normal(num.shape)
+        nn[:, flags] = num[rng.integers(0, n, n)][:, flags]       # keep these integral
+        cc = cat.copy()
+        for c in ("opp", "home"):
+            j = categorical.index(c)
+            cc[:, j] = cat[rng.integers(0, n, n), j]
+        nums.append(nn)
+        cats.append(cc)
+    return np.vstack(nums), np.vstack(cats)
+
+
+def timeit(fn, repeat):
+    fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+# 2️⃣ Load, in time order
+df = storage.load_features(csv_path=CSV_PATH)
+df.sort_values(["GAME_DATE", "team"], inplace=True, kind="stable")
+
+# 3️⃣ Time-ordered holdout
+cutoff = df["GAME_DATE"].quantile(1 - HOLDOUT)
+train  = (df["GAME_DATE"] < cutoff).to_numpy()
+test   = ~train
+rng    = np.random.default_rng(42)
+
+# 4️⃣ Teachers, scored through their compiled form: the calibrated ensemble,
+#    and the same estimator refit on the games before the holdout (in the
+#    trainer's row order), which is what the gate measures against
+teacher  = joblib.load(TEACHER)
+compiled = CompiledEnsemble.from_calibrated(teacher)
+compiled.verify(teacher)
+numeric, categorical = compiled.numeric, compiled.categorical
+
+columns  = list(teacher.feature_names_in_)
+before   = df[train].sort_values(["team", "GAME_DATE"], kind="stable")
+held_out = clone(teacher).fit(before[columns], before["W"])
+teacher_h = CompiledEnsemble.from_calibrated(held_out)
+teacher_h.verify(held_out)
+
+num = df[numeric].to_numpy(dtype=np.float64)
+cat = df[categorical].to_numpy(dtype=object)
+y   = df["W"].to_numpy()
+p_h = teacher_h.predict_proba_arrays(num[test], cat[test])[:, 1]
+
+
+def fit(kind, mask, scorer, **params):
+    """A `kind` student distilled from `scorer` on the rows in `mask` (+ perturbed copies)."""
+    a_num, a_cat = augment(num[mask], cat[mask], numeric, categorical, AUGMENT, rng)
+    a_p = scorer.predict_proba_arrays(a_num, a_cat)[:, 1]
+    return kind.fit(a_num, a_cat, a_p, numeric, categorical, **params)
+
+
+def fidelity_of(student, params):
+    """Holdout fidelity of a student distilled from `teacher_h`."""
+    p_s   = student.predict_proba_arrays(num[test], cat[test])[:, 1]
+    dev   = np.abs(p_s - p_h)
+    pn, pc = teacher_h.make_probe(2000)
+    probe = np.abs(student.predict_proba_arrays(pn, pc)[:, 1] - teacher_h.predict_proba_arrays(pn, pc)[:, 1])
+    out = {
+        "student":              student.KIND,
+        "params":               params,
+        "holdout_rows":         int(test.sum()),
+        "holdout_from":         str(cutoff.date()),
+        "teacher":              "refit on the games before holdout_from",
+        "max_abs_dev":          round(float(dev.max()), 5),
+        "mean_abs_dev":         round(float(dev.mean()), 5),
+        "probe_max_abs_dev":    round(float(probe.max()), 5),
+        "probe_mean_abs_dev":   round(float(probe.mean()), 5),
+        "teacher_auc":          round(roc_auc_score(y[test], p_h), 4),
+        "student_auc":          round(roc_auc_score(y[test], p_s), 4),
+        "teacher_brier":        round(brier_score_loss(y[test], p_h), 4),
+        "student_brier":        round(brier_score_loss(y[test], p_s), 4),
+    }
+    out["auc_delta"]   = round(out["student_auc"] - out["teacher_auc"], 4)
+    out["brier_delta"] = round(out["student_brier"] - out["teacher_brier"], 4)
+    return out
+
+
+# 5️⃣ Candidates, cheapest first: the logistic model (ridge strength picked
+#    by holdout fidelity), then the boosted trees
+best = None
+for alpha in ALPHAS:
+    s   = fit(StudentModel, train, teacher_h, alpha=alpha)
+    dev = np.abs(s.predict_proba_arrays(num[test], cat[test])[:, 1] - p_h)
+    print(f"  alpha={alpha:<6g} mean |Δp| {dev.mean():.4f}  max |Δp| {dev.max():.4f}")
+    if best is None or dev.mean() < best[0]:
+        best = (dev.mean(), alpha, s)
+candidates = [(StudentModel, {"alpha": best[1]}, best[2]),
+              (TreeStudent, GBM, fit(TreeStudent, train, teacher_h, **GBM))]
+
+# 6️⃣ Fidelity report on the holdout (+ a synthetic probe for off-distribution
+#    rows); the first candidate through the gate is the one shipped
+chosen = None
+for kind, params, s in candidates:
+    fidelity = fidelity_of(s, params)
+    failures = gate_failures(fidelity)
+    print(f"\n📊 {kind.__name__} fidelity (time-ordered holdout):")
+    for k, v in fidelity.items():
+        print(f"  • {k:20s} {v}")
+    print("  ✅ passes the gate" if not failures else "  ❌ fails the gate: " + "; ".join(failures))
+    if chosen is None and not failures:
+        chosen = (kind, params, s, fidelity)
+
+# 7️⃣ Gate: a student that drifts too far from the teacher is never deployed
+if chosen is None:
+    print("\n❌ No student passes the fidelity gate, nothing exported")
+    sys.exit(1)
+kind, params, student, fidelity = chosen
+
+# 8️⃣ Latency: one row and a 1,000-row batch, median of repeats
+X_df  = df[numeric + categorical]
+one   = slice(0, 1)
+batch = slice(0, 1000)
+latency = {
+    "sklearn_1_row_ms":    timeit(lambda: teacher.predict_proba(X_df.iloc[one]), 20) * 1000,
+    "compiled_1_row_ms":   timeit(lambda: compiled.predict_proba_arrays(num[one], cat[one]), 50) * 1000,
+    "student_1_row_ms":    timeit(lambda: student.predict_proba_arrays(num[one], cat[one]), 200) * 1000,
+    "sklearn_1k_rows_ms":  timeit(lambda: teacher.predict_proba(X_df.iloc[batch]), 5) * 1000,
+    "compiled_1k_rows_ms": timeit(lambda: compiled.predict_proba_arrays(num[batch], cat[batch]), 10) * 1000,
+    "student_1k_rows_ms":  timeit(lambda: student.predict_proba_arrays(num[batch], cat[batch]), 50) * 1000,
+}
+latency = {k: round(v, 3) for k, v in latency.items()}
+
+print(f"\n⏱️  Latency (median, {kind.__name__}):")
+for k, v in latency.items():
+    print(f"  • {k:20s} {v:9.3f} ms")
+
+# 9️⃣ Refit on every game against the real teacher and export next to the full model
+student = fit(kind, np.ones(len(df), dtype=bool), compiled, **params)
+teacher_version = model_version(TEACHER)
+model_artifact.export(student, STUDENT_DIR, source_version=teacher_version,
+                      extra={"fidelity": fidelity, "latency": latency})
+print(f"\n✅ {kind.__name__} (teacher {teacher_version}) saved to:\n   {STUDENT_DIR}")
@@ -3,6 +3,9 @@
 import os
 import pandas as pd
 
+from feature_engine import rolling_mean, days_since_last
+from feature_registry import STATS, column
+
 # Base paths
 BASE        = os.path.dirname(__file__)
 DATA_DIR    = os.path.join(BASE, "data")
@@ -19,36 +22,27 @@ df["W"] = (df["WL"] == "W").astype(int)
 # 3) Opponent code
 df["opp"] = df["MATCHUP"].str.split().str[-1]
 
-# 4) Rolling stats per team
-grp = df.groupby("team", group_keys=False)
-df["pts_5"]     = grp["PTS"].transform(lambda x: x.rolling(5).mean())
-df["reb_5"]     = grp["REB"].transform(lambda x: x.rolling(5).mean())
-df["ast_5"]     = grp["AST"].transform(lambda x: x.rolling(5).mean())
-df["win_pct_5"] = grp["W"].transform(lambda x: x.rolling(5).mean())
+# 4) Rolling stats per team: counting stats, shooting percents and the pace
+#    proxy, all in one pass
+df["poss"] = df["FGA"] + 0.4 * df["FTA"] - df["OREB"] + df["TOV"]
+# (only the stats whose source column this script has: no off/def ratings,
+#  those need feature_engine.prepare_log)
+ROLL = {st.source: column(name) for name, st in STATS.items() if st.source in df}
+df[list(ROLL.values())] = rolling_mean(df, "team", list(ROLL)).to_numpy()
 
 # 5) Opponent rolling win % (last 5 opp games)
 opp_df = df[["team","GAME_DATE","W"]].rename(columns={"team":"opp","W":"opp_W"})
 df = df.merge(opp_df, on=["opp","GAME_DATE"], how="left")
-df["opp_win_pct_5"] = df.groupby("opp")["opp_W"].transform(lambda x: x.rolling(5).mean())
-
-# 6) Shooting percents
-df["fg_pct_5"]  = grp["FG_PCT"].transform(lambda x: x.rolling(5).mean())
-df["fg3_pct_5"] = grp["FG3_PCT"].transform(lambda x: x.rolling(5).mean())
-df["ft_pct_5"]  = grp["FT_PCT"].transform(lambda x: x.rolling(5).mean())
-
-# 7) Pace proxy: must create 'poss' before grouping again
-df["poss"]   = df["FGA"] + 0.4 * df["FTA"] - df["OREB"] + df["TOV"]
-grp = df.groupby("team", group_keys=False)
-df["pace_5"] = grp["poss"].transform(lambda x: x.rolling(5).mean())
+df["opp_win_pct_5"] = rolling_mean(df, "opp", ["opp_W"])["opp_W"]
 
-# 8) Rest & back-to-back
-df["days_rest"] = grp["GAME_DATE"].transform(lambda x: x.diff().dt.days).fillna(0)
+# 6) Rest & back-to-back
+df["days_rest"] = days_since_last(df, "team", "GAME_DATE").astype(float)
 df["back2back"] = (df["days_rest"] == 1).astype(int)
 
-# 9) Home/Away flag
+# 7) Home/Away flag
 df["home"] = df["MATCHUP"].str.contains(" vs. ").astype(int)
 
-# 10) Select & drop any NaNs
+# 8) Select & drop any NaNs
 keep = [
     "team","GAME_DATE",
     "pts_5","reb_5","ast_5","win_pct_5",
@@ -57,6 +51,6 @@ keep = [
 ]
 out = df[keep].dropna()
 
-# 11) Save richer features
+# 9) Save richer features
 out.to_csv(OUT_PATH, index=False)
 print("✅ Saved richer features to", OUT_PATH)
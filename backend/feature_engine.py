@@ -0,0 +1,374 @@
+# backend/feature_engine.py
+"""
+Vectorized per-team rolling features.
+
+`df.groupby("team")[col].transform(lambda x: x.rolling(5).mean())` runs a
+Python lambda per team per column. Here every column of every team goes
+through one pass instead. The rows are stable-sorted by team into a padded
+(teams × games × columns) block, and the running window sums are carried
+down the games axis for all teams and columns at once. Each team's scan
+restarts at its own first game (a segmented scan), so nothing leaks between
+teams. Every window in feature_registry (3/5/10/20 games plus the
+exponentially weighted means) is updated in that same pass: a new game is
+added to all windows with one vector op, and each window only drops its
+own oldest game.
+
+The running sum is updated exactly like pandas' `roll_mean` does it
+(Kahan-compensated add/remove, same order of operations, same
+equal-values and sign special cases), so the results are bit-for-bit the
+same as `.rolling(window).mean()`. The EWMAs follow pandas'
+`ewm(halflife=h).mean()` the same way. A plain cumulative-sum difference is
+faster still but differs in the last bit for most non-integer rows, and
+that changes the written CSV.
+
+    rolled = rolling_mean(df, "team", ["PTS", "REB"], window=5)
+    stats  = window_stats(df, "team", ["PTS"], windows=(3, 5), halflives=(10,))
+
+The cost is one vector step per game of the longest group instead of one
+Python call per (group, column). `python backend/bench_features.py` (8
+columns, 1 vCPU): one season, 30 teams × ~87 games: 65 ms → 5 ms (×12);
+a synthetic 20-season log (30 teams × ~1,730 games): 83 ms → 70 ms. With
+few, very long groups the lambdas' overhead is already small. All registry
+windows at once (4 windows + 2 EWMAs): one season 276 ms → 17 ms (×16),
+20 seasons 434 ms → 320 ms.
+
+Check against the committed features file:
+    python backend/feature_engine.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from feature_registry import (STATS, WINDOWS, HALFLIVES, SPECS, OPP_STAT, TABLE_COLUMNS,
+                              DROP_IF_NAN, column)
+
+
+def _segments(keys):
+    """Stable sort order of `keys`, plus start offset and length of each group."""
+    order  = np.argsort(keys, kind="stable")
+    k      = keys[order]
+    starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]]) if len(k) else np.zeros(0, dtype=np.intp)
+    lens   = np.diff(np.r_[starts, len(k)])
+    return order, starts, lens
+
+
+def _special_cases(out, pad, window):
+    """
+    pandas' special cases, all decided by the window's own values: all
+    equal → that value exactly; all ≥ 0 → never negative; all < 0 → never
+    positive. `out` is updated in place.
+    """
+    L    = len(pad)
+    last = pad[window - 1:]
+    same = np.ones(last.shape, dtype=bool)
+    neg  = np.signbit(last).astype(np.int64)
+    for k in range(1, window):
+        older = pad[window - 1 - k:L - k]
+        same &= older == last
+        neg  += np.signbit(older)
+    tail = out[window - 1:]
+    tail[same] = last[same]
+    tail[(neg == 0) & (tail < 0)] = 0.0
+    tail[(neg == window) & (tail > 0)] = 0.0
+
+
+def _scan(pad, windows, halflives=()):
+    """
+    pandas' roll_mean (one per window) and ewm mean (one per half-life) over
+    the games axis of a (games, groups·columns) block with no NaNs:
+    Kahan-compensated add of the newest value to every window and remove of
+    each window's oldest, for every group and column at once.
+    Returns ((windows, games, K) means, (halflives, games, K) EWMAs).
+    """
+    L, K  = pad.shape
+    W     = len(windows)
+    warr  = np.array(windows)[:, None]
+    s     = np.zeros((W, K))
+    c_add = np.zeros((W, K))
+    c_rem = np.zeros((W, K))
+    y, t  = np.empty((W, K)), np.empty((W, K))
+    y1    = np.empty(K)
+    ewm   = EwmState(K, halflives)
+    means = np.empty((W, L, K))
+    ewms  = np.empty((len(halflives), L, K))
+    for i in range(L):
+        for j, w in enumerate(windows):
+            if i >= w:
+                np.negative(pad[i - w], out=y1)
+                y1 -= c_rem[j]
+                t1 = s[j] + y1
+                np.subtract(t1, s[j], out=c_rem[j])
+                c_rem[j] -= y1
+                s[j] = t1
+        np.subtract(pad[i], c_add, out=y)
+        np.add(s, y, out=t)
+        np.subtract(t, s, out=c_add)
+        c_add -= y
+        s, t = t, s
+        np.divide(s, np.minimum(i + 1, warr), out=means[:, i])
+        if halflives:
+            ewms[:, i] = ewm.push(pad[i])
+    for j, w in enumerate(windows):
+        means[j, :w - 1] = np.nan
+        _special_cases(means[j], pad, w)
+    return means, ewms
+
+
+class RollingState:
+    """
+    Running window state of K series, stepped one value per series at a
+    time with exactly pandas' roll_mean arithmetic (NaNs skipped). Used for
+    blocks with NaNs, and by incremental_features to extend a team's
+    windows with new games without re-reading its season.
+    """
+
+    FIELDS = ("s", "c_add", "c_rem", "nobs", "neg", "run", "prev", "buf")
+
+    def __init__(self, k, window):
+        self.window = window
+        self.i      = 0                      # values pushed so far
+        self.s      = np.zeros(k)
+        self.c_add  = np.zeros(k)
+        self.c_rem  = np.zeros(k)
+        self.nobs   = np.zeros(k, dtype=np.int64)
+        self.neg    = np.zeros(k, dtype=np.int64)
+        self.run    = np.zeros(k, dtype=np.int64)
+        self.prev   = np.full(k, np.nan)
+        self.buf    = np.full((window, k), np.nan)   # last `window` values, ring buffer
+
+    def push(self, x):
+        """Add the next value of every series; return the K window means."""
+        w, slot = self.window, self.i % self.window
+        if self.i >= w:
+            old = self.buf[slot]
+            m   = old == old
+            y   = -old - self.c_rem
+            t   = self.s + y
+            self.c_rem = np.where(m, t - self.s - y, self.c_rem)
+            self.s     = np.where(m, t, self.s)
+            self.nobs  = self.nobs - m
+            self.neg   = self.neg - (m & np.signbit(old))
+        x = np.asarray(x, dtype=np.float64)
+        m = x == x
+        y = x - self.c_add
+        t = self.s + y
+        self.c_add = np.where(m, t - self.s - y, self.c_add)
+        self.s     = np.where(m, t, self.s)
+        self.nobs  = self.nobs + m
+        self.neg   = self.neg + (m & np.signbit(x))
+        self.run   = np.where(m, np.where(x == self.prev, self.run + 1, 1), self.run)
+        self.prev  = np.where(m, x, self.prev)
+        self.buf[slot] = x
+        self.i += 1
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = self.s / self.nobs
+        r = np.where(self.run >= self.nobs, self.prev, r)
+        r = np.where((self.neg == 0) & (r < 0), 0.0, r)
+        r = np.where((self.neg == self.nobs) & (r > 0), 0.0, r)
+        return np.where((self.nobs >= w) & (self.nobs > 0), r, np.nan)
+
+    def state(self):
+        """JSON-able snapshot (floats round-trip exactly through json)."""
+        out = {f: getattr(self, f).tolist() for f in self.FIELDS}
+        out.update(window=self.window, i=self.i)
+        return out
+
+    @classmethod
+    def from_state(cls, st):
+        obj = cls(len(st["s"]), st["window"])
+        obj.i = st["i"]
+        for f in cls.FIELDS:
+            ref = getattr(obj, f)
+            setattr(obj, f, np.array(st[f], dtype=ref.dtype).reshape(ref.shape))
+        return obj
+
+
+class EwmState:
+    """
+    pandas' `ewm(halflife=h).mean()` (adjust=True, NaNs kept in the
+    weights) for K series and several half-lives, stepped one value at a
+    time. Used by the full scan and by incremental_features.
+    """
+
+    FIELDS = ("weighted", "old_wt", "nobs")
+
+    def __init__(self, k, halflives):
+        self.halflives = tuple(halflives)
+        # same float path as pandas: half-life → center of mass → alpha
+        com = np.array([1.0 / (1.0 - np.exp(np.log(0.5) / h)) - 1.0 for h in self.halflives])
+        self.factor   = (1.0 - 1.0 / (1.0 + com))[:, None]
+        self.weighted = np.full((len(self.halflives), k), np.nan)
+        self.old_wt   = np.ones((len(self.halflives), k))
+        self.nobs     = np.zeros((len(self.halflives), k), dtype=np.int64)
+
+    def push(self, x):
+        """Add the next value of every series; return the (halflives, K) means."""
+        x    = np.broadcast_to(np.asarray(x, dtype=np.float64), self.weighted.shape)
+        obs  = x == x
+        seen = self.weighted == self.weighted
+        old  = np.where(seen, self.old_wt * self.factor, self.old_wt)
+        upd  = seen & obs
+        with np.errstate(invalid="ignore"):
+            mixed = (old * self.weighted + 1.0 * x) / (old + 1.0)
+        self.weighted = np.where(upd & (self.weighted != x), mixed,
+                                 np.where(~seen & obs, x, self.weighted))
+        self.old_wt   = np.where(upd, old + 1.0, old)
+        self.nobs     = self.nobs + obs
+        return np.where(self.nobs >= 1, self.weighted, np.nan)
+
+    def state(self):
+        out = {f: getattr(self, f).tolist() for f in self.FIELDS}
+        out["halflives"] = list(self.halflives)
+        return out
+
+    @classmethod
+    def from_state(cls, st):
+        obj = cls(len(st["weighted"][0]) if st["weighted"] else 0, st["halflives"])
+        for f in cls.FIELDS:
+            ref = getattr(obj, f)
+            setattr(obj, f, np.array(st[f], dtype=ref.dtype).reshape(ref.shape))
+        return obj
+
+
+def _scan_nan(pad, windows, halflives=()):
+    """`_scan` for blocks with NaNs: they are skipped, and nobs is tracked."""
+    L, K  = pad.shape
+    rolls = [RollingState(K, w) for w in windows]
+    ewm   = EwmState(K, halflives)
+    means = np.empty((len(windows), L, K))
+    ewms  = np.empty((len(halflives), L, K))
+    for i, x in enumerate(pad):
+        for j, st in enumerate(rolls):
+            means[j, i] = st.push(x)
+        if halflives:
+            ewms[:, i] = ewm.push(x)
+    return means, ewms
+
+
+def window_stats(df, by, cols, windows=(5,), halflives=()):
+    """
+    Every rolling mean (one per window) and EWMA (one per half-life) of
+    every column in `cols`, per `by` group, in one pass over the games.
+    Returns {window: DataFrame, "ewm<h>": DataFrame}, each aligned with
+    `df` and holding `cols`. NaNs are skipped, and a window must hold
+    `window` non-NaN values.
+    """
+    order, starts, lens = _segments(df[by].to_numpy())
+    block = df[cols].to_numpy(dtype=np.float64)[order]
+    n, C  = block.shape
+    G, L  = len(starts), int(lens.max()) if len(lens) else 0
+
+    # 1️⃣ scatter into (games, groups, columns); padding sits after each
+    #    group's last game, so it never enters a real window
+    has_nan = np.isnan(block).any()
+    seg  = np.repeat(np.arange(G), lens)
+    pos  = np.arange(n) - np.repeat(starts, lens)
+    pad  = np.full((L, G, C), np.nan if has_nan else 0.0)
+    pad[pos, seg] = block
+
+    # 2️⃣ the running sums of every window, carried down the games axis together
+    scan = _scan_nan if has_nan else _scan
+    means, ewms = scan(pad.reshape(L, G * C), tuple(windows), tuple(halflives))
+
+    # 3️⃣ gather back to the caller's row order
+    out = {}
+    for spec, arr in zip(list(windows) + [f"ewm{h}" for h in halflives], list(means) + list(ewms)):
+        res = np.empty_like(block)
+        res[order] = arr.reshape(L, G, C)[pos, seg]
+        out[spec] = pd.DataFrame(res, index=df.index, columns=cols)
+    return out
+
+
+def rolling_mean(df, by, cols, window=5):
+    """
+    Same as `df.groupby(by)[c].transform(lambda x: x.rolling(window).mean())`
+    for every `c` in `cols`, as one DataFrame aligned with `df`.
+    """
+    return window_stats(df, by, cols, (window,))[window]
+
+
+def days_since_last(df, by, date_col):
+    """Days since each group's previous row (0 for its first), like groupby().diff().dt.days."""
+    order, starts, lens = _segments(df[by].to_numpy())
+    d     = df[date_col].to_numpy()[order]
+    days  = np.zeros(len(d), dtype=np.int64)
+    days[1:] = (d[1:] - d[:-1]) // np.timedelta64(1, "D")
+    days[starts] = 0
+    out = np.empty_like(days)
+    out[order] = days
+    return pd.Series(out, index=df.index)
+
+
+def opponent(df, cols):
+    """
+    `cols` of the other row with the same Game_ID, aligned with `df` (NaN
+    where that row isn't in `df`).
+    """
+    side = df[["Game_ID"] + cols].assign(_row=np.arange(len(df)))
+    pair = side.merge(side, on="Game_ID", suffixes=("", "_opp"))
+    pair = pair[pair["_row"] != pair["_row_opp"]]
+    out  = np.full((len(df), len(cols)), np.nan)
+    out[pair["_row"].to_numpy()] = pair[[f"{c}_opp" for c in cols]].to_numpy(dtype=np.float64)
+    return pd.DataFrame(out, index=df.index, columns=cols)
+
+
+def add_ratings(df):
+    """
+    Offensive / defensive rating of every game: points scored / allowed per
+    100 possessions, the game's possessions being the mean of both teams'
+    `poss` estimates. Both rows of a game must be present.
+    """
+    opp  = opponent(df, ["PTS", "poss"])
+    poss = (df["poss"] + opp["poss"]) / 2
+    df["ortg"] = 100 * df["PTS"] / poss
+    df["drtg"] = 100 * opp["PTS"] / poss
+    return df
+
+
+def prepare_log(df):
+    """Add the win flag, venue, opponent code, possession estimate and ratings to raw game-log rows."""
+    df["W"]    = (df["WL"] == "W").astype(int)
+    df["home"] = df["MATCHUP"].str.contains(" vs\\. ").astype(int)
+    df["opp"]  = df["MATCHUP"].str.split().str[-1]
+    df["poss"] = df["FGA"] + df["TOV"] + 0.4*df["FTA"] - df["OREB"]
+    return add_ratings(df)
+
+
+def build_features(df):
+    """Merged team game log → the rows of all_teams_features_richer_2025.csv."""
+    df = df.sort_values(["team", "GAME_DATE"])
+
+    # 1) Basic flags & estimate possessions
+    df = prepare_log(df)
+
+    # 2) Rolling per-team stats, every registry window in one pass
+    stats = list(STATS)
+    for spec, frame in window_stats(df, "team", [STATS[s].source for s in stats],
+                                    WINDOWS, HALFLIVES).items():
+        df[[column(s, spec) for s in stats]] = frame.to_numpy()
+
+    # 3) Rest/back-to-back
+    df["days_rest"] = days_since_last(df, "team", "GAME_DATE")
+    df["back2back"] = (df["days_rest"] == 1).astype(int)
+
+    # 4) Opponent win% for every window (merge on same GAME_DATE)
+    wins   = {column("win_pct", w): column(OPP_STAT, w) for w in SPECS}
+    opp_df = df[["opp","GAME_DATE"] + list(wins)].copy().rename(columns=wins)
+    df     = df.merge(opp_df, on=["opp","GAME_DATE"], how="left")
+
+    # 5) Drop rows without a full model window
+    df = df.dropna(subset=DROP_IF_NAN)
+    return df[TABLE_COLUMNS]
+
+
+if __name__ == "__main__":
+    import os
+
+    # Rebuild from the merged log and compare with the CSV on disk
+    DATA = os.path.join(os.path.dirname(__file__), "data")
+    OUT  = os.path.join(DATA, "all_teams_features_richer_2025.csv")
+    raw  = pd.read_csv(os.path.join(DATA, "all_teams_202425_gamelog.csv"), parse_dates=["GAME_DATE"])
+    with open(OUT) as f:
+        same = build_features(raw).to_csv(index=False) == f.read()
+    print(("✅ byte-identical to " if same else "❌ differs from ") + OUT)
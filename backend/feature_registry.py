@@ -0,0 +1,90 @@
+# backend/feature_registry.py
+"""
+The one definition of the rolling features.
+
+Each base stat is declared once (its game-log source column, plus the
+dashboard's label and slider range). WINDOWS and HALFLIVES list the windows
+generated for every stat. feature_engine builds all of them in one shared
+pass over the games, and training, the API and the dashboard read their
+feature lists from here.
+
+Column names:
+    <stat>_<window>        mean of the last <window> games, e.g. pts_5, win_pct_20
+    <stat>_ewm<halflife>   exponentially weighted mean, half-life in games, e.g. pts_ewm10
+    opp_win_pct_<window>   win% looked up for the opponent, same window (also _ewm<h>)
+
+off_rtg / def_rtg are points scored / allowed per 100 possessions, from
+the two rows of each Game_ID (feature_engine.add_ratings), so the API's
+opp_def_rtg is the opponent's latest def_rtg_<MODEL_WINDOW>.
+
+The model is trained and served on MODEL_WINDOW. Pointing it at another
+window, or adding stats to MODEL_STATS, needs a retrain and nothing else.
+"""
+
+from collections import namedtuple
+
+Stat = namedtuple("Stat", "source label lo hi step")
+
+# 1️⃣ Base stats: game-log column, dashboard label and slider range
+STATS = {
+    "pts":     Stat("PTS",     "avg PTS",  50.0, 150.0, None),
+    "reb":     Stat("REB",     "avg REB",  20.0,  70.0, None),
+    "ast":     Stat("AST",     "avg AST",  10.0,  50.0, None),
+    "win_pct": Stat("W",       "win %",     0.0,   1.0, 0.01),
+    "fg_pct":  Stat("FG_PCT",  "FG% avg",   0.0,   1.0, 0.01),
+    "fg3_pct": Stat("FG3_PCT", "3P% avg",   0.0,   1.0, 0.01),
+    "ft_pct":  Stat("FT_PCT",  "FT% avg",   0.0,   1.0, 0.01),
+    "pace":    Stat("poss",    "Pace",     80.0, 130.0, None),
+    "off_rtg": Stat("ortg",    "Off rating", 80.0, 140.0, 0.1),
+    "def_rtg": Stat("drtg",    "Def rating", 80.0, 140.0, 0.1),
+}
+OPP_STAT = "opp_win_pct"     # derived: the opponent's win_pct for the same window
+
+# 2️⃣ Windows generated for every stat
+WINDOWS   = (3, 5, 10, 20)
+HALFLIVES = (3, 10)
+MODEL_WINDOW = 5
+
+
+def column(stat, window=MODEL_WINDOW):
+    """Column name of `stat` over `window` (an int, or "ewm<h>")."""
+    return f"{stat}_{window}"
+
+
+SPECS = list(WINDOWS) + [f"ewm{h}" for h in HALFLIVES]
+
+# 3️⃣ What the model sees, in the order it was trained on
+MODEL_STATS = ["pts", "reb", "ast", "win_pct", OPP_STAT, "fg_pct", "fg3_pct", "ft_pct", "pace"]
+MODEL_ROLLING = [column(s) for s in MODEL_STATS]
+NUMERIC     = MODEL_ROLLING + ["days_rest", "back2back"]
+CATEGORICAL = ["home", "opp", "team"]
+FEATURES    = NUMERIC + CATEGORICAL
+
+# fields every /predict row carries (opp_def_rtg is accepted for the clients'
+# sake; the current model doesn't use it)
+API_FIELDS = ["team"] + MODEL_ROLLING + ["opp_def_rtg", "days_rest", "back2back", "home", "opp"]
+
+# a team's own latest stats, carried into its next matchup
+TEAM_STATE = [column(s) for s in MODEL_STATS if s != OPP_STAT] + ["days_rest", "back2back"]
+
+# 4️⃣ The feature table (all_teams_features_richer_2025.csv): the model's
+#    columns first, then every other stat and window
+KEEP = ["team", "GAME_DATE"] + MODEL_ROLLING + ["days_rest", "back2back", "home", "opp", "W"]
+EXTRA = [column(s, w) for w in SPECS for s in list(STATS) + [OPP_STAT] if column(s, w) not in KEEP]
+TABLE_COLUMNS = KEEP + EXTRA
+
+# rows without a full model window are dropped
+DROP_IF_NAN = [column(s) for s in ("pts", "reb", "ast", "win_pct")]
+
+# 5️⃣ Game rows (game_table.py): one row per Game_ID, both teams' pre-game
+#    state side by side; the model predicts the home side
+GAME_SIDES       = ("home", "away")
+GAME_NUMERIC     = [f"{side}_{c}" for side in GAME_SIDES for c in TEAM_STATE]
+GAME_CATEGORICAL = [f"{side}_team" for side in GAME_SIDES]
+GAME_FEATURES    = GAME_NUMERIC + GAME_CATEGORICAL
+GAME_TARGET      = "home_W"
+
+# 6️⃣ Team availability from player logs (player_features.py): one row per
+#    team-game, from the players' form going into it
+PLAYER_WINDOW = 10
+AVAILABILITY  = ["players", "rot_avail_min", "rot_avail_usg", "min_out", "form_pm36"]
@@ -0,0 +1,124 @@
+# backend/game_table.py
+"""
+One row per game, keyed on Game_ID.
+
+The team-row table (all_teams_features_richer_2025.csv) scores every game
+twice, once from each side, and the two probabilities don't have to sum
+to 1. Here each team's rolling features are computed once per team-game
+(`team_games`), and the home and away rows are put side by side with a
+single hash join on Game_ID (`build_games`):
+
+    Game_ID, GAME_DATE, home_<TEAM_STATE>…, away_<TEAM_STATE>…,
+    home_team, away_team, home_W
+
+Each side carries its pre-game state: the rolling stats as of the team's
+previous game (what /api/predict scores an upcoming game with) plus its
+rest days. The model predicts the home side, so P(away) = 1 - P(home),
+and a slate costs one model row per game (`score_slate`).
+
+Column lists live in feature_registry (GAME_*).
+
+    python backend/game_table.py                 # build + summary
+    python backend/game_table.py BOS:NYK LAL:DEN # score a slate (home:away)
+"""
+
+import os
+import pandas as pd
+
+import storage
+from feature_engine import window_stats, days_since_last, prepare_log
+from feature_registry import (STATS, MODEL_STATS, MODEL_WINDOW, OPP_STAT, TEAM_STATE,
+                              GAME_SIDES, GAME_NUMERIC, GAME_FEATURES, GAME_TARGET, column)
+
+HERE       = os.path.dirname(__file__)
+GAME_MODEL = os.path.join(HERE, "model_game_calibrated.pkl")
+
+OWN_STATS = [s for s in MODEL_STATS if s != OPP_STAT]     # the opponent's come from its own row
+
+
+def team_games(raw, pre_game=True):
+    """
+    One row per (team, game): Game_ID, GAME_DATE, team, home, W + TEAM_STATE.
+    With `pre_game`, the rolling stats are those after the team's previous
+    game (NaN until it has a full window); otherwise after this game.
+    """
+    df = prepare_log(raw.copy())
+    df["team"] = df["team"].astype(str)
+    df = df.sort_values(["team", "GAME_DATE"], kind="stable").reset_index(drop=True)
+
+    roll = window_stats(df, "team", [STATS[s].source for s in OWN_STATS], (MODEL_WINDOW,))[MODEL_WINDOW]
+    roll.columns = [column(s) for s in OWN_STATS]
+    if pre_game:
+        roll = roll.groupby(df["team"]).shift(1)
+    df[list(roll.columns)] = roll
+    df["days_rest"] = days_since_last(df, "team", "GAME_DATE").astype(float)
+    df["back2back"] = (df["days_rest"] == 1).astype(int)
+    return df[["Game_ID", "GAME_DATE", "team", "home", "W"] + TEAM_STATE]
+
+
+def _side(tg, side):
+    keep = tg.drop(columns=["home", "GAME_DATE"] if side == "away" else ["home"])
+    return keep.rename(columns={c: f"{side}_{c}" for c in keep.columns if c not in ("Game_ID", "GAME_DATE")})
+
+
+def build_games(raw):
+    """Game rows for every game with both sides' full windows, in date order."""
+    tg    = team_games(raw)
+    home  = _side(tg[tg["home"] == 1], "home")
+    away  = _side(tg[tg["home"] == 0], "away")
+    games = home.merge(away, on="Game_ID", how="inner", validate="one_to_one")
+    games = games.dropna(subset=GAME_NUMERIC)
+    cols  = ["Game_ID", "GAME_DATE"] + GAME_FEATURES + [GAME_TARGET]
+    return games.sort_values(["GAME_DATE", "Game_ID"], kind="stable")[cols].reset_index(drop=True)
+
+
+def latest_state(raw):
+    """Each team's state after its last game, plus that game's date."""
+    tg = team_games(raw, pre_game=False)
+    return tg.groupby("team").tail(1).set_index("team")
+
+
+def slate_rows(state, slate, date):
+    """Game rows for upcoming games: `slate` is [(home, away), …] played on `date`."""
+    date = pd.Timestamp(date)
+    rows = []
+    for home, away in slate:
+        row = {}
+        for side, team in zip(GAME_SIDES, (home, away)):
+            st   = state.loc[team]
+            rest = float((date - st["GAME_DATE"]).days)
+            row[f"{side}_team"] = team
+            row.update({f"{side}_{c}": st[c] for c in TEAM_STATE})
+            row[f"{side}_days_rest"] = rest
+            row[f"{side}_back2back"] = int(rest == 1)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=GAME_FEATURES)
+
+
+def score_slate(model, state, slate, date):
+    """P(home win) and P(away win) for each game of a slate, one model row per game."""
+    X = slate_rows(state, slate, date)
+    p = model.predict_proba(X)[:, 1]
+    return pd.DataFrame({"home": X["home_team"], "away": X["away_team"],
+                         "p_home": p, "p_away": 1.0 - p})
+
+
+if __name__ == "__main__":
+    import sys
+
+    raw = storage.load_gamelog()
+    if len(sys.argv) == 1:
+        games = build_games(raw)
+        n_ids = raw["Game_ID"].nunique()
+        print(f"✅ {len(games)} game rows from {len(raw)} team rows ({n_ids} games; "
+              f"{n_ids - len(games)} without a full window on both sides)")
+        print(f"   home win rate {games[GAME_TARGET].mean():.3f}; columns: {', '.join(games.columns[:6])}, …")
+    else:
+        import joblib
+
+        model = joblib.load(GAME_MODEL)
+        state = latest_state(raw)
+        slate = [tuple(g.split(":")) for g in sys.argv[1:]]
+        date  = state["GAME_DATE"].max() + pd.Timedelta(days=1)
+        out   = score_slate(model, state, slate, date)
+        print(out.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
@@ -0,0 +1,183 @@
+# backend/http_cache.py
+"""
+On-disk cache for the data fetchers' HTTP responses (stats.nba.com via
+stats_client.py, basketball-reference in fetch_def_ratings.py).
+
+One entry per URL (endpoint + sorted query parameters) under CACHE_DIR:
+<sha1>.body holds the response bytes, <sha1>.json the URL, the time it was
+fetched and the validators (ETag / Last-Modified).
+
+Freshness (`ttl`, seconds):
+  None     immutable: never refetched. Finished seasons don't change, so
+           `season_ttl` gives None for them.
+  number   served from disk while younger than that; after it, the request
+           is revalidated with If-None-Match / If-Modified-Since, and a 304
+           only refreshes the timestamp. The current season gets CURRENT_TTL.
+
+A body is only stored once the caller's `validate` accepts it (the stats
+client checks it parses as JSON). A truncated or garbled response is never
+cached: it raises to the caller, which retries. A cached entry that
+`validate` rejects is evicted and fetched again.
+
+Offline (NBA_OFFLINE=1, or HttpCache(offline=True)) never touches the
+network: every cached entry is served whatever its age, and a missing one
+raises OfflineMiss. Feature rebuilds and tests then run from disk only.
+
+    python backend/http_cache.py stats    # entries and size
+    python backend/http_cache.py clear    # drop everything
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date
+
+HERE        = os.path.dirname(__file__)
+CACHE_DIR   = os.getenv("NBA_HTTP_CACHE", os.path.join(HERE, "data", "http_cache"))
+OFFLINE     = os.getenv("NBA_OFFLINE", "") not in ("", "0")
+CURRENT_TTL = 6 * 3600
+
+
+class OfflineMiss(LookupError):
+    """Offline mode and nothing cached for the URL."""
+
+
+def season_finished(season, today=None):
+    """"2023-24" is over once August 2024 starts (storage.season_of's boundary)."""
+    today = today or date.today()
+    return today >= date(int(season[:4]) + 1, 8, 1)
+
+
+def season_ttl(season, today=None):
+    return None if season_finished(season, today) else CURRENT_TTL
+
+
+def cache_url(url, params=None):
+    """The URL an entry is keyed on: query parameters sorted, so their order doesn't matter."""
+    if params:
+        query = urllib.parse.urlencode(sorted((k, str(v)) for k, v in params.items()))
+        url   = f"{url}?{query}"
+    return url
+
+
+class HttpCache:
+    def __init__(self, root=CACHE_DIR, offline=OFFLINE):
+        self.root    = root
+        self.offline = offline
+        self.stats   = {"hit": 0, "revalidated": 0, "fetched": 0}
+        self._lock   = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return os.path.join(self.root, key + ".json"), os.path.join(self.root, key + ".body")
+
+    def lookup(self, url):
+        """(meta, body) of the cached entry, or None."""
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        with open(meta_path) as f, open(body_path, "rb") as b:
+            return json.load(f), b.read()
+
+    def store(self, url, body, headers=None):
+        os.makedirs(self.root, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        headers = headers or {}
+        meta    = {"url": url, "fetched_at": time.time(),
+                   "etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+        # body first, then meta: an entry only counts once its meta exists
+        for path, data, mode in ((body_path, body, "wb"), (meta_path, json.dumps(meta), "w")):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, mode) as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return meta
+
+    def evict(self, url):
+        for path in self._paths(url):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def get(self, url, params=None, headers=None, ttl=CURRENT_TTL, timeout=30, before_request=None,
+            validate=None):
+        """
+        Response body for `url` (+ `params`): from disk when fresh, else
+        fetched or revalidated. `before_request` runs right before any
+        network request (stats_client passes its rate limiter).
+        `validate(body)` raises (e.g. ValueError) for a body that mustn't be
+        cached; a fetched one is then not stored and the error propagates,
+        like HTTP and network errors, to the caller, which decides on retries.
+        """
+        url   = cache_url(url, params)
+        entry = self.lookup(url)
+        if entry is not None and validate is not None:
+            try:
+                validate(entry[1])
+            except Exception:   # noqa: BLE001 — whatever `validate` rejects with
+                self.evict(url)
+                entry = None
+        if entry is not None:
+            meta, body = entry
+            if self.offline or ttl is None or time.time() - meta["fetched_at"] < ttl:
+                self._count("hit")
+                return body
+        elif self.offline:
+            raise OfflineMiss(f"not cached (offline mode): {url}")
+
+        headers = dict(headers or {})
+        if entry is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        if before_request:
+            before_request()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as resp:
+                body = resp.read()
+                if validate is not None:
+                    validate(body)
+                self.store(url, body, resp.headers)
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or entry is None:
+                raise
+            self.store(url, body, {"ETag": meta.get("etag"), "Last-Modified": meta.get("last_modified")})
+            self._count("revalidated")
+            return body
+        self._count("fetched")
+        return body
+
+    def size(self):
+        if not os.path.isdir(self.root):
+            return 0, 0
+        files = [e for e in os.scandir(self.root) if e.name.endswith(".body")]
+        return len(files), sum(e.stat().st_size for e in files)
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            for e in os.scandir(self.root):
+                os.remove(e.path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    cache = HttpCache()
+    cmd   = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if cmd == "stats":
+        n, nbytes = cache.size()
+        print(f"{n} cached responses, {nbytes / 1e6:.1f} MB in {cache.root}")
+    elif cmd == "clear":
+        cache.clear()
+        print(f"✅ Cleared {cache.root}")
+    else:
+        sys.exit("usage: python backend/http_cache.py [stats|clear]")
@@ -0,0 +1,240 @@
+# backend/incremental_features.py
+"""
+Incremental refresh of all_teams_features_richer_2025.csv.
+
+A full rebuild re-reads the whole season log, re-sorts it and recomputes
+every rolling window. `FeatureStore` instead keeps the feature rows per
+team plus a small state per team: the state of every registry window (the
+last raw values and the compensated running sums, see
+`feature_engine.RollingState`), the EWMA state (`feature_engine.EwmState`)
+and the date of the last game. Adding games only touches
+  - the new rows themselves, whose windows continue from the team's state
+  - the existing rows of their opponents on the same dates, which get
+    their `opp_win_pct_*` columns filled in
+
+so the work scales with the number of new games, not the season length.
+Reading and writing the CSV is still one pass over the file. The result
+is identical to a full rebuild; `check` replays the last part of the
+season day by day and compares the bytes.
+
+CLI:
+    python backend/incremental_features.py init          # full build → CSV + state
+    python backend/incremental_features.py add new.csv   # append raw game-log rows
+    python backend/incremental_features.py check         # replay vs full rebuild
+"""
+
+import os
+import json
+import math
+import pandas as pd
+
+import storage
+
+from feature_engine import RollingState, EwmState, build_features, prepare_log
+from feature_registry import (STATS, WINDOWS, HALFLIVES, SPECS, OPP_STAT, TABLE_COLUMNS,
+                              DROP_IF_NAN, column)
+
+BASE         = os.path.dirname(__file__)
+DATA_DIR     = os.path.join(BASE, "data")
+LOG_CSV      = os.path.join(DATA_DIR, "all_teams_202425_gamelog.csv")
+FEATURES_CSV = os.path.join(DATA_DIR, "all_teams_features_richer_2025.csv")
+STATE_PATH   = os.path.join(DATA_DIR, "feature_state.json")
+
+SRC   = [st.source for st in STATS.values()]
+NAMES = {spec: [column(s, spec) for s in STATS] for spec in SPECS}
+WIN   = [column("win_pct", spec) for spec in SPECS]
+OPP   = [column(OPP_STAT, spec) for spec in SPECS]
+# build_features merges win_pct_* back keyed on (opp, GAME_DATE), i.e. each
+# row picks up the win% of the row(s) with the same opponent that day. We
+# join on the same key so the two stay identical.
+JOIN_KEY = "opp"
+
+
+class FeatureStore:
+    """Feature rows per team + the per-team state needed to extend them."""
+
+    def __init__(self, windows=WINDOWS, halflives=HALFLIVES):
+        self.windows   = tuple(windows)
+        self.halflives = tuple(halflives)
+        self.rows    = {}     # team → [feature row dicts], in date order
+        self.teams   = {}     # team → {"roll": {window: RollingState}, "ewm": EwmState, "last_date"}
+        self._win    = {}     # (JOIN_KEY, date) → [win_pct per spec], for every game (dropped rows too)
+        self._by_opp = {}     # (opp, date)  → feature rows facing `opp` that day
+
+    def add_games(self, raw):
+        """
+        Append raw game-log rows (any order, several teams). Each team's new
+        games must be later than its last known game, and both rows of a
+        game come in the same call (the ratings pair them up by Game_ID).
+        Returns the number of feature rows added.
+        """
+        raw = prepare_log(raw.copy()).sort_values(["team", "GAME_DATE"], kind="stable")
+
+        # 1️⃣ extend every team's windows with its new games
+        new = []
+        for rec in raw.to_dict("records"):
+            team, date = rec["team"], rec["GAME_DATE"]
+            st = self.teams.get(team)
+            if st is None:
+                st = self.teams[team] = {
+                    "roll": {w: RollingState(len(SRC), w) for w in self.windows},
+                    "ewm":  EwmState(len(SRC), self.halflives),
+                    "last_date": None,
+                }
+            last = st["last_date"]
+            if last is not None and date <= last:
+                raise ValueError(f"{team} game on {date.date()} is not after its last game "
+                                 f"({last.date()}); run a full rebuild")
+            row = {"team": team, "GAME_DATE": date}
+            x = [rec[c] for c in SRC]
+            for w, roll in st["roll"].items():
+                row.update(zip(NAMES[w], roll.push(x).tolist()))
+            for h, means in zip(self.halflives, st["ewm"].push(x).tolist()):
+                row.update(zip(NAMES[f"ewm{h}"], means))
+            row["days_rest"] = (date - last).days if last is not None else 0
+            row["back2back"] = int(row["days_rest"] == 1)
+            row["home"], row["opp"], row["W"] = rec["home"], rec["opp"], rec["W"]
+            st["last_date"] = date
+            self._win[(row[JOIN_KEY], date)] = [row[c] for c in WIN]
+            new.append(row)
+
+        # 2️⃣ opponent win% both ways: new rows look theirs up, and existing
+        #    rows that faced these teams on these dates get filled in
+        missing = [math.nan] * len(OPP)
+        for row in new:
+            row.update(zip(OPP, self._win.get((row["opp"], row["GAME_DATE"]), missing)))
+            for other in self._by_opp.get((row[JOIN_KEY], row["GAME_DATE"]), ()):
+                other.update(zip(OPP, (row[c] for c in WIN)))
+
+        # 3️⃣ keep rows with complete windows (same rule as the full build)
+        added = 0
+        for row in new:
+            if any(math.isnan(row[c]) for c in DROP_IF_NAN):
+                continue
+            self.rows.setdefault(row["team"], []).append(row)
+            self._by_opp.setdefault((row["opp"], row["GAME_DATE"]), []).append(row)
+            added += 1
+        return added
+
+    def to_frame(self):
+        rows = [r for team in sorted(self.rows) for r in self.rows[team]]
+        return pd.DataFrame(rows, columns=TABLE_COLUMNS)
+
+    # ── persistence ──────────────────────────────────────────────
+
+    def save(self, features_csv=FEATURES_CSV, state_path=STATE_PATH, store_dir=storage.FEATURES_DIR):
+        frame = self.to_frame()
+        frame.to_csv(features_csv, index=False)
+        if store_dir:
+            storage.write_features(frame, store_dir)
+        kept  = {(r[JOIN_KEY], r["GAME_DATE"]) for rows in self.rows.values() for r in rows}
+        state = {
+            "windows":   list(self.windows),
+            "halflives": list(self.halflives),
+            "teams":  {t: {"roll": {str(w): r.state() for w, r in st["roll"].items()},
+                           "ewm":  st["ewm"].state(),
+                           "last_date": st["last_date"].isoformat()}
+                       for t, st in self.teams.items()},
+            # win% of games without a feature row, still needed for opponent lookups
+            "extra_win": [[t, d.isoformat(), w] for (t, d), w in self._win.items()
+                          if (t, d) not in kept and not all(map(math.isnan, w))],
+        }
+        tmp = state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, state_path)
+
+    @classmethod
+    def load(cls, features_csv=FEATURES_CSV, state_path=STATE_PATH):
+        with open(state_path) as f:
+            state = json.load(f)
+        store = cls(state["windows"], state["halflives"])
+        for t, st in state["teams"].items():
+            store.teams[t] = {"roll": {int(w): RollingState.from_state(r)
+                                       for w, r in st["roll"].items()},
+                              "ewm":  EwmState.from_state(st["ewm"]),
+                              "last_date": pd.Timestamp(st["last_date"])}
+        for t, d, w in state["extra_win"]:
+            store._win[(t, pd.Timestamp(d))] = w
+        # round_trip: the default float parser can be off by an ulp
+        feats = pd.read_csv(features_csv, parse_dates=["GAME_DATE"], float_precision="round_trip")
+        for row in feats.to_dict("records"):
+            store.rows.setdefault(row["team"], []).append(row)
+            store._win[(row[JOIN_KEY], row["GAME_DATE"])] = [row[c] for c in WIN]
+            store._by_opp.setdefault((row["opp"], row["GAME_DATE"]), []).append(row)
+        return store
+
+
+def read_log(path):
+    """Raw game-log CSV with parsed dates (Game_ID kept as text, it has leading zeros)."""
+    df = pd.read_csv(path, dtype={"Game_ID": str})
+    df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"], format="mixed")
+    return df
+
+
+def check(holdout=0.2):
+    """Build from the first 80% of dates, add the rest day by day (with a
+    save/load round trip halfway), compare with a full rebuild."""
+    import time
+    import tempfile
+
+    raw   = read_log(LOG_CSV)
+    dates = sorted(raw["GAME_DATE"].unique())
+    cut   = dates[int(len(dates) * (1 - holdout))]
+    store = FeatureStore()
+    store.add_games(raw[raw["GAME_DATE"] < cut])
+
+    days, times = [d for d in dates if d >= cut], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for k, d in enumerate(days):
+            if k == len(days) // 2:
+                csv, st = os.path.join(tmp, "f.csv"), os.path.join(tmp, "s.json")
+                store.save(csv, st, store_dir=None)
+                store = FeatureStore.load(csv, st)
+            t0 = time.perf_counter()
+            store.add_games(raw[raw["GAME_DATE"] == d])
+            times.append(time.perf_counter() - t0)
+
+    t0   = time.perf_counter()
+    full = build_features(raw)
+    t_full = time.perf_counter() - t0
+    same = store.to_frame().to_csv(index=False) == full.to_csv(index=False)
+    print(f"{len(days)} daily batches, {sum(times) / len(times) * 1000:.2f} ms per day on average "
+          f"(max {max(times) * 1000:.2f} ms) vs {t_full * 1000:.1f} ms for a full rebuild; "
+          f"identical: {same}")
+    return same
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    ap  = argparse.ArgumentParser(description="Incremental feature refresh")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("init")
+    a = sub.add_parser("add")
+    a.add_argument("csv", help="raw game-log rows, same columns as the merged log")
+    sub.add_parser("check")
+    args = ap.parse_args()
+
+    if args.cmd == "init":
+        store = FeatureStore()
+        store.add_games(read_log(LOG_CSV))
+        store.save()
+        print(f"✅ Wrote {FEATURES_CSV} + {STATE_PATH}")
+    elif args.cmd == "add":
+        if not os.path.exists(STATE_PATH):
+            sys.exit("No feature state yet, run `init` first")
+        new   = read_log(args.csv)
+        store = FeatureStore.load()
+        added = store.add_games(new)
+        # keep the raw log in step, so a full rebuild gives the same table
+        cols = pd.read_csv(LOG_CSV, nrows=0).columns
+        pd.read_csv(args.csv, dtype=str).reindex(columns=cols).to_csv(
+            LOG_CSV, mode="a", header=False, index=False)
+        if os.path.isdir(storage.GAMELOG_DIR):
+            storage.write_gamelog(new, append=True)
+        store.save()
+        print(f"✅ Added {len(new)} games ({added} feature rows)")
+    else:
+        sys.exit(0 if check() else 1)
@@ -0,0 +1,74 @@
+# backend/matchup_index.py
+"""
+In-memory "latest state" index so the API can score a matchup from just
+(team, opponent, venue).
+
+Built once from the richer features CSV: each team's most recent rolling
+stats, including its defensive rating (def_rtg_5, computed from the game
+logs), which is what the other side gets as opp_def_rtg. Every lookup
+afterwards is a couple of dict reads, with no per-request CSV read or
+DataFrame filtering.
+"""
+
+import os
+import csv
+
+from feature_registry import TEAM_STATE, OPP_STAT, column
+
+HERE         = os.path.dirname(__file__)
+FEATURES_CSV = os.path.join(HERE, "data", "all_teams_features_richer_2025.csv")
+DEF_RTG      = column("def_rtg")
+
+# basketball-reference codes (clients may still send them) → NBA stats codes
+ALIASES = {"BRK": "BKN", "CHO": "CHA", "PHO": "PHX"}
+
+
+class MatchupIndex:
+    def __init__(self, state, def_rtg, as_of):
+        self.state   = state      # team → {feature: value}
+        self.def_rtg = def_rtg    # team → latest rolling defensive rating
+        self.as_of   = as_of      # team → date of the latest game used
+        self.default_def_rtg = (
+            sum(def_rtg.values()) / len(def_rtg) if def_rtg else float("nan")
+        )
+
+    @classmethod
+    def from_csv(cls, features_csv=FEATURES_CSV):
+        # plain csv, no pandas: this runs on the API's startup path
+        # latest row per team (GAME_DATE is ISO, so strings sort by date)
+        state, def_rtg, as_of = {}, {}, {}
+        with open(features_csv, newline="") as f:
+            for rec in csv.DictReader(f):
+                team = rec["team"]
+                if team in as_of and rec["GAME_DATE"] < as_of[team]:
+                    continue
+                state[team] = {k: float(rec[k]) for k in TEAM_STATE}
+                state[team]["back2back"] = int(float(rec["back2back"]))
+                def_rtg[team] = float(rec[DEF_RTG])
+                as_of[team] = rec["GAME_DATE"]
+        return cls(state, def_rtg, as_of)
+
+    @property
+    def teams(self):
+        return sorted(self.state)
+
+    def row(self, team, opp, home, **overrides):
+        """
+        Full feature row for `team` vs `opp`; raises KeyError on unknown codes.
+        `overrides` replace any looked-up value (e.g. days_rest).
+        """
+        team = ALIASES.get(team, team)
+        opp  = ALIASES.get(opp, opp)
+        if team not in self.state:
+            raise KeyError(team)
+        if opp not in self.state:
+            raise KeyError(opp)
+
+        row = dict(self.state[team])
+        row["team"]          = team
+        row["opp"]           = opp
+        row["home"]          = int(home)
+        row[column(OPP_STAT)] = self.state[opp][column("win_pct")]
+        row["opp_def_rtg"]   = self.def_rtg.get(opp, self.default_def_rtg)
+        row.update(overrides)
+        return row
@@ -0,0 +1,154 @@
+# backend/matchup_matrix.py
+"""
+Precomputed win probabilities for every ordered (team, opp, venue) pair.
+
+With 30 teams there are only 30 × 29 × 2 = 1,740 rows for a given "latest
+state", so we score the whole grid in one vectorized pass and keep it as a
+(n_teams, n_teams, 2) float64 matrix (~14 KB): `probs[i, j, home]` is the chance
+team i beats team j, home=1 at home, home=0 away. The diagonal is NaN.
+
+The matrix is saved next to a small JSON sidecar that records the team
+order and a fingerprint of the model + feature files it was built from, so
+`load_or_build()` only rescores when one of those changes.
+
+Published models get theirs built once, in their version directory
+(model_registry.publish); API workers only fall back to building it when the
+features have moved on since. The API memory-maps the .npy, so `save`
+never writes into an existing file: it writes a temp file and renames it
+over the old one, and readers still holding the old map keep the old data.
+
+Run as a script to (re)build it:
+    python backend/matchup_matrix.py
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+
+from matchup_index import MatchupIndex, FEATURES_CSV
+from prediction_cache import model_version
+
+HERE        = os.path.dirname(__file__)
+MATRIX_NPY  = os.path.join(HERE, "data", "matchup_matrix.npy")
+MATRIX_META = os.path.join(HERE, "data", "matchup_matrix.json")
+
+
+def paths(directory):
+    """(npy, json) of the matrix kept in `directory` (a model version's)."""
+    return os.path.join(directory, "matchup_matrix.npy"), os.path.join(directory, "matchup_matrix.json")
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def fingerprint(version, features_csv=FEATURES_CSV):
+    """`version` is the serving model's content hash (see model_version)."""
+    return {
+        "model":    version,
+        "features": _file_hash(features_csv),
+    }
+
+
+class MatchupMatrix:
+    def __init__(self, teams, probs, meta):
+        self.teams = list(teams)
+        self.probs = probs
+        self.meta  = meta
+        self._pos  = {t: i for i, t in enumerate(self.teams)}
+
+    def lookup(self, team, opp, home):
+        """Probability for one matchup, or None if either team is unknown."""
+        i, j = self._pos.get(team), self._pos.get(opp)
+        if i is None or j is None or i == j:
+            return None
+        return float(self.probs[i, j, int(home)])
+
+    def to_json(self):
+        """Nested {team: {opp: {"home": p, "away": p}}} for clients."""
+        out = {}
+        for i, t in enumerate(self.teams):
+            out[t] = {
+                o: {"home": round(float(self.probs[i, j, 1]), 4),
+                    "away": round(float(self.probs[i, j, 0]), 4)}
+                for j, o in enumerate(self.teams) if i != j
+            }
+        return out
+
+    def save(self, npy_path=MATRIX_NPY, meta_path=MATRIX_META):
+        # array first, then the sidecar; each renamed into place whole
+        tmp = f"{npy_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, self.probs)
+        os.replace(tmp, npy_path)
+        tmp = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(dict(self.meta, teams=self.teams), f, indent=2)
+        os.replace(tmp, meta_path)
+
+    @classmethod
+    def load(cls, npy_path=MATRIX_NPY, meta_path=MATRIX_META):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        teams = meta.pop("teams")
+        return cls(teams, np.load(npy_path, mmap_mode="r"), meta)
+
+
+def build(scorer, index, meta=None):
+    """Score the full grid with a single call to the compiled scorer."""
+    teams = index.teams
+    n     = len(teams)
+    rows, cells = [], []
+    for i, t in enumerate(teams):
+        for j, o in enumerate(teams):
+            if i == j:
+                continue
+            for home in (0, 1):
+                rows.append(index.row(t, o, home))
+                cells.append((i, j, home))
+
+    p = scorer.predict_proba(rows)[:, 1]
+
+    probs = np.full((n, n, 2), np.nan, dtype=np.float64)
+    ii, jj, hh = np.array(cells).T
+    probs[ii, jj, hh] = p
+    return MatchupMatrix(teams, probs, meta or {})
+
+
+def load_or_build(scorer, version, index=None,
+                  npy_path=MATRIX_NPY, meta_path=MATRIX_META):
+    """Reuse the on-disk matrix if it matches the current model + features."""
+    fp = fingerprint(version)
+    if os.path.exists(npy_path) and os.path.exists(meta_path):
+        cached = MatchupMatrix.load(npy_path, meta_path)
+        if cached.meta.get("fingerprint") == fp:
+            return cached
+
+    index  = index or MatchupIndex.from_csv()
+    matrix = build(scorer, index, meta={"fingerprint": fp})
+    matrix.save(npy_path, meta_path)
+    return matrix
+
+
+if __name__ == "__main__":
+    import time
+    import joblib
+    from compiled_model import CompiledEnsemble
+
+    MODEL_PATH = os.path.join(HERE, "model_global_ensemble_calibrated.pkl")
+
+    # 1️⃣ Compile the calibrated ensemble
+    scorer = CompiledEnsemble.from_calibrated(joblib.load(MODEL_PATH))
+
+    # 2️⃣ Score the grid
+    t0 = time.perf_counter()
+    matrix = build(scorer, MatchupIndex.from_csv(),
+                   meta={"fingerprint": fingerprint(model_version(MODEL_PATH))})
+    dt = time.perf_counter() - t0
+
+    # 3️⃣ Save
+    matrix.save()
+    n = len(matrix.teams)
+    print(f"✅ Scored {n * (n - 1) * 2} matchups in {dt:.2f}s → {MATRIX_NPY}")
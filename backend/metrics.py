@@ -0,0 +1,255 @@
+# backend/metrics.py
+"""
+Tiny Prometheus-text metrics for the predict path.
+
+No client library: counters and fixed-bucket histograms guarded by one
+lock, rendered in the text exposition format on demand. Recording is a
+bisect + two additions, cheap enough to leave on in production.
+
+    STAGE = Histogram("predict_stage_seconds", "…", labelnames=("stage",))
+    with STAGE.time(stage="parse"):
+        ...
+
+Several processes (gunicorn workers): with METRICS_DIR set, every process
+writes a snapshot of its series to <METRICS_DIR>/<pid>.json, every
+FLUSH_SECONDS from a background thread (`start_flusher`) and right before
+it answers a scrape. `render` and `sources` then merge all the files, so
+/metrics and the stats endpoints describe the whole server, whichever
+worker answers. Counters and histograms are summed. Gauges are summed over
+live workers only. When a worker exits, `mark_dead` folds its counters and
+histograms into dead.json, so the totals never go backwards.
+gunicorn.conf.py sets METRICS_DIR and the hooks. Without it, everything
+stays per process.
+"""
+
+import os
+import json
+import glob
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# 50 µs … 2.5 s, roughly ×2.5 per step
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+MULTIPROC_DIR = os.getenv("METRICS_DIR")
+FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 1))
+DEAD          = "dead.json"
+
+_lock     = threading.Lock()
+_registry = []
+_sources  = {}    # name → fn() returning a JSON-able dict (e.g. cache stats)
+
+
+def _fmt_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+class Counter:
+    def __init__(self, name, doc, labelnames=()):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self._values = {}
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def state(self):
+        return {"name": self.name, "doc": self.doc, "type": "counter", "labelnames": self.labelnames,
+                "series": [[list(k), v] for k, v in self._values.items()]}
+
+
+class Histogram:
+    def __init__(self, name, doc, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}   # label values → [bucket counts…, +Inf count], sum
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        i   = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1]    += value
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def state(self):
+        return {"name": self.name, "doc": self.doc, "type": "histogram", "labelnames": self.labelnames,
+                "buckets": self.buckets,
+                "series": [[list(k), [list(counts), total]] for k, (counts, total) in self._series.items()]}
+
+
+class Gauge:
+    """
+    Value read from a callback at scrape time (e.g. cache size). Use
+    kind="counter" for monotonic totals kept elsewhere.
+    """
+
+    def __init__(self, name, doc, fn, kind="gauge"):
+        self.name, self.doc, self.fn, self.kind = name, doc, fn, kind
+        _registry.append(self)
+
+    def state(self):
+        # "live": a point-in-time value, only meaningful while its process runs
+        return {"name": self.name, "doc": self.doc, "type": self.kind, "labelnames": (),
+                "live": self.kind == "gauge", "series": [[[], self.fn()]]}
+
+
+def _lines(st):
+    """Prometheus text lines of one metric's state (see the classes' `state`)."""
+    name, names = st["name"], st["labelnames"]
+    lines = [f"# HELP {name} {st['doc']}", f"# TYPE {name} {st['type']}"]
+    for key, v in sorted(st["series"], key=lambda kv: kv[0]):
+        if st["type"] != "histogram":
+            lines.append(f"{name}{_fmt_labels(names, key)} {v}")
+            continue
+        counts, total = v
+        cum = 0
+        for upper, c in zip(tuple(st["buckets"]) + (float("inf"),), counts):
+            cum += c
+            le = "+Inf" if upper == float("inf") else repr(upper)
+            lines.append(f"{name}_bucket{_fmt_labels(names, key, [('le', le)])} {cum}")
+        lines.append(f"{name}_sum{_fmt_labels(names, key)} {total}")
+        lines.append(f"{name}_count{_fmt_labels(names, key)} {cum}")
+    return lines
+
+
+def _merge(states, live=True):
+    """Sum metric states from several processes (dropping live-only gauges unless `live`)."""
+    merged = {}
+    for st in states:
+        if st.get("live") and not live:
+            continue
+        m = merged.setdefault(st["name"], dict(st, series={}))
+        for key, v in st["series"]:
+            key = tuple(key)
+            old = m["series"].get(key)
+            if old is None:
+                m["series"][key] = v
+            elif st["type"] == "histogram":
+                m["series"][key] = [[a + b for a, b in zip(old[0], v[0])], old[1] + v[1]]
+            else:
+                m["series"][key] = old + v
+    return [dict(m, series=[[list(k), v] for k, v in m["series"].items()]) for m in merged.values()]
+
+
+def add_source(name, fn):
+    """Include fn()'s dict in each process's snapshot, for `sources(name)`."""
+    _sources[name] = fn
+
+
+def snapshot():
+    """This process's metric states + source dicts."""
+    with _lock:
+        states = [m.state() for m in _registry]
+    return {"pid": os.getpid(), "metrics": states,
+            "sources": {name: fn() for name, fn in _sources.items()}}
+
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def flush(directory=MULTIPROC_DIR):
+    if directory:
+        _write(os.path.join(directory, f"{os.getpid()}.json"), snapshot())
+
+
+def _snapshots(directory):
+    out = []
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            with open(path) as f:
+                out.append(json.load(f))
+        except (OSError, ValueError):    # gone or replaced under us; next scrape has it
+            continue
+    return out
+
+
+def _collect(directory=MULTIPROC_DIR):
+    if not directory:
+        return [snapshot()]
+    flush(directory)
+    return _snapshots(directory)
+
+
+def render(directory=MULTIPROC_DIR):
+    """Every registered metric in Prometheus text format, summed over the workers."""
+    snaps  = _collect(directory)
+    states = _merge([st for snap in snaps for st in snap["metrics"]
+                     if not (snap.get("dead") and st.get("live"))])
+    lines = [line for st in states for line in _lines(st)]
+    return "\n".join(lines) + "\n"
+
+
+def sources(name, directory=MULTIPROC_DIR):
+    """{pid: fn()} of the `name` source, for every live process."""
+    return {snap["pid"]: snap["sources"][name] for snap in _collect(directory)
+            if not snap.get("dead") and name in snap.get("sources", {})}
+
+
+def mark_dead(pid, directory=MULTIPROC_DIR):
+    """Fold an exited process's counters and histograms into dead.json (run in the master)."""
+    if not directory:
+        return
+    path = os.path.join(directory, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        states = json.load(f)["metrics"]
+    dead_path = os.path.join(directory, DEAD)
+    if os.path.exists(dead_path):
+        with open(dead_path) as f:
+            states += json.load(f)["metrics"]
+    _write(dead_path, {"pid": None, "dead": True, "metrics": _merge(states, live=False), "sources": {}})
+    os.remove(path)
+
+
+_flusher = {"pid": None, "thread": None}
+
+
+def start_flusher(interval=FLUSH_SECONDS, directory=MULTIPROC_DIR):
+    """Flush this process's snapshot every `interval` s (no-op without a directory).
+    Threads don't survive fork, so each worker starts its own."""
+    if not directory or (_flusher["pid"] == os.getpid() and _flusher["thread"].is_alive()):
+        return
+    with _lock:
+        if _flusher["pid"] == os.getpid() and _flusher["thread"].is_alive():
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    flush(directory)
+                except OSError:
+                    pass
+
+        _flusher["pid"]    = os.getpid()
+        _flusher["thread"] = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+        _flusher["thread"].start()
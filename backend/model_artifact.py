@@ -0,0 +1,114 @@
+# backend/model_artifact.py
+"""
+Load-time-optimized serving artifact for the calibrated ensemble.
+
+Unpickling `model_global_ensemble_calibrated.pkl` means importing pandas,
+sklearn and xgboost (~5 s here) and rebuilding thousands of tree objects.
+The artifact is the `CompiledEnsemble` state instead: one `.npy` file per
+array (memory-mapped on load, so pages are shared and only touched when
+used) plus a `manifest.json` with the column lists, one-hot maps, Platt
+parameters and the content hash of the pickle it was exported from.
+Loading it needs nothing but NumPy. The distilled students (fast tier,
+see distill_student.py) are exported the same way; their metadata carries
+`"kind": "student"` or `"kind": "tree_student"`.
+
+Export (run after training):
+    python backend/model_artifact.py
+"""
+
+import os
+import json
+import time
+import shutil
+import numpy as np
+
+from compiled_model import CompiledEnsemble
+from student_model import STUDENTS
+
+HERE         = os.path.dirname(__file__)
+MODEL_PATH   = os.path.join(HERE, "model_global_ensemble_calibrated.pkl")
+ARTIFACT_DIR = os.path.join(HERE, "model_artifact")
+MANIFEST     = "manifest.json"
+FORMAT       = 1
+
+
+def _swap_in(staging, out_dir):
+    """Replace `out_dir` with `staging` by renames; the old files are only unlinked."""
+    old = out_dir.rstrip(os.sep) + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.replace(out_dir, old)
+    os.replace(staging, out_dir)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def export(scorer, out_dir, source_version=None, verified_dev=None, extra=None):
+    """
+    Write `scorer` as <out_dir>/manifest.json + one .npy per array.
+
+    A running API may have the previous export memory-mapped, and rewriting
+    those files in place truncates them under the map (SIGBUS). So the new
+    export goes into <out_dir>.partial and is swapped in whole, the way
+    model_registry.publish adds versions; mapped old files stay valid.
+    """
+    staging = out_dir.rstrip(os.sep) + ".partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    arrays, meta = scorer.state()
+    for name, arr in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(arr))
+    manifest = {
+        "format":         FORMAT,
+        "source_version": source_version,
+        "verified_max_deviation": verified_dev,
+        "arrays":         sorted(arrays),
+        "model":          meta,
+        **(extra or {}),
+    }
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(manifest, f)
+    _swap_in(staging, out_dir)
+    return manifest
+
+
+def read_manifest(art_dir):
+    path = os.path.join(art_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load(art_dir, mmap=True):
+    """Rebuild the CompiledEnsemble (or student) from an exported directory."""
+    manifest = read_manifest(art_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No {MANIFEST} in {art_dir}")
+    if manifest["format"] != FORMAT:
+        raise ValueError(f"Unsupported artifact format {manifest['format']}")
+    mode   = "r" if mmap else None
+    arrays = {name: np.load(os.path.join(art_dir, f"{name}.npy"), mmap_mode=mode)
+              for name in manifest["arrays"]}
+    cls    = STUDENTS.get(manifest["model"].get("kind"), CompiledEnsemble)
+    return cls.from_state(arrays, manifest["model"]), manifest
+
+
+if __name__ == "__main__":
+    import joblib
+    from prediction_cache import model_version
+
+    # 1️⃣ Load & compile the calibrated ensemble
+    model  = joblib.load(MODEL_PATH)
+    scorer = CompiledEnsemble.from_calibrated(model)
+    dev    = scorer.verify(model)
+
+    # 2️⃣ Export it
+    export(scorer, ARTIFACT_DIR, source_version=model_version(MODEL_PATH), verified_dev=dev)
+
+    # 3️⃣ Round-trip check
+    t0 = time.perf_counter()
+    loaded, _ = load(ARTIFACT_DIR)
+    dt = time.perf_counter() - t0
+    num, cat = scorer.make_probe()
+    same = np.array_equal(loaded.predict_proba_arrays(num, cat), scorer.predict_proba_arrays(num, cat))
+    print(f"✅ Exported artifact to {ARTIFACT_DIR} (max dev {dev:.1e}, reload {dt * 1000:.0f} ms, identical={same})")
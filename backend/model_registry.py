@@ -0,0 +1,260 @@
+# backend/model_registry.py
+"""
+Versioned model directory + hot reload.
+
+Layout (backend/models/, override with MODEL_DIR):
+
+    models/
+      manifest.json          {"current": "<version>", "versions": {...}}
+      <version>/             one directory per published model
+        manifest.json        NumPy artifact (see model_artifact.py)
+        *.npy
+        model.pkl            the pickled sklearn ensemble it came from
+        matchup_matrix.*     its precomputed matchup grid (matchup_matrix.py)
+
+The version id is the pickle's content hash, so republishing the same
+model is a no-op. `publish` writes the new version directory first and
+flips "current" last with an atomic rename, so readers never see a
+half-written model.
+
+In the API a `ModelWatcher` thread polls manifest.json; when "current"
+changes it loads and warms the new version off the request path and then
+swaps `ModelHolder.current` in one assignment. Requests read
+`holder.current` once and use that object throughout, so in-flight
+requests finish on the model they started with.
+
+CLI:
+    python backend/model_registry.py publish [path/to/model.pkl]
+    python backend/model_registry.py list
+    python backend/model_registry.py activate <version>
+    python backend/model_registry.py prune [--keep 3]
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+from datetime import datetime, timezone
+
+import model_artifact
+import matchup_matrix
+from matchup_index import MatchupIndex
+from prediction_cache import model_version
+
+HERE      = os.path.dirname(__file__)
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(HERE, "models"))
+MANIFEST  = "manifest.json"
+PICKLE    = "model.pkl"
+
+
+# ── manifest helpers ─────────────────────────────────────────────
+
+def read_manifest(model_dir=MODEL_DIR):
+    path = os.path.join(model_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"current": None, "versions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(manifest, model_dir=MODEL_DIR):
+    tmp = os.path.join(model_dir, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(model_dir, MANIFEST))
+
+
+def publish(pkl_path, model_dir=MODEL_DIR, activate=True):
+    """Compile, verify and export `pkl_path` as a new version; return its id."""
+    import joblib
+    from compiled_model import CompiledEnsemble
+
+    version  = model_version(pkl_path)
+    ver_dir  = os.path.join(model_dir, version)
+    manifest = read_manifest(model_dir)
+
+    if version not in manifest["versions"]:
+        model  = joblib.load(pkl_path)
+        scorer = CompiledEnsemble.from_calibrated(model)
+        dev    = scorer.verify(model)
+
+        staging = ver_dir + ".partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        model_artifact.export(scorer, staging, source_version=version, verified_dev=dev)
+        shutil.copy2(pkl_path, os.path.join(staging, PICKLE))
+        if os.path.exists(matchup_matrix.FEATURES_CSV):
+            matrix = matchup_matrix.build(scorer, MatchupIndex.from_csv(),
+                                          meta={"fingerprint": matchup_matrix.fingerprint(version)})
+            matrix.save(*matchup_matrix.paths(staging))
+        os.replace(staging, ver_dir)
+
+        manifest["versions"][version] = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "source":  os.path.abspath(pkl_path),
+            "verified_max_deviation": dev,
+        }
+    if activate:
+        manifest["current"] = version
+    _write_manifest(manifest, model_dir)
+    return version
+
+
+def activate(version, model_dir=MODEL_DIR):
+    manifest = read_manifest(model_dir)
+    if version not in manifest["versions"]:
+        raise KeyError(f"Unknown model version {version}")
+    manifest["current"] = version
+    _write_manifest(manifest, model_dir)
+
+
+def prune(keep=3, model_dir=MODEL_DIR):
+    """Delete all but the `keep` newest versions (never the current one)."""
+    manifest = read_manifest(model_dir)
+    by_age   = sorted(manifest["versions"], key=lambda v: manifest["versions"][v]["created"], reverse=True)
+    removed  = [v for v in by_age[keep:] if v != manifest["current"]]
+    for v in removed:
+        del manifest["versions"][v]
+    _write_manifest(manifest, model_dir)
+    for v in removed:
+        shutil.rmtree(os.path.join(model_dir, v), ignore_errors=True)
+    return removed
+
+
+# ── serving side ─────────────────────────────────────────────────
+
+class ServingModel:
+    """Everything one model version needs to answer requests."""
+
+    def __init__(self, version, scorer, pkl_path, extras=None):
+        self.version  = version
+        self.scorer   = scorer          # CompiledEnsemble, or None → use the pickle
+        self.pkl_path = pkl_path
+        self.extras   = extras or {}    # per-version derived state (e.g. matchup matrix)
+        self._model   = None
+        self._lock    = threading.Lock()
+
+    @property
+    def model(self):
+        """The pickled sklearn ensemble, unpickled on first use only."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import joblib
+                    self._model = joblib.load(self.pkl_path)
+        return self._model
+
+    def warm(self):
+        """Touch every array once so the first real request doesn't page-fault."""
+        if self.scorer is not None:
+            num, cat = self.scorer.make_probe(8)
+            self.scorer.predict_proba_arrays(num, cat)
+
+
+def load_version(version, model_dir=MODEL_DIR, use_compiled=True):
+    ver_dir = os.path.join(model_dir, version)
+    scorer  = model_artifact.load(ver_dir)[0] if use_compiled else None
+    return ServingModel(version, scorer, os.path.join(ver_dir, PICKLE))
+
+
+class ModelHolder:
+    """Atomic pointer to the ServingModel currently answering requests."""
+
+    def __init__(self, current):
+        self.current = current
+        self.swaps   = 0
+
+    def swap(self, new):
+        old, self.current = self.current, new
+        self.swaps += 1
+        return old
+
+
+class ModelWatcher:
+    """
+    Background thread that polls the registry manifest and hot-swaps the
+    holder when "current" changes. `prepare(serving)` runs on the new model
+    before the swap (warm-up, derived state); `on_swap(new, old)` after.
+    """
+
+    def __init__(self, holder, model_dir=MODEL_DIR, interval=10.0,
+                 use_compiled=True, prepare=None, on_swap=None, logger=None):
+        self.holder       = holder
+        self.model_dir    = model_dir
+        self.interval     = interval
+        self.use_compiled = use_compiled
+        self.prepare      = prepare
+        self.on_swap      = on_swap
+        self.logger       = logger
+        self.last_error   = None
+        self._thread      = None
+        self._pid         = None
+        self._lock        = threading.Lock()
+
+    def ensure_started(self):
+        # threads don't survive fork, so pre-fork workers start their own
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+                self._pid    = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+                self._thread.start()
+
+    def check(self):
+        """Load + swap if the manifest points at a new version. Returns True on swap."""
+        wanted = read_manifest(self.model_dir)["current"]
+        if not wanted or wanted == self.holder.current.version:
+            return False
+        new = load_version(wanted, self.model_dir, self.use_compiled)
+        new.warm()
+        if self.prepare:
+            self.prepare(new)
+        old = self.holder.swap(new)
+        if self.on_swap:
+            self.on_swap(new, old)
+        if self.logger:
+            self.logger.info("Swapped model %s → %s", old.version, new.version)
+        return True
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+                self.last_error = None
+            except Exception as exc:   # keep serving the old model
+                self.last_error = str(exc)
+                if self.logger:
+                    self.logger.warning("Model reload failed: %s", exc)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap  = argparse.ArgumentParser(description="Manage the versioned model directory")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p   = sub.add_parser("publish")
+    p.add_argument("pkl", nargs="?", default=os.path.join(HERE, "model_global_ensemble_calibrated.pkl"))
+    p.add_argument("--no-activate", action="store_true")
+    sub.add_parser("list")
+    a = sub.add_parser("activate")
+    a.add_argument("version")
+    r = sub.add_parser("prune")
+    r.add_argument("--keep", type=int, default=3)
+    args = ap.parse_args()
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    if args.cmd == "publish":
+        v = publish(args.pkl, activate=not args.no_activate)
+        print(f"✅ Published {v} → {os.path.join(MODEL_DIR, v)}")
+    elif args.cmd == "list":
+        m = read_manifest()
+        for v, info in sorted(m["versions"].items(), key=lambda kv: kv[1]["created"]):
+            mark = "*" if v == m["current"] else " "
+            print(f"{mark} {v}  {info['created']}  {info['source']}")
+    elif args.cmd == "activate":
+        activate(args.version)
+        print(f"✅ {args.version} is now current")
+    else:
+        print("🗑️  Removed:", prune(args.keep) or "nothing")
@@ -0,0 +1,256 @@
+# backend/pipeline.py
+"""
+One entry point for the data → model pipeline.
+
+The stages are the existing scripts, declared below as a DAG (STAGES).
+Each one is run as its own process from the working directory it expects,
+so the `data/...` vs `backend/data/...` paths inside them keep working.
+
+A stage is skipped when nothing it depends on has changed. Its cache key
+is a hash of:
+  - its code: the script plus every local module it imports, recursively
+  - the content of its input files (other stages' outputs included)
+and the run is recorded in data/pipeline_state.json together with the
+hashes of its outputs. If an output was changed or deleted by hand, the
+stage runs again. Fetch stages (external=True) have no inputs, and their
+outputs change between runs on their own (incremental fetches append to
+them), so only their code is compared: they run when their outputs are
+missing, when their code changed since the recorded run, or with
+--refresh.
+
+Stages whose dependencies are done run concurrently (e.g. the two
+trainers, or the artifact, student and matrix builds). A failed stage
+blocks only what depends on it. Optional stages (the student, whose
+fidelity gate may reject it) are reported when they fail but don't fail
+the run.
+
+Publishing the trained model to the versioned model directory (which
+running APIs hot-reload) is its own stage, `publish`; the trainer only
+writes the pickle.
+
+    python backend/pipeline.py                  # everything that's stale
+    python backend/pipeline.py model matrix     # these and what they need
+    python backend/pipeline.py --dry-run        # show what would run
+    python backend/pipeline.py --refresh        # re-fetch the raw data too
+    python backend/pipeline.py --force features # rerun one stage regardless
+"""
+
+import os
+import ast
+import sys
+import json
+import time
+import hashlib
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+HERE       = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(HERE, "data", "pipeline_state.json")
+
+Stage = namedtuple("Stage", "name script cwd deps inputs outputs external args optional",
+                   defaults=((), False))
+
+LOG      = "data/all_teams_202425_gamelog.csv"
+FEATURES = "data/all_teams_features_richer_2025.csv"
+MODEL    = "model_global_ensemble_calibrated.pkl"
+
+# 1️⃣ The DAG (paths relative to backend/; the store directories count as
+#    inputs too, since readers prefer them when present)
+STAGES = [
+    Stage("team_logs",   "data/fetch_all_team_logs.py", HERE, [], [],
+          [LOG, "data/store/gamelog"], True),
+    Stage("features",    "data/prepare_all_teams.py", HERE, ["team_logs"],
+          [LOG, "data/store/gamelog"], [FEATURES, "data/store/features"], False),
+    Stage("model",       "train_global_ensemble_calibrated.py", HERE, ["features"],
+          [FEATURES, "data/store/features"], [MODEL], False),
+    # no outputs: models/ also changes on activate / prune, which mustn't re-publish
+    Stage("publish",     "model_registry.py", HERE, ["model", "features"],
+          [MODEL, FEATURES], [], False, ("publish",)),
+    Stage("game_model",  "train_game_model.py", HERE, ["team_logs"],
+          [LOG, "data/store/gamelog"], ["model_game_calibrated.pkl"], False),
+    Stage("artifact",    "model_artifact.py", HERE, ["model"],
+          [MODEL], ["model_artifact"], False),
+    Stage("student",     "distill_student.py", HERE, ["model", "features"],
+          [MODEL, FEATURES, "data/store/features"], ["student_model"], False, optional=True),
+    Stage("matrix",      "matchup_matrix.py", HERE, ["model", "features"],
+          [MODEL, FEATURES], ["data/matchup_matrix.npy", "data/matchup_matrix.json"], False),
+]
+BY_NAME = {s.name: s for s in STAGES}
+
+
+# 2️⃣ Hashing
+
+def hash_path(path):
+    """sha256 of a file, or of every file under a directory (names included); None if missing."""
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    files = [path] if os.path.isfile(path) else sorted(
+        os.path.join(d, f) for d, _, fs in os.walk(path) for f in fs)
+    for f in files:
+        h.update(os.path.relpath(f, path).encode())
+        with open(f, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def local_modules(script):
+    """The script plus every backend module it imports, recursively."""
+    seen, todo = set(), [os.path.join(HERE, script)]
+    while todo:
+        path = todo.pop()
+        if path in seen or not os.path.exists(path):
+            continue
+        seen.add(path)
+        with open(path) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                rel = name.replace(".", os.sep) + ".py"
+                for base in (HERE, os.path.dirname(path)):
+                    todo.append(os.path.join(base, rel))
+    return sorted(seen)
+
+
+def stage_key(stage):
+    h = hashlib.sha256(" ".join(stage.args).encode())
+    for path in local_modules(stage.script):
+        h.update(os.path.relpath(path, HERE).encode())
+        h.update(hash_path(path).encode())
+    for path in stage.inputs:
+        h.update(path.encode())
+        h.update((hash_path(os.path.join(HERE, path)) or "missing").encode())
+    return h.hexdigest()
+
+
+def output_hashes(stage):
+    return {p: hash_path(os.path.join(HERE, p)) for p in stage.outputs}
+
+
+# 3️⃣ Running
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def is_fresh(stage, key, state, refresh=False):
+    """True when the recorded run still stands: same key, outputs untouched."""
+    rec  = state.get(stage.name)
+    outs = output_hashes(stage)
+    if any(h is None for h in outs.values()):
+        return False
+    if stage.external:
+        # outputs found without a record (fetched by hand) are adopted as is
+        return not refresh and (rec is None or rec["key"] == key)
+    return rec is not None and rec["key"] == key and rec["outputs"] == outs
+
+
+def run_stage(stage):
+    """Run the stage's script in its own process; returns (ok, seconds, output tail)."""
+    t0   = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.join(HERE, stage.script), *stage.args], cwd=stage.cwd,
+                          capture_output=True, text=True)
+    tail = (proc.stdout + proc.stderr).strip().splitlines()[-5:]
+    return proc.returncode == 0, time.perf_counter() - t0, tail
+
+
+def needed(targets):
+    """The targets plus everything they depend on, in declaration order."""
+    want, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in BY_NAME:
+            raise SystemExit(f"Unknown stage {name!r}; stages: {', '.join(BY_NAME)}")
+        if name not in want:
+            want.add(name)
+            todo.extend(BY_NAME[name].deps)
+    return [s for s in STAGES if s.name in want]
+
+
+def run(targets=None, jobs=4, refresh=False, force=(), dry_run=False):
+    stages  = needed(targets or [s.name for s in STAGES])
+    state   = load_state()
+    status  = {}            # name → "cached" | "ran" | "failed" | "blocked" | "stale"
+    seconds = {}
+    pending = {s.name: s for s in stages}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # start every stage whose dependencies are settled
+            for name, stage in list(pending.items()):
+                deps = [status.get(d) for d in stage.deps]
+                if any(d is None for d in deps):
+                    continue
+                del pending[name]
+                if any(d in ("failed", "blocked") for d in deps):
+                    status[name] = "blocked"
+                    continue
+                key = stage_key(stage)
+                if "stale" not in deps and name not in force and is_fresh(stage, key, state, refresh):
+                    status[name], seconds[name] = "cached", 0.0
+                    if name not in state and not dry_run:
+                        state[name] = {"key": key, "outputs": output_hashes(stage)}
+                        save_state(state)
+                elif dry_run:
+                    status[name], seconds[name] = "stale", 0.0
+                else:
+                    print(f"▶️  {name}: {stage.script}", flush=True)
+                    running[pool.submit(run_stage, stage)] = (stage, key)
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                stage, key = running.pop(fut)
+                ok, dt, tail = fut.result()
+                seconds[stage.name] = dt
+                if ok:
+                    status[stage.name] = "ran"
+                    # inputs may have been rewritten by a concurrent stage; the
+                    # key is recomputed on the next run in that case anyway
+                    state[stage.name] = {"key": key, "outputs": output_hashes(stage)}
+                    save_state(state)
+                else:
+                    status[stage.name] = "failed"
+                    mark = "⚠️  optional stage" if stage.optional else "❌"
+                    print(f"{mark} {stage.name} failed:\n   " + "\n   ".join(tail), flush=True)
+
+    # 4️⃣ Summary
+    print(f"\n{'stage':12s} {'status':8s} {'seconds':>8s}")
+    for s in stages:
+        print(f"{s.name:12s} {status[s.name]:8s} {seconds.get(s.name, 0.0):8.2f}")
+    hits = sum(v == "cached" for v in status.values())
+    print(f"{hits}/{len(stages)} cache hits")
+    return all(status[s.name] in ("cached", "ran", "stale") or s.optional for s in stages)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Run the data → model pipeline")
+    ap.add_argument("targets", nargs="*", help=f"stages to bring up to date ({', '.join(BY_NAME)})")
+    ap.add_argument("-j", "--jobs", type=int, default=4, help="stages to run at once")
+    ap.add_argument("--refresh", action="store_true", help="re-run the fetch stages")
+    ap.add_argument("--force", action="append", default=[], help="re-run this stage regardless")
+    ap.add_argument("--dry-run", action="store_true", help="only report what is stale")
+    args = ap.parse_args()
+    sys.exit(0 if run(args.targets, args.jobs, args.refresh, set(args.force), args.dry_run) else 1)
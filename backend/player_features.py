@@ -0,0 +1,154 @@
+# backend/player_features.py
+"""
+Team availability features from the player game logs (the store's players
+table, see data/fetch_player_stats_nba_api.py --all).
+
+One row per team-game (columns: feature_registry.AVAILABILITY):
+  players        how many players got minutes
+  rot_avail_min  share of the rotation's expected minutes that played
+  rot_avail_usg  the same, weighted by expected usage (FGA + 0.44·FTA + TOV)
+  min_out        expected minutes of the rotation players who sat
+  form_pm36      plus-minus per 36 over each player's last PLAYER_WINDOW
+                 games, averaged over those who played, weighted by their
+                 expected minutes
+
+A player's expected minutes / usage are their average over the team's
+previous PLAYER_WINDOW games, counting the games they missed as 0, so the
+"rotation" is whoever has played for the team lately. A player who later
+plays for another team that season (traded, waived and signed) stops
+counting for the old team after their last game for it. Only earlier games
+go into the expectations and the form; who plays is known at tip-off.
+
+Everything is a handful of sorts, merges and groupby sums/shifts over
+the whole table at once (`availability`), no per-team or per-player
+Python loops, so many seasons take seconds.
+
+    python backend/player_features.py              # every stored season → availability table
+    python backend/player_features.py 2024-25      # just these seasons
+    python backend/player_features.py bench        # synthetic multi-season timing
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+import storage
+from feature_registry import AVAILABILITY, PLAYER_WINDOW
+
+GAME_KEYS = ["season", "team", "Game_ID", "GAME_DATE"]
+LOG_COLS  = ["season", "Player_ID", "team", "Game_ID", "GAME_DATE",
+             "MIN", "FGA", "FTA", "TOV", "PLUS_MINUS"]
+
+
+def _trailing_sum(values, groups, window):
+    """Sum of the previous `window` values within each group (the row itself left out)."""
+    before = values.groupby(groups).cumsum() - values
+    return before - before.groupby(groups).shift(window, fill_value=0)
+
+
+def availability(pl, window=PLAYER_WINDOW):
+    """Per team-game availability features from player-game rows (LOG_COLS)."""
+    pl = pl[LOG_COLS].assign(team=pl["team"].astype(str), season=pl["season"].astype(str),
+                             MIN=pl["MIN"].astype(float),
+                             usg=pl["FGA"] + 0.44 * pl["FTA"] + pl["TOV"])
+
+    # 1️⃣ every (player, team-game) of the player's team-season, 0 minutes when out,
+    #    up to their last game for the team if they went on to play elsewhere
+    games  = pl[GAME_KEYS].drop_duplicates()
+    roster = pl.groupby(["season", "team", "Player_ID"], as_index=False)["GAME_DATE"].max()
+    roster["moved"] = roster["GAME_DATE"] < roster.groupby(["season", "Player_ID"])["GAME_DATE"].transform("max")
+    grid   = roster.rename(columns={"GAME_DATE": "last"}).merge(games, on=["season", "team"])
+    grid   = (grid[~grid["moved"] | (grid["GAME_DATE"] <= grid["last"])]
+                    .drop(columns=["last", "moved"])
+                    .merge(pl[GAME_KEYS + ["Player_ID", "MIN", "usg"]], on=GAME_KEYS + ["Player_ID"], how="left")
+                    .fillna({"MIN": 0.0, "usg": 0.0})
+                    .sort_values(["season", "team", "Player_ID", "GAME_DATE"], kind="stable", ignore_index=True))
+
+    # 2️⃣ expected minutes / usage: trailing mean over the team's previous games
+    gid = grid.groupby(["season", "team", "Player_ID"], sort=False).ngroup()
+    n   = grid.groupby(gid).cumcount().clip(upper=window).replace(0, np.nan)
+    exp_min = (_trailing_sum(grid["MIN"], gid, window) / n).fillna(0.0)
+    exp_usg = (_trailing_sum(grid["usg"], gid, window) / n).fillna(0.0)
+    played  = grid["MIN"] > 0
+
+    # 3️⃣ form: plus-minus per 36 over the player's own last `window` games
+    pl  = pl.sort_values(["season", "Player_ID", "GAME_DATE"], kind="stable", ignore_index=True)
+    pid = pl.groupby(["season", "Player_ID"], sort=False).ngroup()
+    pm  = _trailing_sum(pl["PLUS_MINUS"].astype(float), pid, window)
+    mins = _trailing_sum(pl["MIN"], pid, window)
+    form = pl[["season", "Player_ID", "Game_ID"]].assign(form=36 * pm / mins.replace(0, np.nan))
+    grid = grid.merge(form, on=["season", "Player_ID", "Game_ID"], how="left")
+
+    # 4️⃣ one groupby sum per team-game
+    has_form = played & grid["form"].notna()
+    parts = pd.DataFrame({
+        "players": played.astype(int),
+        "min_all": exp_min, "min_on": exp_min.where(played, 0.0), "min_out": exp_min.where(~played, 0.0),
+        "usg_all": exp_usg, "usg_on": exp_usg.where(played, 0.0),
+        "form_w":  exp_min.where(has_form, 0.0),
+        "form_x":  (exp_min * grid["form"]).where(has_form, 0.0),
+    })
+    sums = parts.groupby([grid[k] for k in GAME_KEYS], sort=False).sum()
+    out  = pd.DataFrame({
+        "players":       sums["players"],
+        "rot_avail_min": sums["min_on"] / sums["min_all"].replace(0, np.nan),
+        "rot_avail_usg": sums["usg_on"] / sums["usg_all"].replace(0, np.nan),
+        "min_out":       sums["min_out"],
+        "form_pm36":     sums["form_x"] / sums["form_w"].replace(0, np.nan),
+    }).reset_index()
+    return out.sort_values(["season", "team", "GAME_DATE"], ignore_index=True)[GAME_KEYS + AVAILABILITY]
+
+
+def attach(features, avail):
+    """The feature table with each team-game's availability columns alongside."""
+    cols = ["team", "GAME_DATE"] + AVAILABILITY
+    return features.merge(avail[cols].assign(team=avail["team"].astype(str)),
+                          on=["team", "GAME_DATE"], how="left")
+
+
+def build(seasons=None):
+    """Availability for the stored seasons (or `seasons`) → the store's availability table."""
+    pl  = storage.load_playerlog(columns=LOG_COLS, seasons=seasons)
+    out = availability(pl)
+    storage.write_availability(out)
+    return out
+
+
+def synthetic_logs(seasons=20, roster=15, seed=0):
+    """Player-game rows shaped like the real ones, built on the team log's games."""
+    rng  = np.random.default_rng(seed)
+    log  = storage.load_gamelog(columns=["team", "Game_ID", "GAME_DATE"], root="")
+    log  = log.assign(team=log["team"].astype(str))
+    base = rng.dirichlet(np.linspace(3, 0.3, roster), size=(seasons, 30)) * 240
+    rows = []
+    for k in range(seasons):
+        g = log.assign(GAME_DATE=log["GAME_DATE"] - pd.DateOffset(years=seasons - 1 - k),
+                       Game_ID=log["Game_ID"].astype(str) + f"-{k}", season=f"s{k:02d}")
+        t = pd.factorize(g["team"], sort=True)[0]
+        g = g.loc[g.index.repeat(roster)].reset_index(drop=True)
+        j = np.tile(np.arange(roster), len(g) // roster)
+        m = base[k, np.repeat(t, roster), j] * rng.uniform(0.6, 1.4, len(g)) * (rng.random(len(g)) > 0.12)
+        g = g.assign(Player_ID=np.repeat(t, roster) * 100 + j, MIN=np.round(m).astype(int),
+                     FGA=rng.poisson(m / 4), FTA=rng.poisson(m / 12), TOV=rng.poisson(m / 25),
+                     PLUS_MINUS=rng.integers(-15, 16, len(g)))
+        rows.append(g[g["MIN"] > 0])
+    return pd.concat(rows, ignore_index=True)
+
+
+def bench(seasons=20):
+    pl = synthetic_logs(seasons)
+    t0 = time.perf_counter()
+    out = availability(pl)
+    dt = time.perf_counter() - t0
+    print(f"{seasons} seasons: {len(pl)} player-games → {len(out)} team-games in {dt:.2f}s")
+    print(out[AVAILABILITY].describe().loc[["mean", "min", "max"]].round(3).to_string())
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ["bench"]:
+        bench()
+    else:
+        out = build(sys.argv[1:] or None)
+        print(f"✅ {len(out)} team-games ({out['season'].nunique()} seasons) → {storage.AVAIL_DIR}")
@@ -0,0 +1,119 @@
+# backend/prediction_cache.py
+"""
+Bounded in-process cache for /predict results.
+
+Keys are a canonical tuple of the request features (numbers rounded to a
+fixed number of decimals, categoricals as strings) plus the version of the
+model that produced the value, so a model swap can never serve a stale
+probability. Eviction is LRU with an optional TTL.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def model_version(path, chunk=1 << 20):
+    """Short content hash of a model artifact, used as its version tag."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+
+class PredictionCache:
+    def __init__(self, maxsize=4096, ttl=None, decimals=6, clock=time.monotonic):
+        self.maxsize  = maxsize
+        self.ttl      = ttl
+        self.decimals = decimals
+        self.clock    = clock
+        self.version  = None
+        self._data    = OrderedDict()
+        self._lock    = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def key(self, row, fields, version=None):
+        """Canonical, hashable key for one validated row under a model version."""
+        parts = []
+        for k in fields:
+            v = row[k]
+            if isinstance(v, float):
+                v = round(v, self.decimals) + 0.0   # folds -0.0 into 0.0
+            elif not isinstance(v, int):
+                v = str(v)
+            parts.append(v)
+        return (self.version if version is None else version, *parts)
+
+    def set_version(self, version):
+        """Drop every entry if the serving model changed."""
+        with self._lock:
+            if version != self.version:
+                self._data.clear()
+                self.version = version
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, stamp = item
+            if self.ttl is not None and self.clock() - stamp > self.ttl:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (value, self.clock())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size":        len(self._data),
+                "maxsize":     self.maxsize,
+                "ttl":         self.ttl,
+                "hits":        self.hits,
+                "misses":      self.misses,
+                "evictions":   self.evictions,
+                "expirations": self.expirations,
+                "hit_rate":    round(self.hits / lookups, 4) if lookups else 0.0,
+                "model_version": self.version,
+            }
+
+    @staticmethod
+    def merge_stats(stats):
+        """One `stats()` dict for several processes' caches (counts summed)."""
+        out = {k: sum(s[k] for s in stats)
+               for k in ("size", "maxsize", "hits", "misses", "evictions", "expirations")}
+        lookups = out["hits"] + out["misses"]
+        versions = sorted({s["model_version"] for s in stats if s["model_version"]})
+        out.update(ttl=stats[0]["ttl"] if stats else None,
+                   hit_rate=round(out["hits"] / lookups, 4) if lookups else 0.0,
+                   # more than one while the workers are mid hot-swap
+                   model_version=versions[0] if len(versions) == 1 else versions or None)
+        return out
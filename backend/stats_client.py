@@ -0,0 +1,245 @@
+# backend/stats_client.py
+"""
+HTTP client for stats.nba.com: a bounded worker pool behind one shared
+token-bucket rate limiter, with retries.
+
+    client = StatsClient()
+    df     = client.frame("teamgamelog", {"TeamID": 1610612738, "Season": "2024-25",
+                                          "SeasonType": "Regular Season"})
+    done, failed = client.map(fetch_one_team, teams)
+
+- Every request (retries included) first takes a token from the bucket,
+  so `rate` requests/s is the ceiling however many workers are running.
+- Timeouts, connection errors, 429 and 5xx are retried with exponential
+  backoff and full jitter (`backoff` · 2^attempt, at most `max_backoff`).
+  Other 4xx errors are not retried.
+- `map` runs a function over items in the pool and returns what succeeded
+  and what failed, separately: one bad team doesn't lose the other 29.
+
+Responses go through the on-disk cache (http_cache.py): finished seasons
+are never refetched, the current one is revalidated after CURRENT_TTL, and
+NBA_OFFLINE=1 serves from the cache only. Cache hits don't use up tokens.
+
+The responses are the endpoints' raw JSON ({"resultSets": [{"headers",
+"rowSet"}]}), which is what nba_api turns into DataFrames too.
+
+Testing: with `record_dir` every response body is saved there, keyed on
+endpoint + parameters. `serve` replays such a directory from a local HTTP
+server (optionally slow or flaky, with ETags so revalidation answers 304),
+and NBA_STATS_URL points the client at it:
+
+    python backend/stats_client.py serve data/recorded --port 8765 --fail 0.2
+    NBA_STATS_URL=http://127.0.0.1:8765/stats python backend/data/fetch_all_team_logs.py
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from http_cache import HttpCache, season_ttl, CURRENT_TTL
+
+BASE_URL = os.getenv("NBA_STATS_URL", "https://stats.nba.com/stats")
+HEADERS  = {
+    "User-Agent":         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                          "Chrome/124.0 Safari/537.36",
+    "Accept":             "application/json, text/plain, */*",
+    "Accept-Language":    "en-US,en;q=0.9",
+    "Referer":            "https://www.nba.com/",
+    "Origin":             "https://www.nba.com",
+    "x-nba-stats-origin": "stats",
+    "x-nba-stats-token":  "true",
+}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """A request that still failed after its retries."""
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `burst` saved up; thread-safe."""
+
+    def __init__(self, rate, burst=1):
+        self.rate   = float(rate)
+        self.burst  = float(burst)
+        self.tokens = float(burst)
+        self.last   = time.monotonic()
+        self.lock   = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now         = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last   = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def request_key(endpoint, params):
+    """File name of a recorded response: endpoint + a hash of the sorted parameters."""
+    query = urllib.parse.urlencode(sorted((k, str(v)) for k, v in params.items()))
+    return f"{endpoint.lower()}-{hashlib.sha1(query.encode()).hexdigest()[:16]}.json"
+
+
+def result_frame(body, index=0):
+    """One result set of a stats response as a DataFrame."""
+    sets = body.get("resultSets") or [body["resultSet"]]
+    rs   = sets[index]
+    return pd.DataFrame(rs["rowSet"], columns=rs["headers"])
+
+
+class StatsClient:
+    def __init__(self, base_url=None, rate=4.0, burst=4, workers=4, retries=4,
+                 backoff=0.5, max_backoff=20.0, timeout=30, record_dir=None, cache=None):
+        self.base_url    = (base_url or BASE_URL).rstrip("/")
+        self.bucket      = TokenBucket(rate, burst)
+        self.workers     = workers
+        self.retries     = retries
+        self.backoff     = backoff
+        self.max_backoff = max_backoff
+        self.timeout     = timeout
+        self.record_dir  = record_dir
+        self.cache       = cache or HttpCache()
+        self.stats       = {"requests": 0, "retries": 0, "failed": 0}
+        self._lock       = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _acquire(self):
+        self.bucket.acquire()
+        self._count("requests")
+
+    def _once(self, endpoint, params):
+        season = params.get("Season")
+        body   = self.cache.get(f"{self.base_url}/{endpoint}", params, HEADERS,
+                                ttl=season_ttl(season) if season else CURRENT_TTL,
+                                timeout=self.timeout, before_request=self._acquire,
+                                validate=json.loads)
+        return json.loads(body)
+
+    def get(self, endpoint, params):
+        """Raw JSON of one endpoint call, retried; raises FetchError when out of retries."""
+        for attempt in range(self.retries + 1):
+            try:
+                body = self._once(endpoint, params)
+                break
+            except urllib.error.HTTPError as e:
+                error, retry = e, e.code in RETRY_STATUS
+            except (urllib.error.URLError, TimeoutError, ConnectionError, json.JSONDecodeError) as e:
+                error, retry = e, True
+            if not retry or attempt == self.retries:
+                self._count("failed")
+                raise FetchError(f"{endpoint} {params}: {error}") from error
+            self._count("retries")
+            time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            with open(os.path.join(self.record_dir, request_key(endpoint, params)), "w") as f:
+                json.dump(body, f)
+        return body
+
+    def frame(self, endpoint, params, index=0):
+        return result_frame(self.get(endpoint, params), index)
+
+    def map(self, fn, items):
+        """
+        fn(item) for every item in the worker pool. Returns (done, failed):
+        {item: result} for the ones that worked, {item: exception} for the rest.
+        """
+        done, failed = {}, {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(fn, item): item for item in items}
+            for fut in as_completed(futures):
+                item = futures[fut]
+                try:
+                    done[item] = fut.result()
+                except Exception as e:   # noqa: BLE001 — reported to the caller
+                    failed[item] = e
+        return done, failed
+
+
+# Replay server ─────────────────────────────────────────────────────────────
+
+def serve(record_dir, port=0, delay=0.0, fail=0.0, seed=0):
+    """
+    Serve the responses recorded in `record_dir` on 127.0.0.1:`port`, in a
+    background thread. Each request takes `delay` seconds, and a `fail`
+    fraction of them answer 503 (to exercise the retries). Unknown
+    requests get a 404. Returns the server; its URL is server.url.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    rng, lock = random.Random(seed), threading.Lock()
+
+    class Replay(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url      = urllib.parse.urlsplit(self.path)
+            endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+            params   = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+            path     = os.path.join(record_dir, request_key(endpoint, params))
+            time.sleep(delay)
+            with lock:
+                flaky = rng.random() < fail
+            if flaky:
+                return self._send(503, b'{"error": "replay: injected failure"}')
+            if not os.path.exists(path):
+                return self._send(404, b'{"error": "replay: not recorded"}')
+            with open(path, "rb") as f:
+                body = f.read()
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, b"", etag)
+            self._send(200, body, etag)
+
+        def _send(self, code, body, etag=None):
+            self.send_response(code)
+            if etag:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Replay)
+    server.daemon_threads = True
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/stats"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap  = argparse.ArgumentParser(description="stats.nba.com client tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp  = sub.add_parser("serve", help="replay recorded responses")
+    sp.add_argument("record_dir")
+    sp.add_argument("--port", type=int, default=8765)
+    sp.add_argument("--delay", type=float, default=0.0, help="seconds per response")
+    sp.add_argument("--fail", type=float, default=0.0, help="fraction of requests answered 503")
+    args = ap.parse_args()
+
+    server = serve(args.record_dir, args.port, args.delay, args.fail)
+    print(f"▶️  Replaying {args.record_dir} at {server.url} (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
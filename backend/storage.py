@@ -0,0 +1,426 @@
+# backend/storage.py
+"""
+Columnar, typed storage for the game logs and the feature table.
+
+Every stage used to round-trip through CSV, so each reader re-parsed dates
+like "APR 13, 2025" and re-inferred dtypes. The store is a Parquet dataset
+per table with one hive-style directory per season:
+
+    data/store/gamelog/season=2024-25/part-base-0.parquet
+    data/store/features/season=2024-25/team=BOS/part-base-0.parquet   (by_team=True)
+    data/store/players/season=2024-25/part-base-0.parquet             (player game logs)
+
+Columns have explicit types (GAMELOG_SCHEMA, FEATURES_SCHEMA): dates are
+timestamps, Game_ID stays text (it has leading zeros), flags are int8, and
+the team/opp/WL codes (CODES) come back as pandas categoricals. Floats stay
+float64, so features read back bit-for-bit.
+
+`load_features(compact=True)` is for frames that are kept in memory (the
+dashboard, multi-season histories): the rolling stats that aren't model
+inputs (the other windows and the EWMAs) come back as float32. The model
+columns (NUMERIC) stay float64, so predictions are unchanged.
+
+Readers take `columns`, `teams`, `seasons` and a `start`/`end` date range.
+Seasons that can't match are never opened. Within a season the rows are
+sorted by team and date in groups of ROW_GROUP rows, so the Parquet
+min/max statistics skip most of the file for one team or a date range:
+
+    one = load_features(teams=["BOS"])                          # dashboard
+    win = load_features(columns=FEATURES + ["W"], start="2025-01-01")
+
+If a table hasn't been converted yet, the same calls read the CSV with the
+same dtypes and apply the same filters after parsing, so callers don't
+care which one is on disk.
+
+    python backend/storage.py convert    # CSVs → data/store
+    python backend/storage.py bench      # read/write benchmark vs CSV
+    python backend/storage.py memory     # in-memory size / load time by dtype
+"""
+
+import os
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from feature_registry import TABLE_COLUMNS, NUMERIC, AVAILABILITY
+
+HERE         = os.path.dirname(__file__)
+DATA_DIR     = os.path.join(HERE, "data")
+STORE_DIR    = os.getenv("FEATURE_STORE_DIR", os.path.join(DATA_DIR, "store"))
+GAMELOG_DIR  = os.path.join(STORE_DIR, "gamelog")
+FEATURES_DIR = os.path.join(STORE_DIR, "features")
+PLAYERS_DIR  = os.path.join(STORE_DIR, "players")
+AVAIL_DIR    = os.path.join(STORE_DIR, "availability")
+GAMELOG_CSV  = os.path.join(DATA_DIR, "all_teams_202425_gamelog.csv")
+FEATURES_CSV = os.path.join(DATA_DIR, "all_teams_features_richer_2025.csv")
+
+DATE      = pa.timestamp("ns")
+CODES     = {"team", "opp", "WL"}     # short codes → categoricals on read
+ROW_GROUP = 1024
+
+# 1️⃣ Schemas (partition columns are part of the schema, not of the files)
+_COUNTS = ["MIN", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA", "OREB", "DREB", "REB",
+           "AST", "STL", "BLK", "TOV", "PF", "PTS"]
+GAMELOG_SCHEMA = pa.schema(
+    [("Team_ID", pa.int64()), ("Game_ID", pa.string()), ("GAME_DATE", DATE),
+     ("MATCHUP", pa.string()), ("WL", pa.string()), ("W", pa.int16()), ("L", pa.int16()),
+     ("W_PCT", pa.float64())]
+    + [(c, pa.int16()) for c in _COUNTS]
+    + [(c, pa.float64()) for c in ("FG_PCT", "FG3_PCT", "FT_PCT")]
+    + [("team", pa.string()), ("season", pa.string())]
+)
+# keep the CSV's column order
+GAMELOG_SCHEMA = pa.schema([GAMELOG_SCHEMA.field(c) for c in (
+    "Team_ID Game_ID GAME_DATE MATCHUP WL W L W_PCT MIN FGM FGA FG_PCT FG3M FG3A "
+    "FG3_PCT FTM FTA FT_PCT OREB DREB REB AST STL BLK TOV PF PTS team season").split()])
+
+# playergamelog rows, plus the player's name and team (from MATCHUP)
+PLAYERLOG_SCHEMA = pa.schema(
+    [("Player_ID", pa.int64()), ("PLAYER_NAME", pa.string()), ("Game_ID", pa.string()),
+     ("GAME_DATE", DATE), ("MATCHUP", pa.string()), ("WL", pa.string())]
+    + [(c, pa.int16()) for c in _COUNTS + ["PLUS_MINUS"]]
+    + [(c, pa.float64()) for c in ("FG_PCT", "FG3_PCT", "FT_PCT")]
+    + [("team", pa.string()), ("season", pa.string())]
+)
+
+AVAIL_SCHEMA = pa.schema(
+    [("team", pa.string()), ("Game_ID", pa.string()), ("GAME_DATE", DATE), ("players", pa.int8())]
+    + [(c, pa.float64()) for c in AVAILABILITY if c != "players"]
+    + [("season", pa.string())]
+)
+
+_FEATURE_TYPES = {"team": pa.string(), "opp": pa.string(), "GAME_DATE": DATE,
+                  "back2back": pa.int8(), "home": pa.int8(), "W": pa.int8()}
+FEATURES_SCHEMA = pa.schema([(c, _FEATURE_TYPES.get(c, pa.float64())) for c in TABLE_COLUMNS]
+                            + [("season", pa.string())])
+
+
+def season_of(dates):
+    """NBA season label of each date: games from August on belong to the next season."""
+    dates = pd.DatetimeIndex(dates)
+    start = dates.year - (dates.month < 8)
+    return pd.Index([f"{y}-{(y + 1) % 100:02d}" for y in start], dtype=object)
+
+
+def parse_game_date(s):
+    """
+    The logs' "APR 13, 2025" dates or the feature table's ISO ones, with an
+    explicit format (mixed tables, e.g. a log with appended ISO rows, fall
+    back to per-element parsing).
+    """
+    first = str(s.iloc[0]) if len(s) else ""
+    fmt   = "%Y-%m-%d" if first[:1].isdigit() else "%b %d, %Y"
+    try:
+        return pd.to_datetime(s, format=fmt)
+    except ValueError:
+        return pd.to_datetime(s, format="mixed")
+
+
+# 2️⃣ Writing
+
+def _table(df, schema):
+    """
+    DataFrame → Arrow table with exactly `schema`, sorted by team and date.
+    A `season` column, if present, is kept (the 2019-20 playoffs ran into
+    October); otherwise it's derived from the dates.
+    """
+    if "season" not in df:
+        df = df.assign(season=season_of(df["GAME_DATE"]))
+    df = df.sort_values(["team", "GAME_DATE"], kind="stable")
+    cols = []
+    for field in schema:
+        col = df[field.name]
+        if field.name in CODES:
+            col = col.astype(str)
+        cols.append(pa.array(col.to_numpy(), type=field.type))
+    return pa.table(cols, schema=schema)
+
+
+def write(df, root, schema, by_team=False, append=False):
+    """
+    Write `df` under `root`, one directory per season (and team). Without
+    `append`, every partition present in `df` is replaced and the others
+    are left alone; with it, the rows are added next to what's there.
+    """
+    keys = ["season", "team"] if by_team else ["season"]
+    part = ds.partitioning(pa.schema([schema.field(c) for c in keys]), flavor="hive")
+    ds.write_dataset(
+        _table(df, schema), root, format="parquet", partitioning=part,
+        max_rows_per_group=ROW_GROUP, min_rows_per_group=ROW_GROUP,
+        basename_template=f"part-{uuid.uuid4().hex[:8] if append else 'base'}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore" if append else "delete_matching",
+    )
+
+
+def write_gamelog(df, root=GAMELOG_DIR, by_team=False, append=False):
+    write(df, root, GAMELOG_SCHEMA, by_team, append)
+
+
+def write_features(df, root=FEATURES_DIR, by_team=False, append=False):
+    write(df, root, FEATURES_SCHEMA, by_team, append)
+
+
+# 3️⃣ Reading
+
+def _filter(teams, seasons, start, end):
+    conds = []
+    if teams is not None:
+        conds.append(ds.field("team").isin(list(teams)))
+    if seasons is not None:
+        conds.append(ds.field("season").isin(list(seasons)))
+    if start is not None:
+        conds.append(ds.field("GAME_DATE") >= pa.scalar(pd.Timestamp(start), type=DATE))
+    if end is not None:
+        conds.append(ds.field("GAME_DATE") <= pa.scalar(pd.Timestamp(end), type=DATE))
+    expr = None
+    for c in conds:
+        expr = c if expr is None else expr & c
+    return expr
+
+
+def _categorical(df):
+    # code columns → pandas categoricals, categories sorted like read_csv's
+    for c in CODES & set(df.columns):
+        df[c] = df[c].astype("category")
+    return df
+
+
+def _compact(df):
+    # float32 for the float columns the model never sees
+    small = [c for c in df.columns if df[c].dtype == np.float64 and c not in NUMERIC]
+    if small:
+        df[small] = df[small].astype(np.float32)
+    return df
+
+
+def _partition_fields(root):
+    """Partition keys of a hive-style dataset, read off its first directory chain."""
+    keys, path = [], root
+    while True:
+        sub = next((e for e in sorted(os.scandir(path), key=lambda e: e.name)
+                    if e.is_dir() and "=" in e.name), None)
+        if sub is None:
+            return keys
+        keys.append(sub.name.split("=", 1)[0])
+        path = sub.path
+
+
+def _read_store(root, schema, columns, **where):
+    # a table may or may not be split by team as well; the directories say which
+    part  = ds.partitioning(pa.schema([schema.field(c) for c in _partition_fields(root)]),
+                            flavor="hive")
+    data  = ds.dataset(root, schema=schema, format="parquet", partitioning=part)
+    table = data.to_table(columns=columns, filter=_filter(**where))
+    return table.to_pandas()
+
+
+def _read_csv(path, schema, columns, teams, seasons, start, end):
+    dtypes = {}
+    for field in schema:
+        if field.name in ("GAME_DATE", "season"):
+            continue
+        if pa.types.is_string(field.type):
+            dtypes[field.name] = str
+        else:
+            dtypes[field.name] = field.type.to_pandas_dtype()
+    header  = pd.read_csv(path, nrows=0).columns
+    filters = [c for c, v in (("team", teams), ("GAME_DATE", seasons or start or end)) if v is not None]
+    usecols = [c for c in dict.fromkeys(columns + filters + ["GAME_DATE"]) if c in header]
+    df = pd.read_csv(path, usecols=usecols, float_precision="round_trip",
+                     dtype={c: t for c, t in dtypes.items() if c in usecols})
+    df["GAME_DATE"] = parse_game_date(df["GAME_DATE"])
+    keep = np.ones(len(df), dtype=bool)
+    if teams is not None:
+        keep &= df["team"].isin(list(teams)).to_numpy()
+    if seasons is not None:
+        keep &= season_of(df["GAME_DATE"]).isin(list(seasons))
+    if start is not None:
+        keep &= (df["GAME_DATE"] >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        keep &= (df["GAME_DATE"] <= pd.Timestamp(end)).to_numpy()
+    df = df[keep].reset_index(drop=True)
+    if "season" in columns:
+        df["season"] = season_of(df["GAME_DATE"])
+    return df[columns]
+
+
+def _load(root, csv_path, schema, columns, teams, seasons, start, end):
+    where = dict(teams=teams, seasons=seasons, start=start, end=end)
+    if columns is None:
+        columns = [f.name for f in schema if f.name != "season"]
+    if root and os.path.isdir(root) and os.listdir(root):
+        df = _read_store(root, schema, list(columns), **where)
+    else:
+        df = _read_csv(csv_path, schema, list(columns), **where)
+    return _categorical(df)
+
+
+def load_gamelog(columns=None, teams=None, seasons=None, start=None, end=None,
+                 root=GAMELOG_DIR, csv_path=GAMELOG_CSV):
+    """Merged team game log, typed; only the requested columns and rows."""
+    return _load(root, csv_path, GAMELOG_SCHEMA, columns, teams, seasons, start, end)
+
+
+def _require(root, how):
+    # the player tables have no CSV to fall back on
+    if not (os.path.isdir(root) and os.listdir(root)):
+        raise FileNotFoundError(f"Nothing in {root} yet; {how}")
+
+
+def load_playerlog(columns=None, teams=None, seasons=None, start=None, end=None, root=PLAYERS_DIR):
+    """Player game logs (bulk-fetched, store only); only the requested columns and rows."""
+    _require(root, "run data/fetch_player_stats_nba_api.py --all SEASON")
+    return _load(root, None, PLAYERLOG_SCHEMA, columns, teams, seasons, start, end)
+
+
+def write_playerlog(df, root=PLAYERS_DIR, append=False):
+    write(df, root, PLAYERLOG_SCHEMA, append=append)
+
+
+def load_availability(columns=None, teams=None, seasons=None, start=None, end=None, root=AVAIL_DIR):
+    """Per team-game availability features (player_features.py)."""
+    _require(root, "run player_features.py")
+    return _load(root, None, AVAIL_SCHEMA, columns, teams, seasons, start, end)
+
+
+def write_availability(df, root=AVAIL_DIR):
+    write(df, root, AVAIL_SCHEMA)
+
+
+def load_features(columns=None, teams=None, seasons=None, start=None, end=None,
+                  root=FEATURES_DIR, csv_path=FEATURES_CSV, compact=False):
+    """Feature table, typed; only the requested columns and rows (float32 extras with `compact`)."""
+    df = _load(root, csv_path, FEATURES_SCHEMA, columns, teams, seasons, start, end)
+    return _compact(df) if compact else df
+
+
+def convert():
+    """Rewrite the merged log and the feature table into the store."""
+    write_gamelog(load_gamelog(root=""))
+    write_features(load_features(root=""))
+
+
+def bench(runs=5, seasons=20):
+    """Read/write timings and sizes, CSV vs store, on the real season and a synthetic multi-season log."""
+    import time
+    import tempfile
+
+    def best(fn):
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        return min(times) * 1000
+
+    def size(path):
+        if os.path.isfile(path):
+            return os.path.getsize(path)
+        return sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(path) for f in fs)
+
+    log  = load_gamelog(root="")
+    many = []
+    for k in range(seasons):
+        s = log.copy()
+        s["GAME_DATE"] = s["GAME_DATE"] - pd.DateOffset(years=seasons - 1 - k)
+        many.append(s)
+    many = pd.concat(many, ignore_index=True)
+    last = season_of(many["GAME_DATE"][-1:])[0]
+    jan  = f"{many['GAME_DATE'].max().year}-01-01"
+    cols = ["team", "GAME_DATE", "PTS", "REB", "AST", "WL"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, df in (("1 season", log), (f"{seasons} seasons", many)):
+            csv, root = os.path.join(tmp, "log.csv"), os.path.join(tmp, "log")
+            # CSV keeps the logs' own date text, so readers re-parse it
+            out = df.assign(GAME_DATE=df["GAME_DATE"].dt.strftime("%b %d, %Y").str.upper())
+            w_csv   = best(lambda: out.to_csv(csv, index=False))
+            w_store = best(lambda: write_gamelog(df, root))
+
+            def csv_read(columns=None, teams=None, seasons=None, start=None):
+                return lambda: load_gamelog(columns, teams, seasons, start, root="", csv_path=csv)
+
+            def parse_all():
+                # what every reader did before: infer dtypes and parse dates
+                d = pd.read_csv(csv)
+                d["GAME_DATE"] = pd.to_datetime(d["GAME_DATE"], format="mixed")
+
+            cases = [
+                ("full table", parse_all,
+                 lambda: load_gamelog(root=root)),
+                ("one team, all columns", csv_read(teams=["BOS"]),
+                 lambda: load_gamelog(teams=["BOS"], root=root)),
+                ("last season, 6 columns", csv_read(cols, seasons=[last]),
+                 lambda: load_gamelog(columns=cols, seasons=[last], root=root)),
+                ("since Jan 1, 6 columns", csv_read(cols, start=jan),
+                 lambda: load_gamelog(columns=cols, start=jan, root=root)),
+            ]
+            print(f"\n{name}: {len(df)} rows   CSV {size(csv) / 1e6:.2f} MB   store {size(root) / 1e6:.2f} MB")
+            print(f"  {'write':28s} CSV {w_csv:8.1f} ms   store {w_store:8.1f} ms   ×{w_csv / w_store:5.1f}")
+            for label, a, b in cases:
+                t_a, t_b = best(a), best(b)
+                print(f"  {'read ' + label:28s} CSV {t_a:8.1f} ms   store {t_b:8.1f} ms   ×{t_a / t_b:5.1f}")
+
+
+def bench_memory(runs=3, seasons=20):
+    """Memory and load time of a multi-season feature table: default read_csv vs typed vs compact."""
+    import time
+    import tempfile
+
+    def best(fn):
+        times, out = [], None
+        for _ in range(runs):
+            t0  = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - t0)
+        return out, min(times) * 1000
+
+    one  = load_features(root="")
+    many = []
+    for k in range(seasons):
+        s = one.copy()
+        s["GAME_DATE"] = s["GAME_DATE"] - pd.DateOffset(years=seasons - 1 - k)
+        many.append(s)
+    many = pd.concat(many, ignore_index=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv, root = os.path.join(tmp, "features.csv"), os.path.join(tmp, "features")
+        many.to_csv(csv, index=False)
+        write_features(many, root)
+
+        cases = [
+            ("read_csv defaults", lambda: pd.read_csv(csv, parse_dates=["GAME_DATE"],
+                                                      float_precision="round_trip")),
+            ("typed, from CSV",   lambda: load_features(root="", csv_path=csv)),
+            ("typed, store",      lambda: load_features(root=root)),
+            ("compact, store",    lambda: load_features(root=root, compact=True)),
+        ]
+        print(f"{seasons} seasons, {len(many)} rows × {many.shape[1]} columns")
+        frames = {}
+        for label, fn in cases:
+            df, ms = best(fn)
+            frames[label] = df
+            print(f"  {label:20s} {df.memory_usage(deep=True).sum() / 1e6:8.1f} MB   {ms:8.1f} ms")
+
+    # the model columns must be the same bits whichever way they were loaded
+    ref = frames["read_csv defaults"][NUMERIC].to_numpy()
+    for label, df in frames.items():
+        same = np.array_equal(df[NUMERIC].to_numpy(), ref, equal_nan=True)
+        print(f"  model inputs {label:20s} {'identical' if same else 'DIFFERENT'}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "convert"
+    if cmd == "convert":
+        convert()
+        print(f"✅ Wrote {GAMELOG_DIR} + {FEATURES_DIR}")
+    elif cmd == "bench":
+        bench()
+    elif cmd == "memory":
+        bench_memory()
+    else:
+        sys.exit("usage: python backend/storage.py [convert|bench|memory]")
@@ -0,0 +1,246 @@
+# backend/student_model.py
+"""
+Distilled "fast tier" models, fit to the calibrated ensemble's
+probabilities (see distill_student.py). Two forms:
+
+`StudentModel`, one logistic model with pairwise interaction terms,
+
+    logit p = w · [z, z_i * z_j (i < j), one-hot(home, opp, team)] + b
+
+with z the standardized numeric features. Scoring is one small mat-vec:
+~20 µs for a single-row call (mostly fixed overhead) and under 1 µs per
+row in 1,000-row batches.
+
+`TreeStudent`, a shallow gradient-boosted model (XGBoost, a few hundred
+depth-3 trees) trained on the teacher's probabilities as soft labels and
+flattened into the same node table `CompiledEnsemble` walks. It tracks the
+teacher much more closely: ~40 µs for a single-row call and ~10 µs per row
+in 1,000-row batches, against ~0.8 ms and ~200 µs for the compiled ensemble.
+
+Both have the same interface as `CompiledEnsemble` (`encode` /
+`predict_proba_arrays` / `state` / `make_probe`), so `app.py`,
+`model_artifact` and the micro batcher treat them all the same way. Only
+NumPy is needed to score.
+
+A student is only deployed (and only served) while its holdout fidelity,
+as recorded in its manifest, passes `FIDELITY_GATE`; see `gate_failures`.
+"""
+
+import time
+import itertools
+import numpy as np
+
+from compiled_model import _FlatTrees, _Learner, _booster_trees
+
+EPS = 1e-6
+
+# Worst holdout fidelity a student may have and still serve: metric → (bound, limit)
+FIDELITY_GATE = {
+    "mean_abs_dev": ("max", 0.03),      # mean |p_student - p_teacher|
+    "max_abs_dev":  ("max", 0.15),
+    "auc_delta":    ("min", -0.01),     # student AUC - teacher AUC
+    "brier_delta":  ("max", 0.01),      # student Brier - teacher Brier
+}
+
+
+def gate_failures(fidelity, gate=FIDELITY_GATE):
+    """Why `fidelity` (a manifest's fidelity dict) fails `gate`; [] if it passes."""
+    out = []
+    for key, (bound, limit) in gate.items():
+        v = (fidelity or {}).get(key)
+        if v is None:
+            out.append(f"{key} not measured")
+        elif (v > limit) if bound == "max" else (v < limit):
+            out.append(f"{key} {v} {'>' if bound == 'max' else '<'} {limit}")
+    return out
+
+
+def _expit(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _plain(v):
+    # np.int64 / np.str_ → JSON-able Python scalar
+    return v.item() if hasattr(v, "item") else v
+
+
+def _fit_inputs(num, cat):
+    """Typed arrays, their column means / scales and the category maps to fit on."""
+    num   = np.asarray(num, dtype=np.float64)
+    cat   = np.asarray(cat, dtype=object)
+    scale = num.std(axis=0)
+    scale[scale == 0] = 1.0
+    maps  = [{_plain(v): k for k, v in enumerate(sorted(set(cat[:, j]), key=str))}
+             for j in range(cat.shape[1])]
+    return num, cat, num.mean(axis=0), scale, maps
+
+
+class _Student:
+    """What both students share: feature lists, one-hot maps, encoding and probes."""
+
+    KIND = None
+
+    def __init__(self, numeric, categorical, mean, scale, cat_maps):
+        self.numeric     = list(numeric)
+        self.categorical = list(categorical)
+        self.mean        = np.asarray(mean, dtype=np.float64)
+        self.scale       = np.asarray(scale, dtype=np.float64)
+        self.cat_maps    = cat_maps          # [{value: column offset}] per categorical
+        self.n_cat       = sum(len(m) for m in cat_maps)
+
+    @property
+    def features(self):
+        return self.numeric + self.categorical
+
+    def onehot(self, cat):
+        """(n, categorical) → (n, n_cat) one-hot block."""
+        # unseen categories get an all-zero block, like handle_unknown="ignore"
+        oh  = np.zeros((len(cat), self.n_cat))
+        off = 0
+        for j, m in enumerate(self.cat_maps):
+            for i, v in enumerate(cat[:, j]):
+                k = m.get(v)
+                if k is not None:
+                    oh[i, off + k] = 1.0
+            off += len(m)
+        return oh
+
+    def _p(self, num, cat):
+        raise NotImplementedError
+
+    def encode(self, rows):
+        """list of dicts → (numeric float array, categorical object array)."""
+        num = np.array([[r[c] for c in self.numeric] for r in rows], dtype=np.float64)
+        cat = np.array([[r[c] for c in self.categorical] for r in rows], dtype=object)
+        return num.reshape(len(rows), len(self.numeric)), cat.reshape(len(rows), len(self.categorical))
+
+    def predict_proba_arrays(self, num, cat, timings=None):
+        """Same contract as `CompiledEnsemble.predict_proba_arrays`."""
+        t0 = time.perf_counter()
+        p  = self._p(np.asarray(num, dtype=np.float64), np.asarray(cat, dtype=object))
+        if timings is not None:
+            timings["learner:student"] = timings.get("learner:student", 0.0) + time.perf_counter() - t0
+        return np.column_stack([1.0 - p, p])
+
+    def predict_proba(self, rows):
+        """rows: list of dicts (or a DataFrame) with at least `self.features`."""
+        if hasattr(rows, "to_dict"):
+            rows = rows.to_dict("records")
+        return self.predict_proba_arrays(*self.encode(rows))
+
+    def _meta(self):
+        return {
+            "kind":        self.KIND,
+            "numeric":     self.numeric,
+            "categorical": self.categorical,
+            "cat_maps":    [sorted(m.items(), key=lambda kv: kv[1]) for m in self.cat_maps],
+        }
+
+    @staticmethod
+    def _maps(meta):
+        return [{v: k for v, k in pairs} for pairs in meta["cat_maps"]]
+
+    def make_probe(self, n=256, seed=0):
+        """Deterministic synthetic rows spanning every known category."""
+        rng = np.random.default_rng(seed)
+        num = self.mean + self.scale * rng.standard_normal((n, len(self.numeric)))
+        cat = np.empty((n, len(self.categorical)), dtype=object)
+        for j, m in enumerate(self.cat_maps):
+            seen = sorted(m, key=str)
+            cat[:, j] = [seen[k] for k in rng.integers(0, len(seen), n)]
+        return num, cat
+
+
+class StudentModel(_Student):
+    """Scores plain dicts or NumPy arrays with the distilled logistic model."""
+
+    KIND = "student"
+
+    def __init__(self, numeric, categorical, mean, scale, pairs, cat_maps, coef, intercept):
+        super().__init__(numeric, categorical, mean, scale, cat_maps)
+        self.pairs     = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+        self.coef      = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    def design(self, num, cat):
+        """(n, numeric) + (n, categorical) → the (n, d) design matrix."""
+        num = np.asarray(num, dtype=np.float64)
+        z   = (num - self.mean) / self.scale
+        return np.hstack([z, z[:, self.pairs[:, 0]] * z[:, self.pairs[:, 1]], self.onehot(cat)])
+
+    @classmethod
+    def fit(cls, num, cat, p_teacher, numeric, categorical, alpha=1.0, sample_weight=None):
+        """Ridge regression on the teacher's logits (squared error in logit space)."""
+        from sklearn.linear_model import Ridge
+
+        num, cat, mean, scale, maps = _fit_inputs(num, cat)
+        pairs = list(itertools.combinations(range(num.shape[1]), 2))
+        model = cls(numeric, categorical, mean, scale, pairs, maps, np.zeros(0), 0.0)
+
+        p      = np.clip(p_teacher, EPS, 1 - EPS)
+        target = np.log(p / (1 - p))
+        reg    = Ridge(alpha=alpha).fit(model.design(num, cat), target, sample_weight=sample_weight)
+        model.coef, model.intercept = reg.coef_.astype(np.float64), float(reg.intercept_)
+        return model
+
+    def _p(self, num, cat):
+        return _expit(self.design(num, cat) @ self.coef + self.intercept)
+
+    def state(self):
+        """({name: ndarray}, JSON-able metadata), for `model_artifact.export`."""
+        arrays = {"mean": self.mean, "scale": self.scale, "pairs": self.pairs, "coef": self.coef}
+        return arrays, dict(self._meta(), intercept=self.intercept)
+
+    @classmethod
+    def from_state(cls, arrays, meta):
+        return cls(meta["numeric"], meta["categorical"], arrays["mean"], arrays["scale"],
+                   arrays["pairs"], cls._maps(meta), arrays["coef"], meta["intercept"])
+
+
+class TreeStudent(_Student):
+    """Scores plain dicts or NumPy arrays with the distilled boosted trees."""
+
+    KIND = "tree_student"
+
+    def __init__(self, numeric, categorical, mean, scale, cat_maps, trees):
+        super().__init__(numeric, categorical, mean, scale, cat_maps)
+        self.trees = trees                   # compiled_model._Learner of kind "xgb"
+
+    def design(self, num, cat):
+        """(n, numeric) + (n, categorical) → raw numerics + one-hot block."""
+        return np.hstack([np.asarray(num, dtype=np.float64), self.onehot(cat)])
+
+    @classmethod
+    def fit(cls, num, cat, p_teacher, numeric, categorical, max_depth=3, n_estimators=300,
+            learning_rate=0.1):
+        """XGBoost with binary:logistic on the teacher's probabilities as soft labels."""
+        from xgboost import XGBRegressor
+
+        num, cat, mean, scale, maps = _fit_inputs(num, cat)
+        model = cls(numeric, categorical, mean, scale, maps, None)
+        gbm   = XGBRegressor(objective="binary:logistic", max_depth=max_depth,
+                             n_estimators=n_estimators, learning_rate=learning_rate,
+                             tree_method="hist", random_state=42, n_jobs=1)
+        gbm.fit(model.design(num, cat), np.asarray(p_teacher, dtype=np.float64))
+        it, base_margin = _booster_trees(gbm.get_booster())
+        arrays, meta    = _FlatTrees.build(it, strict=True, thr_dtype=np.float32).state()
+        model.trees     = _Learner("gbm", "xgb", arrays, dict(meta, base_margin=base_margin))
+        return model
+
+    def _p(self, num, cat):
+        return self.trees.predict(self.design(num, cat))
+
+    def state(self):
+        """({name: ndarray}, JSON-able metadata), for `model_artifact.export`."""
+        arrays = {"mean": self.mean, "scale": self.scale, **self.trees.arrays}
+        return arrays, dict(self._meta(), trees=self.trees.meta)
+
+    @classmethod
+    def from_state(cls, arrays, meta):
+        trees = _Learner("gbm", "xgb", {k: arrays[k] for k in _FlatTrees.ARRAYS}, meta["trees"])
+        return cls(meta["numeric"], meta["categorical"], arrays["mean"], arrays["scale"],
+                   cls._maps(meta), trees)
+
+
+# manifest "kind" → class, for model_artifact.load
+STUDENTS = {cls.KIND: cls for cls in (StudentModel, TreeStudent)}
@@ -0,0 +1,56 @@
+# backend/train_game_model.py
+"""
+Train the game-level model: one row per game (game_table.py), predicting
+the home side's win; the away side is 1 - p by construction. Same
+ensemble, calibration and time-series CV as
+train_global_ensemble_calibrated.py.
+
+    python backend/train_game_model.py
+"""
+
+import joblib
+
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from xgboost import XGBClassifier
+from sklearn.model_selection import TimeSeriesSplit
+
+import storage
+from cv_harness import CVHarness
+from game_table import build_games, GAME_MODEL
+from feature_registry import GAME_NUMERIC, GAME_CATEGORICAL, GAME_FEATURES, GAME_TARGET
+
+# 1️⃣ Load the game log and build one row per game (already in date order)
+games = build_games(storage.load_gamelog())
+X = games[GAME_FEATURES]
+y = games[GAME_TARGET]
+print(f"🏀 {len(games)} games, home win rate {y.mean():.3f}")
+
+# 2️⃣ Preprocessor
+preprocessor = ColumnTransformer([
+    ("num", StandardScaler(), GAME_NUMERIC),
+    ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), GAME_CATEGORICAL),
+])
+
+# 3️⃣ Base learners & soft-voting ensemble
+ensemble = VotingClassifier(
+    estimators=[
+        ("lr",  LogisticRegression(max_iter=1000, random_state=42)),
+        ("xgb", XGBClassifier(learning_rate=0.01, max_depth=3, n_estimators=500,
+                              eval_metric="logloss", random_state=42)),
+        ("rf",  RandomForestClassifier(n_estimators=200, max_depth=10, random_state=42)),
+    ],
+    voting="soft",
+    n_jobs=-1
+)
+
+# 4️⃣ Time-series CV, one fit per fold (cv_harness.py); the calibrated model
+#    is assembled from the same fold fits
+cv = CVHarness(preprocessor, ensemble, TimeSeriesSplit(n_splits=5), method="sigmoid", n_jobs=-1)
+cv.report(cv.run(X, y), label="game model")
+
+# 5️⃣ Save
+joblib.dump(cv.model, GAME_MODEL)
+print(f"\n✅ Game model saved to:\n   {GAME_MODEL}")
@@ -1,36 +1,30 @@
 # backend/train_global_ensemble_calibrated.py
 
 import os
-import pandas as pd
 import joblib
 
-from sklearn.pipeline import Pipeline
+import storage
+from cv_harness import CVHarness
+from feature_registry import NUMERIC, CATEGORICAL, FEATURES
+
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from xgboost import XGBClassifier
-from sklearn.calibration import CalibratedClassifierCV
-from sklearn.model_selection import TimeSeriesSplit, cross_val_score
+from sklearn.model_selection import TimeSeriesSplit
 
 # 1️⃣ Paths
 BASE      = os.path.dirname(__file__)
 CSV_PATH  = os.path.join(BASE, "data", "all_teams_features_richer_2025.csv")
 OUT_MODEL = os.path.join(BASE, "model_global_ensemble_calibrated.pkl")
 
-# 2️⃣ Load & sort
-df = pd.read_csv(CSV_PATH, parse_dates=["GAME_DATE"])
+# 2️⃣ Load (only the model's columns, from the columnar store when it exists) & sort
+TARGET = "W"
+df = storage.load_features(columns=["GAME_DATE", TARGET] + FEATURES, csv_path=CSV_PATH)
 df.sort_values(["team", "GAME_DATE"], inplace=True)
 
-# 3️⃣ Features & target
-NUMERIC     = [
-    "pts_5","reb_5","ast_5","win_pct_5","opp_win_pct_5",
-    "fg_pct_5","fg3_pct_5","ft_pct_5","pace_5",
-    "days_rest","back2back"
-]
-CATEGORICAL = ["home","opp","team"]
-FEATURES    = NUMERIC + CATEGORICAL
-TARGET      = "W"
+# 3️⃣ Features (see feature_registry.py) & target
 
 X = df[FEATURES]
 y = df[TARGET]
@@ -60,61 +54,17 @@ ensemble = VotingClassifier(
     n_jobs=-1
 )
 
-raw_pipeline = Pipeline([
-    ("prep", preprocessor),
-    ("clf",  ensemble)
-])
-
-# 6️⃣ Time-series CV
-tscv = TimeSeriesSplit(n_splits=5)
-
-# 7️⃣ CV on raw ensemble
-roc_auc_raw = cross_val_score(
-    raw_pipeline, X, y,
-    cv=tscv,
-    scoring="roc_auc",
-    n_jobs=-1
-)
-brier_raw = -cross_val_score(
-    raw_pipeline, X, y,
-    cv=tscv,
-    scoring="neg_brier_score",
-    n_jobs=-1
-)
-
-print("📊 Raw Ensemble CV Metrics (5-fold):")
-print(f"  • ROC AUC: {roc_auc_raw.mean():.4f} ± {roc_auc_raw.std():.4f}")
-print(f"  • Brier  : {brier_raw.mean():.4f} ± {brier_raw.std():.4f}")
-
-# 8️⃣ Wrap in a CalibratedClassifierCV (sigmoid / Platt), using the same folds
-calibrator = CalibratedClassifierCV(
-    estimator=raw_pipeline,
-    method="sigmoid",
-    cv=tscv,
-    n_jobs=-1
-)
-
-# 9️⃣ CV on calibrated ensemble
-roc_auc_cal = cross_val_score(
-    calibrator, X, y,
-    cv=tscv,
-    scoring="roc_auc",
-    n_jobs=-1
-)
-brier_cal = -cross_val_score(
-    calibrator, X, y,
-    cv=tscv,
-    scoring="neg_brier_score",
-    n_jobs=-1
-)
-
-print("\n📊 Calibrated Ensemble CV Metrics (5-fold):")
-print(f"  • ROC AUC: {roc_auc_cal.mean():.4f} ± {roc_auc_cal.std():.4f}")
-print(f"  • Brier  : {brier_cal.mean():.4f} ± {brier_cal.std():.4f}")
+# 6️⃣ Time-series CV, one fit per fold (cv_harness.py): raw and calibrated
+#    metrics from the stored out-of-fold probabilities
+cv = CVHarness(preprocessor, ensemble, TimeSeriesSplit(n_splits=5), method="sigmoid", n_jobs=-1)
+scores = cv.run(X, y)
+cv.report(scores)
 
-# 🔟 Finally fit the calibrator on all data
-calibrator.fit(X, y)
+# 7️⃣ The calibrated ensemble (sigmoid / Platt on the same folds), built
+#    from the fold fits: what CalibratedClassifierCV(cv=tscv).fit(X, y) gives
+calibrator = cv.model
 
-# 1️⃣1️⃣ Save the calibrated ensemble
+# 8️⃣ Save the calibrated ensemble
 joblib.dump(calibrator, OUT_MODEL)
 print(f"\n✅ Final calibrated ensemble saved to:\n   {OUT_MODEL}")
+print("   publish it with: python backend/model_registry.py publish (pipeline stage \"publish\")")
@@ -1,9 +1,11 @@
 # backend/train_global_model.py
 
 import os
-import pandas as pd
 import joblib
 
+import storage
+from feature_registry import NUMERIC, CATEGORICAL, FEATURES
+
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
@@ -19,19 +21,12 @@ CSV_PATH    = os.path.join(BASE, "data", "all_teams_features_richer_2025.csv")
 MODEL_RAW   = os.path.join(BASE, "model_global_ensemble.pkl")
 MODEL_CALIB = os.path.join(BASE, "model_global_calibrated.pkl")
 
-# ── 2) Load & sort
-df = pd.read_csv(CSV_PATH, parse_dates=["GAME_DATE"])
+# ── 2) Load the model's columns & sort
+TARGET = "W"
+df = storage.load_features(columns=["GAME_DATE", TARGET] + FEATURES, csv_path=CSV_PATH)
 df.sort_values(["team", "GAME_DATE"], inplace=True)
 
-# ── 3) Feature sets
-NUMERIC = [
-    "pts_5","reb_5","ast_5","win_pct_5","opp_win_pct_5",
-    "fg_pct_5","fg3_pct_5","ft_pct_5","pace_5",
-    "days_rest","back2back"
-]
-CATEGORICAL = ["home","opp","team"]
-FEATURES    = NUMERIC + CATEGORICAL
-TARGET      = "W"
+# ── 3) Feature sets (see feature_registry.py)
 
 # ── 4) Split X / y
 X = df[FEATURES]
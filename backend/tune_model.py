@@ -1,6 +1,5 @@
 # backend/tune_model.py
 
-import pandas as pd
 import joblib
 from sklearn.model_selection import RandomizedSearchCV, TimeSeriesSplit
 from sklearn.pipeline import Pipeline
@@ -9,17 +8,14 @@ from sklearn.compose import ColumnTransformer
 from xgboost import XGBClassifier
 from scipy.stats import uniform, randint
 
-# 1) Load your new richer features
-df = pd.read_csv("data/all_teams_features_richer_2025.csv", parse_dates=["GAME_DATE"])
-df = df.sort_values("GAME_DATE")
+import storage
+from feature_registry import NUMERIC, CATEGORICAL, FEATURES
 
-# 2) Define X, y
-NUMERIC = ["pts_5","reb_5","ast_5","win_pct_5",
-           "days_rest","back2back","opp_win_pct_5",
-           "fg_pct_5","fg3_pct_5","ft_pct_5","pace_5"]
-CATEGORICAL = ["home","opp","team"]
-FEATURES = NUMERIC + CATEGORICAL
+# 1) Load your new richer features (typed, only the model's columns)
+df = storage.load_features(columns=["GAME_DATE", "W"] + FEATURES)
+df = df.sort_values("GAME_DATE")
 
+# 2) Define X, y (features: see feature_registry.py)
 X = df[FEATURES]
 y = df["W"]
 
@@ -1,6 +1,8 @@
 # backend/tune_xgb.py
 import os
-import pandas as pd
+
+import storage
+from feature_registry import NUMERIC, CATEGORICAL, FEATURES
 
 from sklearn.pipeline        import Pipeline
 from sklearn.compose         import ColumnTransformer
@@ -12,19 +14,12 @@ from xgboost                 import XGBClassifier
 BASE     = os.path.dirname(__file__)
 CSV_PATH = os.path.join(BASE, "data", "all_teams_features_richer_2025.csv")
 
-# ── 2) Load & sort chronologically
-df = pd.read_csv(CSV_PATH, parse_dates=["GAME_DATE"])
+# ── 2) Load the model's columns & sort chronologically
+TARGET = "W"
+df = storage.load_features(columns=["GAME_DATE", TARGET] + FEATURES, csv_path=CSV_PATH)
 df.sort_values(["team", "GAME_DATE"], inplace=True)
 
-# ── 3) Define your features & target
-NUMERIC     = [
-    "pts_5","reb_5","ast_5","win_pct_5","opp_win_pct_5",
-    "fg_pct_5","fg3_pct_5","ft_pct_5","pace_5",
-    "days_rest","back2back"
-]
-CATEGORICAL = ["home","opp","team"]
-FEATURES    = NUMERIC + CATEGORICAL
-TARGET      = "W"
+# ── 3) Features (see feature_registry.py) & target
 
 X = df[FEATURES]
 y = df[TARGET]